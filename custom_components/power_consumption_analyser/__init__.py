@@ -10,17 +10,25 @@ from typing import List, Optional, Set
 import yaml
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers import entity_registry as er, device_registry as dr, label_registry as lr
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
 from homeassistant.components import persistent_notification
 
 from .const import DOMAIN, CONF_UNTERVERTEILUNG_PATH, CONF_SAFE_CIRCUITS, CONF_BASELINE_SENSORS, CONF_UNTRACKED_NUMBER, OPT_ENERGY_METERS_MAP, PLATFORMS
-from .const import OPT_DEFAULT_NOTIFY_SERVICE, OPT_MEASURE_DURATION_S
+from .const import OPT_DEFAULT_NOTIFY_SERVICE, OPT_MEASURE_DURATION_S, WORKFLOW_MODES
 from .model import PCAData, Circuit
+from .model.store import MeasurementStore
+from .model.history_db import EffectHistory
+from .measurement import rederive_effects, schedule_effect_ci, async_effect_ci, async_track_untracked_history
 from .services.helpers import state_float as _state_float, calc_tracked_power as _calc_tracked_power
 from .services.workflow import workflow_start_current_step as _workflow_start_current_step, workflow_advance as _workflow_advance, workflow_finish as _workflow_finish, notify as _notify, simple_notify as _simple_notify
+from .services.workflow import plan_group_steps as _plan_group_steps, split_group_step as _split_group_step, group_label as _group_label
+from .services.workflow import plan_design_steps as _plan_design_steps, apply_design_results as _apply_design_results
+from .strategies.design import design_window_scale as _design_window_scale
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -99,8 +107,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Discover EnergyMeter label id and initialize label-based meters
     _init_label_tracking(hass, data)
 
+    # Shared tracked/untracked aggregator; set up before platforms so it sees events first
+    _init_power_tracking(hass, data, entry)
+    # ON windows for measurements come from this always-on history
+    entry.async_on_unload(async_track_untracked_history(hass, data))
+
     hass.data[DOMAIN] = data
 
+    # Restore results and history before the sensors are added, then save on every change
+    store = MeasurementStore(hass, data)
+    await store.async_load()
+    store.async_listen()
+    data.store = store
+    # Long-term history beyond history_size (written only with the long_term_history option)
+    history = EffectHistory(hass, data)
+    history.async_listen()
+    data.history_db = history
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     register_services(hass, data, entry)
@@ -173,6 +196,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
     hass.bus.async_listen(f"{DOMAIN}.measure_finished", _on_measure_finished)
 
+    # Group-testing steps: descend into groups with an effect, then advance
+    async def _on_group_measure_finished(event):
+        if not data.workflow_active:
+            return
+        step = event.data.get("group")
+        if data.workflow_index >= len(data.workflow_queue) or step != data.workflow_queue[data.workflow_index]:
+            return
+        if data.workflow_mode == "design":
+            await _notify_group_result(hass, data, step, None)
+            if data.workflow_index + 1 >= len(data.workflow_queue):
+                solved = _apply_design_results(hass, data)
+                await _notify_design_result(hass, data, solved)
+            await _workflow_advance(hass, data)
+            async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
+            return
+        effect = float(event.data.get("effect") or 0.0)
+        thr = float(getattr(data, "min_effect_w", 0) or 0)
+        # Invalid windows cannot rule a group out
+        descend = not event.data.get("valid", True) or (effect != 0.0 and abs(effect) >= thr)
+        children = _split_group_step(data, step) if descend else []
+        await _notify_group_result(hass, data, step, children)
+        await _workflow_advance(hass, data)
+        async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
+    hass.bus.async_listen(f"{DOMAIN}.group_measure_finished", _on_group_measure_finished)
+
+    # Drift compensation: the OFF window of the current step is done, ask to restore and verify
+    async def _on_restore_started(event):
+        if not data.workflow_active or data.workflow_index >= len(data.workflow_queue):
+            return
+        step = event.data.get("circuit_id")
+        if step != data.workflow_queue[data.workflow_index]:
+            return
+        await _notify(
+            hass,
+            data,
+            f"Schalte {_group_label(step)} wieder EIN. Die Wiederherstellung wird {event.data.get('duration_s')} Sekunden lang geprüft.",
+            title="PCA Schritt prüfen",
+        )
+        async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
+    hass.bus.async_listen(f"{DOMAIN}.restore_started", _on_restore_started)
+
     # Handle mobile app notification actions to control the workflow
     async def _on_mobile_action(event):
         action = event.data.get("action") or event.data.get("actionName")
@@ -189,9 +253,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             # Finish the current measurement immediately and advance
             current = data.workflow_queue[data.workflow_index] if (data.workflow_active and data.workflow_index < len(data.workflow_queue)) else None
             if current:
-                switch_eid = f"switch.measure_circuit_{current.lower()}"
                 try:
-                    await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
+                    await _stop_step(hass, data, current, finish=True)
                 except Exception:
                     pass
         # else: ignore
@@ -208,6 +271,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if data:
             data.step_active = False
             data.current_circuit = None
+            if data.store is not None:
+                await data.store.async_unload()
+                data.store = None
+            if data.history_db is not None:
+                await data.history_db.async_close()
+                data.history_db = None
     return unload_ok
 
 @callback
@@ -322,11 +391,27 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         skip = set(call.data.get("skip_circuits") or [])
         wait_s = int(call.data.get("wait_s") or data.measure_duration_s)
         notify_service = call.data.get("notify_service") or entry.options.get(OPT_DEFAULT_NOTIFY_SERVICE)
+        mode = call.data.get("mode") or "sequential"
+        if mode not in WORKFLOW_MODES:
+            _LOGGER.warning("Unknown workflow mode %s; using sequential", mode)
+            mode = "sequential"
         # Determine queue: provided or all except safe and skipped
         if circuits:
             queue = [c for c in circuits if c in data.circuits and c not in data.safe_circuits and c not in skip]
         else:
             queue = [c for c in data.circuits.keys() if c not in data.safe_circuits and c not in skip]
+        steps = {}
+        design = {}
+        if queue and mode == "bisect":
+            # Group testing: whole groups first (RCDs unless given), bisect only groups with an effect
+            queue, steps = _plan_group_steps(call.data.get("groups") or data.rcd_to_circuits, queue)
+        elif queue and mode == "design":
+            # Factorial design: about half the circuits off per step, effects by least squares
+            eligible = queue
+            queue, steps, rows = _plan_design_steps(eligible)
+            design = {"circuits": eligible, "rows": rows, "steps": list(queue)}
+            for key in queue:
+                data.group_results.pop(key, None)
         if not queue:
             persistent_notification.async_create(hass, "Keine geeigneten Stromkreise zum Messen gefunden.", title="PCA Workflow")
             return
@@ -336,6 +421,14 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         data.workflow_wait_s = max(5, min(3600, wait_s))
         data.workflow_notify_service = notify_service
         data.workflow_skip_circuits = skip
+        data.workflow_mode = mode
+        data.workflow_groups = steps
+        data.workflow_design = design
+        data._workflow_plan = (list(queue), {k: list(v) for k, v in steps.items()})
+        if design:
+            # Design steps estimate every circuit from all steps: shorter windows suffice
+            design["window_s"] = max(5, round(data.workflow_wait_s * _design_window_scale(design["rows"])))
+            data.workflow_wait_s = design["window_s"]
         data._workflow_saved_duration = data.measure_duration_s
         data.measure_duration_s = data.workflow_wait_s
         async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
@@ -358,12 +451,16 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         # If measurement is running for current, stop it and ignore result
         if data.workflow_index < len(data.workflow_queue):
             current = data.workflow_queue[data.workflow_index]
-            data.workflow_ignore_result_for = current
-            # Attempt to stop switch if already on
-            switch_eid = f"switch.measure_circuit_{current.lower()}"
-            await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
+            if current in data.workflow_groups:
+                # A cancelled group window reports no result
+                await _stop_step(hass, data, current, finish=False)
+            else:
+                data.workflow_ignore_result_for = current
+                # Attempt to stop switch if already on
+                switch_eid = f"switch.measure_circuit_{current.lower()}"
+                await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
         # Move to next step
-        await _simple_notify(hass, data, f"Überspringe Stromkreis {current or ''}.")
+        await _simple_notify(hass, data, f"Überspringe Stromkreis {_group_label(current or '')}.")
         await _workflow_advance(hass, data)
         async_dispatcher_send(hass, f"{DOMAIN}_workflow_state")
 
@@ -375,6 +472,9 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         data.block_measure_starts = True
         data.stopping_workflow = True
         # Stop any ongoing measurements synchronously
+        if data.group_run is not None:
+            data.group_run.cancel()
+            data.group_run = None
         for cid in list(data.circuits.keys()):
             switch_eid = f"switch.measure_circuit_{cid.lower()}"
             try:
@@ -396,6 +496,7 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         data.workflow_notify_service = None
         data.workflow_skip_circuits = set()
         data.workflow_ignore_result_for = None
+        data.workflow_groups = {}
         # Unblock starts
         data.block_measure_starts = False
         data.stopping_workflow = False
@@ -409,8 +510,12 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         # Stop current measurement
         if data.workflow_index < len(data.workflow_queue):
             current = data.workflow_queue[data.workflow_index]
-            switch_eid = f"switch.measure_circuit_{current.lower()}"
-            await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
+            await _stop_step(hass, data, current, finish=False)
+        if data.workflow_mode == "bisect" and data._workflow_plan:
+            # Start over from the top-level groups, dropping earlier bisection steps
+            queue, steps = data._workflow_plan
+            data.workflow_queue = list(queue)
+            data.workflow_groups = {k: list(v) for k, v in steps.items()}
         data.workflow_index = 0
         await _simple_notify(hass, data, "Starte den Workflow neu.")
         await _workflow_start_current_step(hass, data)
@@ -423,8 +528,7 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
         if data.workflow_index >= len(data.workflow_queue):
             return
         current = data.workflow_queue[data.workflow_index]
-        switch_eid = f"switch.measure_circuit_{current.lower()}"
-        await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
+        await _stop_step(hass, data, current, finish=True)
 
     hass.services.async_register(DOMAIN, "select_circuit", handle_select_circuit)
     hass.services.async_register(DOMAIN, "confirm_off", handle_confirm_off)
@@ -439,6 +543,51 @@ def register_services(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) ->
     hass.services.async_register(DOMAIN, "workflow_restart", handle_workflow_restart)
     hass.services.async_register(DOMAIN, "workflow_finish_current", handle_workflow_finish_current)
 
+    async def handle_recompute_confidence_intervals(call: ServiceCall):
+        """Bootstrap CIs for every kept measurement (e.g. after changing strategy or resamples)."""
+        resamples = int(call.data.get("resamples") or data.bootstrap_resamples or 2000)
+        method = call.data.get("method") or data.bootstrap_method
+        done = 0
+        for cid in list(data.measure_windows):
+            if await async_effect_ci(hass, data, cid, resamples=resamples, method=method):
+                done += 1
+        _LOGGER.debug("Recomputed confidence intervals for %d circuits", done)
+
+    hass.services.async_register(DOMAIN, "recompute_confidence_intervals", handle_recompute_confidence_intervals)
+
+    async def handle_query_effect_history(call: ServiceCall) -> ServiceResponse:
+        """Entries or effect aggregates of the long-term history, filtered in the database."""
+        history = data.history_db
+        if history is None:
+            return {"entries": []}
+
+        def _epoch(key: str) -> Optional[float]:
+            raw = call.data.get(key)
+            parsed = dt_util.parse_datetime(str(raw)) if raw else None
+            return dt_util.as_utc(parsed).timestamp() if parsed else None
+
+        circuit = call.data.get("circuit_id")
+        start, end = _epoch("start"), _epoch("end")
+        bucket = call.data.get("bucket_s")
+        if call.data.get("aggregate") or bucket:
+            rows = await history.async_aggregate(circuit=circuit, start=start, end=end, bucket_s=float(bucket) if bucket else None)
+            for row in rows:
+                for key in ("bucket", "first", "last"):
+                    if row[key] is not None:
+                        row[key] = dt_util.utc_from_timestamp(row[key]).isoformat()
+            return {"aggregates": rows}
+        rows = await history.async_query(circuit=circuit, start=start, end=end, limit=int(call.data.get("limit") or 1000))
+        for row in rows:
+            row["ts"] = dt_util.utc_from_timestamp(row["ts"]).isoformat()
+            for key in ("valid", "clamped"):
+                if row[key] is not None:
+                    row[key] = bool(row[key])
+        return {"entries": rows}
+
+    hass.services.async_register(
+        DOMAIN, "query_effect_history", handle_query_effect_history, supports_response=SupportsResponse.ONLY
+    )
+
 async def _ensure_labels_for_energy_meters(hass: HomeAssistant, entity_ids: List[str]) -> None:
     """Ensure the device for each entity has the 'EnergyMeter' label."""
     if not entity_ids:
@@ -681,6 +830,60 @@ def _init_label_tracking(hass: HomeAssistant, data: PCAData) -> None:
 
     hass.bus.async_listen("entity_registry_updated", _on_entity_registry_updated)
 
+def _init_power_tracking(hass: HomeAssistant, data: PCAData, entry: ConfigEntry) -> None:
+    """Own the single meter/home state subscription for the integration.
+
+    Each event updates data.power once and is fanned out to dependent entities
+    through the f"{DOMAIN}_power_state" dispatcher signal (arg: changed entity_id,
+    or None after a meter set change). Per-circuit sensors listen on
+    f"{DOMAIN}_power_state_{circuit_id}" instead, sent only for the circuit of the
+    changed meter (for every circuit after a set change).
+    """
+    power = data.power
+    unsub_state: List = []
+
+    @callback
+    def _send(eid: Optional[str]) -> None:
+        async_dispatcher_send(hass, f"{DOMAIN}_power_state", eid)
+        for cid in (power.group_keys(eid, "circuit") if eid is not None else list(data.circuits)):
+            async_dispatcher_send(hass, f"{DOMAIN}_power_state_{cid}", eid)
+
+    @callback
+    def _on_state_change(event):
+        eid = event.data.get("entity_id")
+        if power.update(eid, event.data.get("new_state")):
+            _send(eid)
+
+    @callback
+    def _sync(*_):
+        home = data.baseline_sensors.get("home_consumption") if data.baseline_sensors else None
+        home_changed = home != power.home_entity
+        if home_changed:
+            power.set_home(home, hass.states.get(home) if home else None)
+        changed = power.sync_meters(set(data.meter_to_circuit.keys()) | set(data.label_meters), hass.states.get)
+        # A relink keeps the meter set but moves sub-totals
+        regrouped = power.set_groups(data.meter_groups())
+        if not (changed or home_changed) and unsub_state:
+            if regrouped:
+                _send(None)
+            return
+        while unsub_state:
+            unsub_state.pop()()
+        entities = power.entity_ids()
+        if entities:
+            unsub_state.append(async_track_state_change_event(hass, list(entities), _on_state_change))
+        _send(None)
+
+    @callback
+    def _unsubscribe():
+        while unsub_state:
+            unsub_state.pop()()
+
+    _sync()
+    for evt in ("meter_linked", "meter_unlinked", "label_meters_changed"):
+        entry.async_on_unload(hass.bus.async_listen(f"{DOMAIN}.{evt}", _sync))
+    entry.async_on_unload(_unsubscribe)
+
 @callback
 def _apply_options_to_data(data: PCAData, entry: ConfigEntry) -> None:
     try:
@@ -719,12 +922,120 @@ def _apply_options_to_data(data: PCAData, entry: ConfigEntry) -> None:
         data.discard_first_n = max(0, min(50, int(dn)))
     except Exception:
         pass
+    try:
+        from .const import OPT_SETTLING, SETTLING_MODES
+        sm = entry.options.get(OPT_SETTLING, data.settling)
+        data.settling = sm if sm in SETTLING_MODES else "fixed"
+    except Exception:
+        pass
+    try:
+        from .const import OPT_PUBLISH_MAX_RATE, OPT_PUBLISH_DEADBAND_W, OPT_PUBLISH_DEADBAND_PCT
+        rate = entry.options.get(OPT_PUBLISH_MAX_RATE, data.publish_max_rate)
+        dbw = entry.options.get(OPT_PUBLISH_DEADBAND_W, data.publish_deadband_w)
+        dbp = entry.options.get(OPT_PUBLISH_DEADBAND_PCT, data.publish_deadband_pct)
+        data.publish_max_rate = max(0.0, min(10.0, float(rate)))
+        data.publish_deadband_w = max(0.0, min(1000.0, float(dbw)))
+        data.publish_deadband_pct = max(0.0, min(50.0, float(dbp)))
+    except Exception:
+        pass
+    try:
+        from .const import OPT_SAMPLING_MODE, OPT_SAMPLE_RATE_HZ, SAMPLING_MODES
+        mode = entry.options.get(OPT_SAMPLING_MODE, data.sampling_mode)
+        data.sampling_mode = mode if mode in SAMPLING_MODES else "event"
+        hz = entry.options.get(OPT_SAMPLE_RATE_HZ, data.sample_rate_hz)
+        data.sample_rate_hz = max(0.1, min(10.0, float(hz)))
+    except Exception:
+        pass
+    try:
+        from .const import OPT_EARLY_STOP, OPT_EARLY_STOP_CONFIDENCE
+        data.early_stop = bool(entry.options.get(OPT_EARLY_STOP, data.early_stop))
+        conf = entry.options.get(OPT_EARLY_STOP_CONFIDENCE, data.early_stop_confidence)
+        data.early_stop_confidence = max(0.8, min(0.999, float(conf)))
+    except Exception:
+        pass
+    try:
+        from .const import OPT_OUTAGE_FLAG_W
+        of = entry.options.get(OPT_OUTAGE_FLAG_W, data.outage_flag_w)
+        data.outage_flag_w = max(0.0, min(5000.0, float(of)))
+    except Exception:
+        pass
+    try:
+        from .const import OPT_BOOTSTRAP_RESAMPLES, OPT_BOOTSTRAP_METHOD, BOOTSTRAP_METHODS
+        br = int(entry.options.get(OPT_BOOTSTRAP_RESAMPLES, data.bootstrap_resamples))
+        data.bootstrap_resamples = 0 if br <= 0 else max(100, min(20000, br))
+        bm = entry.options.get(OPT_BOOTSTRAP_METHOD, data.bootstrap_method)
+        data.bootstrap_method = bm if bm in BOOTSTRAP_METHODS else "percentile"
+    except Exception:
+        pass
+    try:
+        from .const import OPT_ON_WINDOW_S
+        ow = entry.options.get(OPT_ON_WINDOW_S, data.on_window_s)
+        data.on_window_s = max(0, min(600, int(ow)))
+    except Exception:
+        pass
+    try:
+        from .const import OPT_DRIFT_COMPENSATION, OPT_RESTORE_WINDOW_S, OPT_DRIFT_FIT, DRIFT_FITS
+        data.drift_compensation = bool(entry.options.get(OPT_DRIFT_COMPENSATION, data.drift_compensation))
+        rw = entry.options.get(OPT_RESTORE_WINDOW_S, data.restore_window_s)
+        data.restore_window_s = max(5, min(600, int(rw)))
+        fit = entry.options.get(OPT_DRIFT_FIT, data.drift_fit)
+        data.drift_fit = fit if fit in DRIFT_FITS else "robust"
+    except Exception:
+        pass
+    try:
+        from .const import OPT_LONG_TERM_HISTORY
+        data.long_term_history = bool(entry.options.get(OPT_LONG_TERM_HISTORY, data.long_term_history))
+    except Exception:
+        pass
 
 async def _options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
     data: PCAData = hass.data.get(DOMAIN)
     if not data:
         return
     _apply_options_to_data(data, entry)
+    # Strategy/trim may have changed: re-derive kept measurements
+    changed = rederive_effects(data, reevaluate=True)
+    if changed:
+        schedule_effect_ci(hass, data, changed)
+        async_dispatcher_send(hass, f"{DOMAIN}_effects_changed")
+
+async def _stop_step(hass: HomeAssistant, data: PCAData, step: str, finish: bool) -> None:
+    """End the window of a workflow step; finish=True records its result (and advances)."""
+    if step in data.workflow_groups:
+        run = data.group_run
+        if run is None:
+            return
+        if finish:
+            await run.finish()
+        else:
+            run.cancel()
+            data.group_run = None
+            data.measuring_circuit = None
+            data.measurement_origin = None
+            async_dispatcher_send(hass, f"{DOMAIN}_measure_state")
+        return
+    switch_eid = f"switch.measure_circuit_{step.lower()}"
+    await hass.services.async_call("switch", "turn_off", {"entity_id": switch_eid}, blocking=False)
+
+async def _notify_group_result(hass: HomeAssistant, data: PCAData, step: str, children: Optional[List[str]]) -> None:
+    res = data.group_results.get(step) or {}
+    effect = float(res.get("effect") or 0.0)
+    msg = f"Ergebnis {_group_label(step)}: Auswirkung auf nicht erfasste Last {effect:.2f} W."
+    if children:
+        msg += " Wird weiter aufgeteilt: " + ", ".join(_group_label(c) for c in children) + "."
+    elif children is not None:
+        msg += " Keine relevante Last, Stromkreise werden übersprungen."
+    await _notify(hass, data, msg, title="PCA Schritt Ergebnis")
+
+async def _notify_design_result(hass: HomeAssistant, data: PCAData, circuits: List[str]) -> None:
+    if not circuits:
+        await _notify(hass, data, "Versuchsplan unvollständig: keine Auswertung möglich.", title="PCA Schritt Ergebnis")
+        return
+    parts = []
+    for cid in circuits:
+        se = (data.measure_stats.get(cid) or {}).get("se")
+        parts.append(f"{cid}: {data.measure_results.get(cid, 0.0):.2f} W" + (f" (±{se:.2f})" if se is not None else ""))
+    await _notify(hass, data, "Ergebnis Versuchsplan: " + ", ".join(parts) + ".", title="PCA Schritt Ergebnis")
 
 async def _notify_step_result(hass: HomeAssistant, data: PCAData, circuit_id: str) -> None:
     effect = data.measure_results.get(circuit_id)
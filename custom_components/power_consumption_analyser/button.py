@@ -7,6 +7,7 @@ from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN
 from .model import PCAData
+from .model.store import PERSISTED, PERSISTED_WINDOWS
 
 async def async_setup_entry(hass, entry, async_add_entities):
     data: PCAData = hass.data[DOMAIN]
@@ -64,10 +65,13 @@ class ResetValuesButton(_BaseDeviceButton):
     def suggested_object_id(self) -> str:
         return "reset_values"
     async def async_press(self) -> None:
-        # Clear measurement results and history and notify sensors to refresh
+        # Clear everything the store persists (or it returns after a restart), save the
+        # emptied state and notify sensors to refresh
         try:
-            self.data.measure_results.clear()
-            self.data.measure_history.clear()
+            for attr in PERSISTED + PERSISTED_WINDOWS:
+                getattr(self.data, attr).clear()
+            if self.data.store is not None:
+                self.data.store.async_schedule_save()
             self.hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "reset"})
         except Exception:
             pass
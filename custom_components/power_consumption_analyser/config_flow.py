@@ -10,6 +10,26 @@ from .const import (
     OPT_MIN_EFFECT_W,
     OPT_PRE_WAIT_S,
     OPT_DISCARD_FIRST_N,
+    OPT_SETTLING,
+    SETTLING_MODES,
+    OPT_PUBLISH_MAX_RATE,
+    OPT_PUBLISH_DEADBAND_W,
+    OPT_PUBLISH_DEADBAND_PCT,
+    OPT_OUTAGE_FLAG_W,
+    OPT_SAMPLING_MODE,
+    OPT_SAMPLE_RATE_HZ,
+    SAMPLING_MODES,
+    OPT_EARLY_STOP,
+    OPT_EARLY_STOP_CONFIDENCE,
+    OPT_ON_WINDOW_S,
+    OPT_DRIFT_COMPENSATION,
+    OPT_LONG_TERM_HISTORY,
+    OPT_RESTORE_WINDOW_S,
+    OPT_DRIFT_FIT,
+    DRIFT_FITS,
+    OPT_BOOTSTRAP_RESAMPLES,
+    OPT_BOOTSTRAP_METHOD,
+    BOOTSTRAP_METHODS,
 )
 
 HOME_CONS_KEY = "home_consumption"
@@ -17,7 +37,10 @@ GRID_POWER_KEY = "grid_power"
 TRACKED_SUM_KEY = "tracked_power_sum"
 
 # Available strategies
-_STRATEGY_KEYS = ["average", "median", "trimmed_mean", "median_of_means"]
+_STRATEGY_KEYS = [
+    "average", "median", "trimmed_mean", "median_of_means", "huber", "tukey", "hodges_lehmann", "exponential",
+    "tw_average", "tw_median", "tw_trimmed_mean",
+]
 
 class PCAConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -68,6 +91,26 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             options[OPT_MIN_EFFECT_W] = int(user_input.get(OPT_MIN_EFFECT_W, 20))
             options[OPT_PRE_WAIT_S] = int(user_input.get(OPT_PRE_WAIT_S, 3))
             options[OPT_DISCARD_FIRST_N] = int(user_input.get(OPT_DISCARD_FIRST_N, 2))
+            settling = user_input.get(OPT_SETTLING, "fixed")
+            options[OPT_SETTLING] = settling if settling in SETTLING_MODES else "fixed"
+            options[OPT_PUBLISH_MAX_RATE] = float(user_input.get(OPT_PUBLISH_MAX_RATE, 0.0))
+            options[OPT_PUBLISH_DEADBAND_W] = float(user_input.get(OPT_PUBLISH_DEADBAND_W, 0.0))
+            options[OPT_PUBLISH_DEADBAND_PCT] = float(user_input.get(OPT_PUBLISH_DEADBAND_PCT, 0.0))
+            options[OPT_OUTAGE_FLAG_W] = float(user_input.get(OPT_OUTAGE_FLAG_W, 50.0))
+            mode = user_input.get(OPT_SAMPLING_MODE, "event")
+            options[OPT_SAMPLING_MODE] = mode if mode in SAMPLING_MODES else "event"
+            options[OPT_SAMPLE_RATE_HZ] = float(user_input.get(OPT_SAMPLE_RATE_HZ, 1.0))
+            options[OPT_EARLY_STOP] = bool(user_input.get(OPT_EARLY_STOP, False))
+            options[OPT_EARLY_STOP_CONFIDENCE] = float(user_input.get(OPT_EARLY_STOP_CONFIDENCE, 0.95))
+            options[OPT_ON_WINDOW_S] = int(user_input.get(OPT_ON_WINDOW_S, 60))
+            options[OPT_DRIFT_COMPENSATION] = bool(user_input.get(OPT_DRIFT_COMPENSATION, False))
+            options[OPT_RESTORE_WINDOW_S] = int(user_input.get(OPT_RESTORE_WINDOW_S, 30))
+            fit = user_input.get(OPT_DRIFT_FIT, "robust")
+            options[OPT_DRIFT_FIT] = fit if fit in DRIFT_FITS else "robust"
+            options[OPT_LONG_TERM_HISTORY] = bool(user_input.get(OPT_LONG_TERM_HISTORY, False))
+            options[OPT_BOOTSTRAP_RESAMPLES] = int(user_input.get(OPT_BOOTSTRAP_RESAMPLES, 0))
+            method = user_input.get(OPT_BOOTSTRAP_METHOD, "percentile")
+            options[OPT_BOOTSTRAP_METHOD] = method if method in BOOTSTRAP_METHODS else "percentile"
             strategy = user_input.get(OPT_EFFECT_STRATEGY, "average")
             if strategy not in _STRATEGY_KEYS:
                 strategy = "average"
@@ -80,13 +123,45 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         current_strategy = self._entry.options.get(OPT_EFFECT_STRATEGY, "average")
         current_pw = self._entry.options.get(OPT_PRE_WAIT_S, 3)
         current_dn = self._entry.options.get(OPT_DISCARD_FIRST_N, 2)
+        current_settling = self._entry.options.get(OPT_SETTLING, "fixed")
+        current_rate = self._entry.options.get(OPT_PUBLISH_MAX_RATE, 0.0)
+        current_dbw = self._entry.options.get(OPT_PUBLISH_DEADBAND_W, 0.0)
+        current_dbp = self._entry.options.get(OPT_PUBLISH_DEADBAND_PCT, 0.0)
+        current_of = self._entry.options.get(OPT_OUTAGE_FLAG_W, 50.0)
+        current_mode = self._entry.options.get(OPT_SAMPLING_MODE, "event")
+        current_hz = self._entry.options.get(OPT_SAMPLE_RATE_HZ, 1.0)
+        current_es = self._entry.options.get(OPT_EARLY_STOP, False)
+        current_esc = self._entry.options.get(OPT_EARLY_STOP_CONFIDENCE, 0.95)
+        current_ow = self._entry.options.get(OPT_ON_WINDOW_S, 60)
+        current_dc = self._entry.options.get(OPT_DRIFT_COMPENSATION, False)
+        current_rw = self._entry.options.get(OPT_RESTORE_WINDOW_S, 30)
+        current_fit = self._entry.options.get(OPT_DRIFT_FIT, "robust")
+        current_lth = self._entry.options.get(OPT_LONG_TERM_HISTORY, False)
+        current_bs = self._entry.options.get(OPT_BOOTSTRAP_RESAMPLES, 0)
+        current_bm = self._entry.options.get(OPT_BOOTSTRAP_METHOD, "percentile")
         schema = vol.Schema({
             vol.Optional(OPT_MEASURE_DURATION_S, default=current): int,
             vol.Optional("history_size", default=current_hx): int,
+            vol.Optional(OPT_LONG_TERM_HISTORY, default=current_lth): bool,
             vol.Optional(OPT_MIN_EFFECT_W, default=current_me): int,
             vol.Optional(OPT_EFFECT_STRATEGY, default=current_strategy): vol.In(_STRATEGY_KEYS),
             vol.Optional(OPT_PRE_WAIT_S, default=current_pw): int,
             vol.Optional(OPT_DISCARD_FIRST_N, default=current_dn): int,
+            vol.Optional(OPT_SETTLING, default=current_settling): vol.In(SETTLING_MODES),
+            vol.Optional(OPT_SAMPLING_MODE, default=current_mode): vol.In(SAMPLING_MODES),
+            vol.Optional(OPT_SAMPLE_RATE_HZ, default=current_hz): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=10)),
+            vol.Optional(OPT_EARLY_STOP, default=current_es): bool,
+            vol.Optional(OPT_EARLY_STOP_CONFIDENCE, default=current_esc): vol.All(vol.Coerce(float), vol.Range(min=0.8, max=0.999)),
+            vol.Optional(OPT_ON_WINDOW_S, default=current_ow): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+            vol.Optional(OPT_DRIFT_COMPENSATION, default=current_dc): bool,
+            vol.Optional(OPT_RESTORE_WINDOW_S, default=current_rw): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+            vol.Optional(OPT_DRIFT_FIT, default=current_fit): vol.In(DRIFT_FITS),
+            vol.Optional(OPT_BOOTSTRAP_RESAMPLES, default=current_bs): vol.All(vol.Coerce(int), vol.Range(min=0, max=20000)),
+            vol.Optional(OPT_BOOTSTRAP_METHOD, default=current_bm): vol.In(BOOTSTRAP_METHODS),
+            vol.Optional(OPT_PUBLISH_MAX_RATE, default=current_rate): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+            vol.Optional(OPT_PUBLISH_DEADBAND_W, default=current_dbw): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+            vol.Optional(OPT_PUBLISH_DEADBAND_PCT, default=current_dbp): vol.All(vol.Coerce(float), vol.Range(min=0, max=50)),
+            vol.Optional(OPT_OUTAGE_FLAG_W, default=current_of): vol.All(vol.Coerce(float), vol.Range(min=0, max=5000)),
         })
         return self.async_show_form(step_id="user", data_schema=schema)
 
@@ -17,5 +17,38 @@ OPT_MIN_SAMPLES = "min_samples"
 OPT_TRIM_FRACTION = "trim_fraction"
 OPT_PRE_WAIT_S = "pre_wait_s"
 OPT_DISCARD_FIRST_N = "discard_first_n"
+# Start of the OFF window: "fixed" (pre-wait + discard first N) or "auto" (settling detector)
+OPT_SETTLING = "settling"
+SETTLING_MODES = ["fixed", "auto"]
+# Publish policy for high-churn power sensors
+OPT_PUBLISH_MAX_RATE = "publish_max_rate"  # writes per second, 0 = unlimited
+OPT_PUBLISH_DEADBAND_W = "publish_deadband_w"
+OPT_PUBLISH_DEADBAND_PCT = "publish_deadband_pct"
+# Measurement sampling: "event" (on every meter/home change) or "fixed" (timer at sample_rate_hz)
+OPT_SAMPLING_MODE = "sampling_mode"
+OPT_SAMPLE_RATE_HZ = "sample_rate_hz"
+SAMPLING_MODES = ["event", "fixed"]
+# Sequential early stopping of measurement windows (SPRT against min_effect_w)
+OPT_EARLY_STOP = "early_stop"
+OPT_EARLY_STOP_CONFIDENCE = "early_stop_confidence"
+# Unavailable meters whose last known power is at least this (W) are flagged as outages
+OPT_OUTAGE_FLAG_W = "outage_flag_w"
+# Seconds of untracked power before a measurement used as its ON window (0 = single reading)
+OPT_ON_WINDOW_S = "on_window_s"
+# ON-OFF-ON drift compensation: second ON window after restoring the circuit (s) and the drift fit
+OPT_DRIFT_COMPENSATION = "drift_compensation"
+OPT_RESTORE_WINDOW_S = "restore_window_s"
+OPT_DRIFT_FIT = "drift_fit"
+DRIFT_FITS = ["robust", "linear"]
+# Bootstrap confidence intervals of finished effects (resamples, 0 = off)
+OPT_BOOTSTRAP_RESAMPLES = "bootstrap_resamples"
+OPT_BOOTSTRAP_METHOD = "bootstrap_method"
+BOOTSTRAP_METHODS = ["percentile", "bca"]
+# Append every finished measurement to the long-term history database (config dir)
+OPT_LONG_TERM_HISTORY = "long_term_history"
+
+# Guided workflow: one circuit per step, adaptive group testing that bisects groups with an effect,
+# or a factorial on/off design solved by least squares
+WORKFLOW_MODES = ["sequential", "bisect", "design"]
 
 PLATFORMS = [Platform.SENSOR, Platform.SWITCH, Platform.BUTTON, Platform.NUMBER, Platform.SELECT]
@@ -0,0 +1,938 @@
+from __future__ import annotations
+
+import time
+from array import array
+from statistics import median
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant, callback, HassJob
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .model import PCAData
+from .model.samples import SampleBuffer, buffer_capacity, EVENT_RATE_HINT_HZ, UNTRACKED_HISTORY_HZ
+from .strategies.base import EffectStrategy, MeasurementWindow, window_level
+from .strategies.average import AverageStrategy
+from .strategies.median import MedianStrategy, sorted_mad, sorted_median
+from .strategies.trimmed_mean import TrimmedMeanStrategy
+from .strategies.median_of_means import MedianOfMeansStrategy
+from .strategies.m_estimator import HuberStrategy, TukeyStrategy
+from .strategies.hodges_lehmann import HodgesLehmannStrategy
+from .strategies.exponential import ExponentialStrategy
+from .strategies.time_weighted import TimeWeightedAverageStrategy, TimeWeightedMedianStrategy, TimeWeightedTrimmedMeanStrategy
+from .strategies.streaming import RunningStats, MAD_TO_SIGMA, location_spread, standard_error, z_score
+from .strategies.sequential import EFFECT_ABSENT, sprt_decide
+from .strategies.vectorized import sort_samples
+from .strategies.bootstrap import bootstrap_ci
+from .strategies.drift import detrend, fit_drift
+from .strategies.settling import SETTLE_CHANGE_MIN_W, SettlingDetector
+from .sensors.publish import PublishThrottle, WRITE, DEFER
+
+# Live running-effect publishing: rate when no publish_max_rate is configured, CI level
+LIVE_PUBLISH_RATE_HZ = 1.0
+LIVE_CONFIDENCE = 0.95
+# The ON window needs a history tick at most this old (s): about one sampling interval
+ON_WINDOW_MAX_AGE_S = 1.5 / UNTRACKED_HISTORY_HZ
+# Live effect from the running statistic (O(1)) where it is the strategy's own estimate
+LIVE_STREAMING = {"average": "mean", "median": "median"}
+# Costly strategies (fits, pairwise medians, IRLS) recompute the live effect at most every LIVE_SLOW_RECOMPUTE_S
+LIVE_SLOW_STRATEGIES = frozenset({"exponential", "hodges_lehmann", "huber", "tukey"})
+LIVE_SLOW_RECOMPUTE_S = 5.0
+# Early stopping: never decide on fewer samples; noise floor (W) below which meter
+# resolution and the untracked base load make a flatter window implausible
+SPRT_MIN_SAMPLES = 5
+SPRT_SIGMA_FLOOR_W = 5.0
+# "Below threshold" is accepted only this long (s) after the start: a flat window may
+# just mean the breaker was not switched yet
+SPRT_ABSENT_MIN_S = 30.0
+# Level of the bootstrap confidence intervals of finished effects
+BOOTSTRAP_CONFIDENCE = 0.95
+
+STRATEGIES = {
+    "average": AverageStrategy(),
+    "median": MedianStrategy(),
+    "trimmed_mean": TrimmedMeanStrategy(),
+    "median_of_means": MedianOfMeansStrategy(),
+    "huber": HuberStrategy(),
+    "tukey": TukeyStrategy(),
+    "hodges_lehmann": HodgesLehmannStrategy(),
+    "exponential": ExponentialStrategy(),
+    "tw_average": TimeWeightedAverageStrategy(),
+    "tw_median": TimeWeightedMedianStrategy(),
+    "tw_trimmed_mean": TimeWeightedTrimmedMeanStrategy(),
+}
+
+
+def current_untracked(data: PCAData) -> float:
+    # current untracked (home - tracked) from the shared aggregator
+    return round(data.power.untracked, 2)
+
+
+def strategy_set(data: PCAData) -> Dict[str, EffectStrategy]:
+    """Registered strategies, configured (trim fraction) for this installation."""
+    strats = dict(STRATEGIES)
+    # Use configured trim fraction (percent)
+    try:
+        trim = float(getattr(data, "trim_fraction", 20) or 20) / 100.0
+        strats["trimmed_mean"] = TrimmedMeanStrategy(trim=trim)
+        strats["tw_trimmed_mean"] = TimeWeightedTrimmedMeanStrategy(trim=trim)
+    except Exception:
+        pass
+    return strats
+
+
+def resolve_strategy(data: PCAData) -> EffectStrategy:
+    strat = strategy_set(data).get(data.effect_strategy)
+    return strat if strat is not None else STRATEGIES["average"]
+
+
+def on_window_for(strat: EffectStrategy, on: MeasurementWindow) -> MeasurementWindow:
+    """ON window with the strategy's own level of the ON samples as baseline.
+
+    Makes every strategy a two-sample comparison (ON level - OFF level); a single ON
+    value is the baseline as is.
+    """
+    if len(on.samples) < 2:
+        return on
+    return replace(on, baseline=window_level(strat, on.samples))
+
+
+def evaluate_strategies(data: PCAData, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
+    """Effect of every registered strategy on one OFF window; the window is sorted once for all."""
+    if off.ordered is None and len(off.samples) > 1:
+        off = replace(off, ordered=sort_samples(off.samples))
+    return {key: float(strat.compute(on_window_for(strat, on), off).get("effect", 0.0)) for key, strat in strategy_set(data).items()}
+
+
+def settle_prior(data: PCAData, key: str) -> Optional[float]:
+    """Last detected settling time (s) of a circuit or group: runtime memory, else its history."""
+    prior = data.settle_prior.get(key)
+    if prior is not None:
+        return prior
+    for entry in reversed(data.measure_history.get(key, [])):
+        if entry.get("settle_s") is not None:
+            return float(entry["settle_s"])
+    return None
+
+
+def on_window(data: PCAData, now: Optional[float] = None) -> Tuple[array, array]:
+    """(timestamps, untracked power) of the last on_window_s seconds before now, from the always-on history.
+
+    Empty unless the newest tick is at most ON_WINDOW_MAX_AGE_S old: the history pauses
+    during measurements, so back-to-back steps would otherwise get a window from before
+    the previous step. Callers fall back to the current reading.
+    """
+    secs = float(getattr(data, "on_window_s", 0) or 0)
+    last = data.untracked_history.last_time()
+    if now is None:
+        now = dt_util.utcnow().timestamp()
+    if secs <= 0 or last is None or now - last > ON_WINDOW_MAX_AGE_S:
+        return array("d"), array("d")
+    times, values = data.untracked_history.window(now - secs)
+    # At most one window's worth of ticks, however they were spaced
+    keep = max(2, int(secs * UNTRACKED_HISTORY_HZ))
+    return times[-keep:], values[-keep:]
+
+
+def on_noise(values: Sequence[float]) -> float:
+    """MAD-based noise sigma (W) of an ON window; 0.0 for fewer than two values."""
+    if len(values) < 2:
+        return 0.0
+    center = median(values)
+    return MAD_TO_SIGMA * median(abs(v - center) for v in values)
+
+
+@callback
+def async_track_untracked_history(hass: HomeAssistant, data: PCAData) -> Callable[[], None]:
+    """Sample untracked power into data.untracked_history at UNTRACKED_HISTORY_HZ.
+
+    Paused while a measurement runs and for pre_wait_s after it, while circuits are being
+    switched back on, so the history only holds ON-state power. Returns the unsubscribe.
+    """
+    resume_at: List[Optional[float]] = [None]
+
+    @callback
+    def _tick(now: datetime) -> None:
+        ts = now.timestamp()
+        if data.measuring_circuit is not None:
+            resume_at[0] = ts + max(0, int(getattr(data, "pre_wait_s", 0) or 0))
+            return
+        if resume_at[0] is not None and ts < resume_at[0]:
+            return
+        if data.power.home_entity is None:
+            return
+        data.untracked_history.append(ts, current_untracked(data))
+
+    return async_track_time_interval(hass, _tick, timedelta(seconds=1.0 / UNTRACKED_HISTORY_HZ))
+
+
+def clamp_effect(data: PCAData, effect: float) -> Tuple[float, bool]:
+    # Clamp tiny effects
+    thr = float(getattr(data, "min_effect_w", 0) or 0)
+    if abs(effect) < thr:
+        return 0.0, True
+    return effect, False
+
+
+# Keys a bootstrap CI merges into measure_stats and history entries
+CI_KEYS = ("ci_low", "ci_high", "ci_method", "ci_confidence", "ci_resamples", "ci_strategy", "ci_supported")
+
+
+def rederive_effects(data: PCAData, reevaluate: bool = False) -> List[str]:
+    """Point measure_results at the selected strategy for every circuit with cached effects.
+
+    reevaluate recomputes all strategies from the kept raw OFF windows first (e.g. after
+    the trim fraction changed). A CI in measure_stats computed for another strategy (or
+    before re-evaluation) is dropped; schedule_effect_ci recomputes it. History entries
+    keep theirs, which belongs to the effect recorded there. Returns the circuits whose
+    result was set.
+    """
+    key = getattr(resolve_strategy(data), "key", "average")
+    changed: List[str] = []
+    for cid in list(data.measure_effects):
+        window = data.measure_windows.get(cid)
+        if reevaluate and window is not None and len(window):
+            baseline = data.measure_baseline.get(cid, 0.0)
+            on = data.measure_on_windows.get(cid)
+            times = data.measure_window_times.get(cid)
+            data.measure_effects[cid] = evaluate_strategies(
+                data,
+                MeasurementWindow(baseline=baseline, samples=on if on is not None and len(on) > 1 else [baseline]),
+                MeasurementWindow(baseline=baseline, samples=window, times=times if times is not None and len(times) == len(window) else None),
+            )
+        effects = data.measure_effects[cid]
+        if key not in effects:
+            continue
+        data.measure_results[cid], data.measure_clamped[cid] = clamp_effect(data, effects[key])
+        stats = data.measure_stats.get(cid)
+        if stats and (reevaluate or stats.get("ci_strategy") != key):
+            for k in CI_KEYS:
+                stats.pop(k, None)
+        changed.append(cid)
+    return changed
+
+
+@callback
+def schedule_effect_ci(hass: HomeAssistant, data: PCAData, cids: Sequence[str]) -> None:
+    """Recompute the bootstrap CI of re-derived circuits (history entries stay as measured)."""
+    if data.bootstrap_resamples <= 0:
+        return
+    for cid in cids:
+        hass.async_create_task(async_effect_ci(hass, data, cid, record_history=False))
+
+
+async def async_effect_ci(
+    hass: HomeAssistant,
+    data: PCAData,
+    cid: str,
+    history_entry: Optional[dict] = None,
+    resamples: Optional[int] = None,
+    method: Optional[str] = None,
+    record_history: bool = True,
+) -> Optional[dict]:
+    """Bootstrap CI of a circuit's kept OFF window with the selected strategy.
+
+    Resampling runs in the executor; the CI is merged into measure_stats and, with
+    record_history, the history entry of that window (default: the circuit's latest).
+    Returns the CI or None.
+    """
+    window = data.measure_windows.get(cid)
+    count = int(resamples if resamples is not None else data.bootstrap_resamples)
+    if window is None or len(window) < 2 or count <= 0:
+        return None
+    if not record_history:
+        history_entry = None
+    elif history_entry is None:
+        hist = data.measure_history.get(cid)
+        history_entry = hist[-1] if hist else None
+    strat = resolve_strategy(data)
+    if not strat.supports_bootstrap:
+        # No interval rather than one of a different estimator
+        marker = {"ci_supported": False, "ci_strategy": strat.key}
+        stats = data.measure_stats.setdefault(cid, {})
+        for k in CI_KEYS:
+            stats.pop(k, None)
+        stats.update(marker)
+        if history_entry is not None:
+            history_entry.update(marker)
+        async_dispatcher_send(hass, f"{DOMAIN}_effects_changed")
+        return None
+    on = data.measure_on_windows.get(cid)
+    selected = (data.effect_strategy, data.trim_fraction)
+    ci = await hass.async_add_executor_job(
+        bootstrap_ci,
+        strat,
+        data.measure_baseline.get(cid, 0.0),
+        array("d", window),
+        count,
+        BOOTSTRAP_CONFIDENCE,
+        method or data.bootstrap_method,
+        None,
+        array("d", on) if on is not None else None,
+    )
+    # Dropped or replaced by a newer measurement, or the strategy changed meanwhile
+    if ci is None or data.measure_windows.get(cid) is not window:
+        return None
+    if (data.effect_strategy, data.trim_fraction) != selected:
+        return None
+    data.measure_stats.setdefault(cid, {}).update(ci)
+    if history_entry is not None:
+        history_entry.update(ci)
+    async_dispatcher_send(hass, f"{DOMAIN}_effects_changed")
+    return ci
+
+
+class MeasurementRun:
+    """One OFF window of untracked power while a circuit (or a group of circuits) is off.
+
+    Samples untracked power (event-driven or fixed rate) after pre-wait/discard, keeps the
+    buffer and running stats in data under `key`, publishes the throttled live effect and
+    stops early on an SPRT decision. finish() computes the result and hands it to on_done;
+    storing it is up to the owner.
+
+    With drift compensation the first finish() ends only the OFF window and starts a
+    restore phase (phase "restore", event restore_started): after pre-wait a second ON
+    window is sampled for restore_window_s, the drift between both ON windows is fitted
+    and removed from all windows, and the restore is verified (ON level back).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data: PCAData,
+        key: str,
+        circuits: Sequence[str],
+        on_done: Callable[["MeasurementRun", dict], Awaitable[None]],
+        on_live: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.hass = hass
+        self.data = data
+        self.key = key
+        self.circuits = tuple(circuits)
+        self.active = False
+        self.stop_decision: Optional[str] = None
+        # Meters (not on the measured circuits) that went unavailable during the window -> last known W
+        self.outages: Dict[str, float] = {}
+        self._on_done = on_done
+        self._on_live = on_live
+        self._own_meters: frozenset = frozenset()
+        self._started_at: float = 0.0
+        # Untracked power right before the start (ON window), from the always-on history
+        self._on_window: array = array("d")
+        self._on_times: array = array("d")
+        # Noise of the ON window (MAD-based sigma, W); floor for the early-stop noise scale
+        self._on_sigma: float = 0.0
+        # Drift compensation: "off" while the circuit is off, "restore" while sampling the second ON window
+        self.phase = "off"
+        # Automatic settling: OFF samples are collected once the detector finds the signal stable
+        self._settler: Optional[SettlingDetector] = None
+        self._after: array = array("d")
+        self._after_times: array = array("d")
+        self._live_throttle = PublishThrottle()
+        # Live publishing: ON level per strategy key, last full compute (key, monotonic time, effect)
+        self._live_on_level: Dict[str, float] = {}
+        self._live_full: Optional[Tuple[str, float, float]] = None
+        self._unsub_state: Optional[Callable[[], None]] = None
+        self._unsub_timer: Optional[Callable[[], None]] = None
+        self._unsub_live_flush: Optional[Callable[[], None]] = None
+
+    @callback
+    def start(self) -> None:
+        # Reset samples, record baseline (current untracked) and start sampling
+        data = self.data
+        hass = self.hass
+        self.active = True
+        # Baseline from the recent ON history; a single reading would catch any switch-on spike
+        self._on_times, self._on_window = on_window(data)
+        if len(self._on_window) >= 2:
+            data.measure_baseline[self.key] = round(median(self._on_window), 2)
+        else:
+            self._on_times, self._on_window = array("d"), array("d")
+            data.measure_baseline[self.key] = current_untracked(data)
+        self._on_sigma = on_noise(self._on_window)
+        self.phase = "off"
+        self._after, self._after_times = array("d"), array("d")
+        self._release_samples()
+        data.measure_samples[self.key] = data.sample_pool.acquire(self._expected_samples())
+        data.measure_running[self.key] = RunningStats()
+        self._live_throttle = PublishThrottle()
+        self._live_on_level = {}
+        self._live_full = None
+        self.stop_decision = None
+        self._started_at = time.monotonic()
+        self.outages = {}
+        # Meters on the measured circuits are expected to drop out while they are OFF
+        own = set(self.circuits)
+        self._own_meters = frozenset(eid for eid, cid in data.meter_to_circuit.items() if cid in own)
+        self._record_outages()
+        self._subscribe_state_changes()
+        # auto-finish after duration (on the event loop)
+        @callback
+        def _timer_cb(_now):
+            hass.async_create_task(self.finish())
+        self._unsub_timer = async_call_later(hass, data.measure_duration_s, HassJob(_timer_cb))
+
+    def _subscribe_state_changes(self) -> None:
+        data = self.data
+        auto = getattr(data, "settling", "fixed") == "auto"
+        self._settler = None
+        if auto:
+            # Stable only after leaving the ON level (breaker actually off); pre_wait stays
+            # the minimum wait for circuits whose level never changes
+            self._settler = SettlingDetector(
+                dt_util.utcnow().timestamp(),
+                settle_prior(data, self.key),
+                reference=data.measure_baseline.get(self.key),
+                change_w=max(SETTLE_CHANGE_MIN_W, float(getattr(data, "min_effect_w", 0) or 0) / 2),
+                min_wait_s=max(0, int(getattr(data, "pre_wait_s", 0) or 0)),
+            )
+        # Initialize pre-wait and discard counters (fixed settling only)
+        try:
+            data._collect_started_at = datetime.now(timezone.utc)
+            pre_wait = 0 if auto else max(0, int(getattr(data, "pre_wait_s", 0) or 0))
+            data._collect_deadline = data._collect_started_at + timedelta(seconds=pre_wait)
+        except Exception:
+            data._collect_started_at = None
+            data._collect_deadline = None
+        data._discarded_counts[self.key] = 0
+
+        @callback
+        def _take_sample():
+            if not self.active:
+                return
+            # Enforce pre-wait
+            deadl = getattr(data, "_collect_deadline", None)
+            if deadl is not None:
+                try:
+                    if datetime.now(timezone.utc) < deadl:
+                        return
+                except Exception:
+                    pass
+            self._record_outages()
+            untracked = current_untracked(data)
+            ts = dt_util.utcnow().timestamp()
+            settler = self._settler
+            if settler is not None:
+                was_settled = settler.settled_at is not None
+                settled = settler.push(ts, untracked)
+                if was_settled and not settled:
+                    # Level left the ON value after a provisional settle: start over
+                    self._restart_window()
+                    return
+                if not was_settled:
+                    if settled:
+                        # Only a settle after a real change is a prior for later runs
+                        if settler.settle_s is not None:
+                            data.settle_prior[self.key] = settler.settle_s
+                        # The samples that proved the signal stable start the window
+                        for t, v in settler.stable():
+                            self._add_sample(t, v)
+                    return
+            else:
+                # Discard first N samples
+                disc_n = int(getattr(data, "discard_first_n", 0) or 0)
+                cur_disc = int(data._discarded_counts.get(self.key, 0) or 0)
+                if cur_disc < disc_n:
+                    data._discarded_counts[self.key] = cur_disc + 1
+                    return
+            self._add_sample(ts, untracked)
+
+        self._unsub_state = self._track(_take_sample)
+
+    @callback
+    def _restart_window(self) -> None:
+        # Drop the OFF samples collected so far (they were still at the ON level)
+        buf = self.data.measure_samples.get(self.key)
+        if buf is not None:
+            buf.clear()
+        self.data.measure_running[self.key] = RunningStats()
+        self._live_throttle = PublishThrottle()
+        self._live_full = None
+        self._cancel_live_flush()
+        if self.data.measure_live.pop(self.key, None) is not None:
+            async_dispatcher_send(self.hass, f"{DOMAIN}_live_effect", self.key)
+
+    @callback
+    def _add_sample(self, ts: float, value: float, live: bool = True) -> None:
+        self.data.measure_samples[self.key].append(value, ts)
+        stats = self.data.measure_running.get(self.key)
+        if stats is not None:
+            stats.push(value)
+            if live:
+                self._offer_live()
+                self._check_early_stop(stats)
+
+    @callback
+    def _flush_settling(self) -> None:
+        # Window ends before the signal settled: keep the newest (most settled) samples
+        settler = self._settler
+        if settler is None or settler.settled_at is not None:
+            return
+        if not len(self.data.measure_samples.get(self.key) or ()):
+            for t, v in settler.stable():
+                self._add_sample(t, v, live=False)
+
+    def _track(self, take: Callable[[], None]) -> Callable[[], None]:
+        hass = self.hass
+        data = self.data
+        if getattr(data, "sampling_mode", "event") == "fixed":
+            # Fixed-rate snapshot of the aggregator (sample-and-hold of the latest meter values)
+            hz = max(0.1, float(getattr(data, "sample_rate_hz", 1.0) or 1.0))
+
+            @callback
+            def _on_tick(_now):
+                take()
+
+            return async_track_time_interval(hass, _on_tick, timedelta(seconds=1.0 / hz))
+
+        @callback
+        def _on_change(entity_id):
+            # None signals a meter set change, not a new reading
+            if entity_id is not None:
+                take()
+
+        # sample on every home/meter update delivered by the shared power subscription
+        return async_dispatcher_connect(hass, f"{DOMAIN}_power_state", _on_change)
+
+    def _expected_samples(self) -> int:
+        if getattr(self.data, "sampling_mode", "event") == "fixed":
+            rate = float(getattr(self.data, "sample_rate_hz", 1.0) or 1.0)
+        else:
+            rate = EVENT_RATE_HINT_HZ
+        return buffer_capacity(float(self.data.measure_duration_s or 0), rate)
+
+    def _release_samples(self) -> None:
+        # Hand the window's buffer back to the pool once results are recorded
+        buf = self.data.measure_samples.pop(self.key, None)
+        if isinstance(buf, SampleBuffer):
+            self.data.sample_pool.release(buf)
+
+    @callback
+    def _check_early_stop(self, stats: RunningStats) -> None:
+        # Sequential test against min_effect_w; the duration timer remains the hard cap.
+        # Tests the running statistic that follows the selected strategy (mean or median);
+        # strategies without one (time-weighted, exponential fit) never stop early, since
+        # their samples are not the i.i.d. draws the SPRT assumes
+        if not getattr(self.data, "early_stop", False) or self.stop_decision is not None:
+            return
+        thr = float(getattr(self.data, "min_effect_w", 0) or 0)
+        if thr <= 0 or stats.n < max(SPRT_MIN_SAMPLES, int(getattr(self.data, "min_samples", 0) or 0)):
+            return
+        strat = STRATEGIES.get(self.data.effect_strategy, STRATEGIES["average"])
+        location = strat.running_location
+        if location is None:
+            return
+        level = stats.mean if location == "mean" else stats.median
+        baseline = self.data.measure_baseline.get(self.key, 0.0)
+        decision = sprt_decide(
+            stats.n,
+            baseline - level,
+            max(location_spread(strat.key, stats), self._on_sigma, SPRT_SIGMA_FLOOR_W),
+            thr,
+            float(getattr(self.data, "early_stop_confidence", 0.95) or 0.95),
+        )
+        if decision == EFFECT_ABSENT and time.monotonic() - self._started_at < SPRT_ABSENT_MIN_S:
+            # A flat start may just mean the breaker is not off yet: keep sampling
+            return
+        if decision is not None:
+            self.stop_decision = decision
+            self.hass.async_create_task(self.finish())
+
+    def _live_rate(self) -> float:
+        return float(getattr(self.data, "publish_max_rate", 0) or 0) or LIVE_PUBLISH_RATE_HZ
+
+    def _live_proxy(self) -> Optional[float]:
+        # O(1) stand-in for the running effect, used only to decide when to publish
+        stats = self.data.measure_running.get(self.key)
+        if stats is None or not stats.n:
+            return None
+        baseline = self.data.measure_baseline.get(self.key, 0.0)
+        loc = stats.mean if self.data.effect_strategy == "average" else stats.median
+        return round(baseline - loc, 2)
+
+    @callback
+    def _offer_live(self) -> None:
+        rate = self._live_rate()
+        now = time.monotonic()
+        decision = self._live_throttle.offer(self._live_proxy(), now, rate)
+        if decision == WRITE:
+            self._publish_live()
+        elif decision == DEFER and self._unsub_live_flush is None:
+            self._unsub_live_flush = async_call_later(self.hass, self._live_throttle.flush_delay(now, rate), self._flush_live)
+
+    @callback
+    def _flush_live(self, _now) -> None:
+        self._unsub_live_flush = None
+        if self.active and self._live_throttle.flush(self._live_proxy(), time.monotonic()):
+            self._publish_live()
+
+    @callback
+    def _cancel_live_flush(self) -> None:
+        if self._unsub_live_flush is not None:
+            self._unsub_live_flush()
+            self._unsub_live_flush = None
+
+    @callback
+    def _publish_live(self) -> None:
+        """Running effect of the selected strategy with standard error and confidence interval.
+
+        Average and median come from the running stats; other strategies recompute on the
+        OFF window so far, the costly ones (LIVE_SLOW_STRATEGIES) at most every
+        LIVE_SLOW_RECOMPUTE_S while the effect is republished with fresh se/samples.
+        """
+        key = self.key
+        stats = self.data.measure_running.get(key)
+        buf = self.data.measure_samples.get(key)
+        if stats is None or buf is None or not stats.n:
+            return
+        baseline = self.data.measure_baseline.get(key, 0.0)
+        strat = resolve_strategy(self.data)
+        skey = getattr(strat, "key", "average")
+        loc = LIVE_STREAMING.get(skey)
+        now = time.monotonic()
+        full = self._live_full
+        if loc is not None:
+            on_level = self._live_on_level.get(skey)
+            if on_level is None:
+                # The ON window does not change while the circuit is off
+                on_level = self._live_on_level[skey] = on_window_for(strat, self._on_samples(baseline)).baseline
+            effect = on_level - (stats.mean if loc == "mean" else stats.median)
+        elif skey in LIVE_SLOW_STRATEGIES and full is not None and full[0] == skey and now - full[1] < LIVE_SLOW_RECOMPUTE_S:
+            effect = full[2]
+        else:
+            effect = self._compute_live(strat, baseline, stats, buf)
+            self._live_full = (skey, now, effect)
+        se = standard_error(skey, stats)
+        half = z_score(LIVE_CONFIDENCE) * se if se is not None else None
+        self.data.measure_live[key] = {
+            "effect": round(effect, 2),
+            "se": round(se, 2) if se is not None else None,
+            "ci_low": round(effect - half, 2) if half is not None else None,
+            "ci_high": round(effect + half, 2) if half is not None else None,
+            "confidence": LIVE_CONFIDENCE,
+            "samples": stats.n,
+            "strategy": skey,
+        }
+        async_dispatcher_send(self.hass, f"{DOMAIN}_live_effect", key)
+        if self._on_live is not None:
+            self._on_live()
+
+    def _compute_live(self, strat: EffectStrategy, baseline: float, stats: RunningStats, buf: SampleBuffer) -> float:
+        view = buf.view()
+        times = buf.times()
+        try:
+            res = strat.compute(
+                on_window_for(strat, self._on_samples(baseline)),
+                MeasurementWindow(baseline=baseline, samples=view, stats=stats, times=times),
+            )
+        finally:
+            view.release()
+            if times is not None:
+                times.release()
+        return float(res.get("effect", 0.0))
+
+    def _on_samples(self, baseline: float) -> MeasurementWindow:
+        return MeasurementWindow(baseline=baseline, samples=self._on_window if len(self._on_window) else [baseline])
+
+    @callback
+    def _record_outages(self) -> None:
+        power = self.data.power
+        if not power.unavailable_count:
+            return
+        thr = float(getattr(self.data, "outage_flag_w", 0) or 0)
+        self.outages.update(power.outages(thr, exclude=self._own_meters))
+
+    @callback
+    def _stop(self) -> None:
+        self.active = False
+        self._stop_sampling()
+        if self.data.restore_circuit == self.key:
+            self.data.restore_circuit = None
+
+    @callback
+    def _stop_sampling(self) -> None:
+        self._cancel_live_flush()
+        if self.data.measure_live.pop(self.key, None) is not None:
+            async_dispatcher_send(self.hass, f"{DOMAIN}_live_effect", self.key)
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._unsub_state:
+            self._unsub_state()
+            self._unsub_state = None
+        # Clear runtime counters
+        self.data._collect_started_at = None
+        self.data._collect_deadline = None
+        self.data._discarded_counts.pop(self.key, None)
+
+    @callback
+    def cancel(self) -> None:
+        """Stop without computing a result (skip/abort)."""
+        if not self.active:
+            return
+        self._stop()
+        self.data.measure_running.pop(self.key, None)
+        self._release_samples()
+
+    def _wants_restore(self) -> bool:
+        return bool(getattr(self.data, "drift_compensation", False)) and len(self._on_window) >= 2
+
+    @callback
+    def _begin_restore(self) -> None:
+        """End the OFF window and sample the second ON window once the circuits are back on."""
+        data = self.data
+        hass = self.hass
+        self._stop_sampling()
+        self.phase = "restore"
+        data.restore_circuit = self.key
+        # Time to switch the circuits back on before sampling
+        settle_s = max(0, int(getattr(data, "pre_wait_s", 0) or 0))
+        window_s = max(1, int(getattr(data, "restore_window_s", 30) or 30))
+        settle_until = dt_util.utcnow().timestamp() + settle_s
+
+        @callback
+        def _take_after():
+            if not self.active or self.phase != "restore":
+                return
+            ts = dt_util.utcnow().timestamp()
+            if ts < settle_until:
+                return
+            self._after.append(current_untracked(data))
+            self._after_times.append(ts)
+
+        self._unsub_state = self._track(_take_after)
+
+        @callback
+        def _timer_cb(_now):
+            hass.async_create_task(self.finish())
+        self._unsub_timer = async_call_later(hass, settle_s + window_s, HassJob(_timer_cb))
+        async_dispatcher_send(hass, f"{DOMAIN}_measure_state")
+        hass.bus.async_fire(f"{DOMAIN}.restore_started", {
+            "circuit_id": self.key,
+            "circuits": list(self.circuits),
+            "settle_s": settle_s,
+            "duration_s": window_s,
+        })
+
+    def _compensate(
+        self, samples: Sequence[float], times: Optional[Sequence[float]], off_level: float
+    ) -> Tuple[Optional[array], Optional[array], dict]:
+        """Drift-corrected (ON, OFF) windows from the restore phase and what was found.
+
+        None windows: no correction (restore not verified or no drift fit).
+        """
+        info: dict = {"restore_samples": len(self._after)}
+        if len(self._after) < 2:
+            info["restored"] = None
+            return None, None, info
+        before = median(self._on_window)
+        after = median(self._after)
+        # Verify: after restoring, untracked power is back near the ON level, not the OFF level
+        restored = abs(after - before) <= abs(after - off_level)
+        info["restored"] = restored
+        if not restored:
+            return None, None, info
+        method = getattr(self.data, "drift_fit", "robust")
+        slope = fit_drift(self._on_times, self._on_window, self._after_times, self._after, method)
+        n = len(samples)
+        if slope is None or times is None:
+            return None, None, info
+        info["drift_w_per_min"] = round(slope * 60, 2)
+        info["drift_fit"] = method
+        # Every window moved to the drift level at the start of the OFF window
+        t_ref = times[0] if n else self._on_times[-1]
+        on = detrend(self._on_times + self._after_times, self._on_window + self._after, slope, t_ref)
+        off = detrend(times, samples, slope, t_ref)
+        return on, off, info
+
+    async def finish(self) -> None:
+        """Stop sampling, compute the effect of the window and hand it to on_done."""
+        if not self.active:
+            return
+        if self.phase == "off":
+            self._flush_settling()
+        if self.phase == "off" and self._wants_restore():
+            self._begin_restore()
+            return
+        self._stop()
+        result = self._compute()
+        self._release_samples()
+        await self._on_done(self, result)
+
+    def _compute(self) -> dict:
+        data = self.data
+        buf = data.measure_samples.get(self.key)
+        # Zero-copy view of the OFF window for strategies and stats
+        samples = buf.view() if buf is not None else SampleBuffer(1).view()
+        times = buf.times() if buf is not None else None
+        baseline = data.measure_baseline.get(self.key, 0.0)
+        n = len(samples)
+        stats = data.measure_running.pop(self.key, None)
+        if stats is None or stats.n != n:
+            # Samples not pushed through the running stats: rebuild them (one pass)
+            stats = RunningStats()
+            for x in samples:
+                stats.push(x)
+        on_win = self._on_samples(baseline)
+        drift: dict = {}
+        kept_on = self._on_window
+        window: Optional[array] = None
+        if self.phase == "restore" and n:
+            on_fixed, off_fixed, drift = self._compensate(samples, times, stats.median)
+            if off_fixed is not None:
+                kept_on = on_fixed
+                window = off_fixed
+                on_win = MeasurementWindow(baseline=baseline, samples=on_fixed)
+                samples.release()
+                samples = memoryview(off_fixed)
+                stats = RunningStats()
+                for x in samples:
+                    stats.push(x)
+        avg_untracked = stats.mean if n else baseline
+        # Sorted once: shared by all strategies and the exact median/MAD of the window
+        ordered = sort_samples(samples) if n else None
+        if n:
+            off_win = MeasurementWindow(baseline=baseline, samples=samples, stats=stats, times=times, ordered=ordered)
+        else:
+            off_win = MeasurementWindow(baseline=baseline, samples=[current_untracked(data)])
+        # All strategies from one sort, so a later strategy change needs no re-measurement
+        effects = evaluate_strategies(data, on_win, off_win)
+        strat = resolve_strategy(data)
+        raw_effect = effects.get(getattr(strat, "key", "average"), 0.0)
+        # Raw OFF window kept compactly (one copy of the buffer) for re-evaluation
+        if window is None:
+            window = array("d")
+            if n:
+                with samples.cast("B") as raw:
+                    window.frombytes(raw)
+        samples.release()
+        # Timestamps kept alongside, for time-weighted strategies on re-evaluation
+        window_times = array("d", times) if times is not None and n else array("d")
+        if times is not None:
+            times.release()
+        se = standard_error(getattr(strat, "key", "average"), stats) if n else None
+        effect, clamped = clamp_effect(data, raw_effect)
+        # Exact median/MAD from the sorted window; the running P² estimates are for live values only
+        med = float(sorted_median(ordered)) if n else 0.0
+        mad = float(sorted_mad(ordered, med)) if n else 0.0
+        sigma = MAD_TO_SIGMA * mad
+        # Validity based on min samples
+        min_samples = int(getattr(data, "min_samples", 0) or 0)
+        valid = True
+        reason = ""
+        if n < min_samples:
+            valid = False
+            reason = f"too_few_samples:{n}<{min_samples}"
+        elif self.outages:
+            # An outaged meter reads 0 W, shifting its load into untracked during the window
+            valid = False
+            reason = "meter_unavailable:" + ",".join(sorted(self.outages))
+        elif drift.get("restored") is False:
+            valid = False
+            reason = "not_restored"
+        settling: dict = {}
+        if self._settler is not None:
+            settling = {"settling": "auto", "settle_s": self._settler.settle_s, "settle_changed": self._settler.changed_at is not None}
+            if self._settler.settled_at is None:
+                settling["settle_timeout"] = True
+        win_stats = {
+            "samples": n,
+            "median_off": round(med, 2),
+            "mad": round(mad, 2),
+            "sigma": round(sigma, 2),
+            "std": round(stats.std, 2),
+            "min": round(stats.min, 2) if n else None,
+            "max": round(stats.max, 2) if n else None,
+            "early_stop": self.stop_decision,
+            "on_samples": len(self._on_window),
+            **drift,
+            **settling,
+        }
+        if self.outages:
+            win_stats["outage_meters"] = sorted(self.outages)
+            win_stats["outage_w"] = round(sum(self.outages.values()), 2)
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "effect": round(effect, 2),
+            "baseline": round(baseline, 2),
+            "avg_untracked": round(avg_untracked, 2),
+            "samples": n,
+            "on_samples": len(self._on_window),
+            **drift,
+            **settling,
+            "duration_s": data.measure_duration_s,
+            "elapsed_s": round(time.monotonic() - self._started_at, 1),
+            "early_stop": self.stop_decision,
+            "strategy": getattr(strat, "key", "average"),
+            "sampling": getattr(data, "sampling_mode", "event"),
+            "clamped": clamped,
+            "valid": valid,
+            "reason": reason,
+            "mad": round(mad, 2),
+            "sigma": round(sigma, 2),
+        }
+        return {
+            "effect": effect,
+            "baseline": baseline,
+            "avg_untracked": avg_untracked,
+            "effect_raw": raw_effect,
+            "effects": effects,
+            "window": window,
+            "window_times": window_times,
+            "on_window": kept_on,
+            "samples": n,
+            "se": se,
+            "clamped": clamped,
+            "valid": valid,
+            "reason": reason,
+            "stats": win_stats,
+            "history": entry,
+        }
+
+
+def start_group_run(hass: HomeAssistant, data: PCAData, key: str, circuits: Sequence[str]) -> Optional[MeasurementRun]:
+    """Measure the joint effect of several circuits switched off together (group-testing step).
+
+    The result goes to data.group_results[key] and is announced with a group_measure_finished event.
+    """
+    if data.group_run is not None or getattr(data, "block_measure_starts", False) or getattr(data, "stopping_workflow", False):
+        return None
+    members = list(circuits)
+
+    async def _done(run: MeasurementRun, result: dict) -> None:
+        data.group_run = None
+        data.group_results[key] = {
+            "circuits": members,
+            "effect": round(result["effect"], 2),
+            # Unclamped effect, needed when steps are combined (factorial design)
+            "effect_raw": round(result["effect_raw"], 2),
+            "se": round(result["se"], 2) if result["se"] is not None else None,
+            "valid": result["valid"],
+            "reason": result["reason"],
+            "samples": result["samples"],
+            "early_stop": run.stop_decision,
+            "ts": result["history"]["ts"],
+        }
+        data.measuring_circuit = None
+        data.measurement_origin = None
+        async_dispatcher_send(hass, f"{DOMAIN}_measure_state")
+        hass.bus.async_fire(f"{DOMAIN}.group_measure_finished", {
+            "group": key,
+            "circuits": members,
+            "effect": result["effect"],
+            "valid": result["valid"],
+            "samples": result["samples"],
+            "early_stop": run.stop_decision,
+        })
+
+    data.measuring_circuit = key
+    async_dispatcher_send(hass, f"{DOMAIN}_measure_state")
+    hass.bus.async_fire(f"{DOMAIN}.measurement_started", {"circuit_id": key, "circuits": members, "duration_s": data.measure_duration_s})
+    run = MeasurementRun(hass, data, key, members, _done)
+    data.group_run = run
+    run.start()
+    return run
@@ -1,3 +1,5 @@
 # Re-export for convenience
 from .data import PCAData, Circuit
-
+from .power import PowerAggregator
+from .state_cache import StateValueCache, ParsedState
+from .samples import SampleBuffer, SampleBufferPool
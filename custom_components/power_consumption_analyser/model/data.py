@@ -1,9 +1,28 @@
 from __future__ import annotations
-from typing import Dict, List, Optional, Set
+import re
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from homeassistant.core import HomeAssistant
 
 from ..const import DOMAIN
+from .power import GroupRef, PowerAggregator
+from .samples import SampleBuffer, SampleBufferPool, TimedRing, UNTRACKED_HISTORY_S, UNTRACKED_HISTORY_HZ
+from ..strategies.streaming import RunningStats
+from .state_cache import StateValueCache
+
+PHASES = ("L1", "L2", "L3")
+
+
+def circuit_phases(phase: str) -> Tuple[str, ...]:
+    """Phases a circuit is wired to: "L2" -> (L2,), "L1/L3" -> (L1, L3), "3P"/"3~" -> all three."""
+    raw = str(phase or "").upper()
+    found = tuple(p for p in PHASES if p in raw)
+    if found:
+        return found
+    if re.search(r"3\s*(P|~|PH|N)", raw) or "DREH" in raw:
+        return PHASES
+    return ()
 
 @dataclass
 class Circuit:
@@ -31,9 +50,27 @@ class PCAData:
         self.label_meters: Set[str] = set()
         self.energy_label_id: Optional[str] = None
         self.devices_with_label: Set[str] = set()
+        # Parsed meter values (W) keyed on State identity, shared by all power readers
+        self.state_cache: StateValueCache = StateValueCache()
+        # Running tracked/untracked totals over all mapped and labelled meters
+        self.power: PowerAggregator = PowerAggregator(self.state_cache)
         # Measurement workflow state
-        self.measure_samples: Dict[str, List[float]] = {}
+        # Per-circuit OFF window buffers, only present while a measurement runs
+        self.measure_samples: Dict[str, SampleBuffer] = {}
+        self.sample_pool: SampleBufferPool = SampleBufferPool()
+        # One-pass statistics of the running OFF windows (live attributes, O(1) finalize)
+        self.measure_running: Dict[str, RunningStats] = {}
+        # Live running effect per measuring circuit (effect, se, ci_low/high, samples)
+        self.measure_live: Dict[str, dict] = {}
         self.measure_baseline: Dict[str, float] = {}
+        # Recent untracked power while no measurement runs; ON windows are cut from it
+        self.untracked_history: TimedRing = TimedRing(int(UNTRACKED_HISTORY_S * UNTRACKED_HISTORY_HZ))
+        self.on_window_s: int = 60
+        # ON-OFF-ON drift compensation; restore_circuit is the run sampling its second ON window
+        self.drift_compensation: bool = False
+        self.restore_window_s: int = 30
+        self.drift_fit: str = "robust"
+        self.restore_circuit: Optional[str] = None
         self.measure_listeners: Dict[str, Optional[callable]] = {}
         self.measure_timers: Dict[str, Optional[callable]] = {}
         self.measure_results: Dict[str, float] = {}
@@ -41,6 +78,11 @@ class PCAData:
         self.measure_valid: Dict[str, bool] = {}
         self.measure_reason: Dict[str, str] = {}
         self.measure_stats: Dict[str, dict] = {}
+        # Last finished OFF window per circuit and the effect of every strategy on it
+        self.measure_windows: Dict[str, array] = {}
+        self.measure_window_times: Dict[str, array] = {}  # timestamps of measure_windows, if known
+        self.measure_effects: Dict[str, Dict[str, float]] = {}
+        self.measure_on_windows: Dict[str, array] = {}
         self.measure_duration_s: int = 60
         self.min_effect_w: int = 20
         self.min_samples: int = 10
@@ -48,6 +90,24 @@ class PCAData:
         # Stabilization controls
         self.pre_wait_s: int = 3
         self.discard_first_n: int = 2
+        # "auto": a settling detector replaces pre-wait/discard; last settling time (s) per circuit as prior
+        self.settling: str = "fixed"
+        self.settle_prior: Dict[str, float] = {}
+        # Sampling of untracked power during a measurement
+        self.sampling_mode: str = "event"
+        self.sample_rate_hz: float = 1.0
+        # End a window once the effect vs min_effect_w is decided (hard cap: measure_duration_s)
+        self.early_stop: bool = False
+        self.early_stop_confidence: float = 0.95
+        # Publish policy for power sensors (0 disables each limit)
+        self.publish_max_rate: float = 0.0
+        self.publish_deadband_w: float = 0.0
+        self.publish_deadband_pct: float = 0.0
+        # Meter outages at or above this last known power are flagged (W)
+        self.outage_flag_w: float = 50.0
+        # Bootstrap CI of finished effects, computed in the executor (0 resamples = off)
+        self.bootstrap_resamples: int = 0
+        self.bootstrap_method: str = "percentile"
         # Runtime per-circuit counters
         self._collect_started_at: Optional[object] = None
         self._collect_deadline: Optional[object] = None
@@ -56,6 +116,11 @@ class PCAData:
         # History of measurements per circuit
         self.measure_history: Dict[str, List[dict]] = {}
         self.measure_history_max: int = 50
+        # Every finished measurement also goes to the on-disk history (model.history_db.EffectHistory)
+        self.long_term_history: bool = False
+        self.history_db: Optional[object] = None
+        # Persists results and history across restarts (model.store.MeasurementStore), set up per entry
+        self.store: Optional[object] = None
         self.effect_strategy: str = "average"
         # Guided workflow state
         self.workflow_active: bool = False
@@ -67,6 +132,14 @@ class PCAData:
         self.workflow_skip_circuits: Set[str] = set()
         self.workflow_notification_id: str = f"{DOMAIN}_workflow"
         self.workflow_ignore_result_for: Optional[str] = None
+        # Group testing ("bisect" mode): group step key -> circuits, results, running group window
+        self.workflow_mode: str = "sequential"
+        self.workflow_groups: Dict[str, List[str]] = {}
+        self.group_results: Dict[str, dict] = {}
+        self.group_run: Optional[object] = None
+        self._workflow_plan: Optional[tuple] = None  # initial (queue, groups) for restarts
+        # Factorial design ("design" mode): circuits, design rows (1 = off) and their steps
+        self.workflow_design: Dict[str, object] = {}
         # Guard to block starts while stopping workflow
         self.block_measure_starts: bool = False
         self.stopping_workflow: bool = False
@@ -80,3 +153,22 @@ class PCAData:
 
     def is_safe(self, cid: str) -> bool:
         return cid in self.safe_circuits
+
+    def meter_groups(self) -> Dict[str, List[GroupRef]]:
+        """Sub-total assignment for mapped meters: their circuit, its RCD group(s) and phase(s).
+
+        Multi-phase circuits split a meter's power evenly across their phases.
+        """
+        rcds_by_circuit: Dict[str, List[str]] = {}
+        for rcd, cids in self.rcd_to_circuits.items():
+            for cid in cids:
+                rcds_by_circuit.setdefault(cid, []).append(rcd)
+        groups: Dict[str, List[GroupRef]] = {}
+        for eid, cid in self.meter_to_circuit.items():
+            refs: List[GroupRef] = [("circuit", cid, 1.0)]
+            refs.extend(("rcd", rcd, 1.0) for rcd in rcds_by_circuit.get(cid, []))
+            circuit = self.circuits.get(cid)
+            phases = circuit_phases(circuit.phase) if circuit else ()
+            refs.extend(("phase", ph, 1.0 / len(phases)) for ph in phases)
+            groups[eid] = refs
+        return groups
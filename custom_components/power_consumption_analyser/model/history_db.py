@@ -0,0 +1,224 @@
+from __future__ import annotations
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from ..const import DOMAIN
+from .data import PCAData
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DB_FILE = f"{DOMAIN}_history.db"
+# Finished measurements are buffered and inserted together after this delay (s)
+WRITE_DELAY_S = 5
+# Row cap of a single query (aggregates are computed in SQLite and are not capped)
+MAX_QUERY_ROWS = 10_000
+
+# One typed column per history field; entries without a field store NULL
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("ts", "REAL NOT NULL"),
+    ("effect", "REAL"),
+    ("baseline", "REAL"),
+    ("samples", "INTEGER"),
+    ("valid", "INTEGER"),
+    ("clamped", "INTEGER"),
+    ("strategy", "TEXT"),
+    ("sigma", "REAL"),
+    ("mad", "REAL"),
+    ("duration_s", "REAL"),
+    ("reason", "TEXT"),
+)
+_FIELDS = tuple(name for name, _ in COLUMNS)
+
+
+def history_row(circuit: str, entry: dict) -> Optional[tuple]:
+    """(circuit, *COLUMNS) of a measure_history entry; None without a parseable timestamp."""
+    ts = dt_util.parse_datetime(str(entry.get("ts") or ""))
+    if ts is None:
+        return None
+    row: List[Any] = [circuit, ts.timestamp()]
+    for name in _FIELDS[1:]:
+        value = entry.get(name)
+        row.append(int(value) if isinstance(value, bool) else value)
+    return tuple(row)
+
+
+class HistoryDB:
+    """Append-only SQLite table of finished measurements, one row per measurement.
+
+    Blocking: every method runs in the executor. Queries filter on the (circuit, ts)
+    index and aggregate inside SQLite, so only the requested rows or buckets reach
+    Python, never the whole history.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            cols = ", ".join(f"{name} {kind}" for name, kind in COLUMNS)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS effects (circuit TEXT NOT NULL, {cols})")
+            conn.execute("CREATE INDEX IF NOT EXISTS effects_circuit_ts ON effects (circuit, ts)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def append(self, rows: List[tuple]) -> None:
+        if not rows:
+            return
+        marks = ", ".join("?" for _ in range(len(COLUMNS) + 1))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(f"INSERT INTO effects (circuit, {', '.join(_FIELDS)}) VALUES ({marks})", rows)
+
+    @staticmethod
+    def _where(circuit: Optional[str], start: Optional[float], end: Optional[float]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        args: List[Any] = []
+        if circuit:
+            clauses.append("circuit = ?")
+            args.append(circuit)
+        if start is not None:
+            clauses.append("ts >= ?")
+            args.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            args.append(end)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, circuit: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None, limit: int = 1000) -> List[dict]:
+        """Rows in [start, end), oldest first, at most limit (capped at MAX_QUERY_ROWS)."""
+        where, args = self._where(circuit, start, end)
+        limit = max(1, min(MAX_QUERY_ROWS, int(limit)))
+        with self._lock:
+            cur = self._connect().execute(
+                f"SELECT circuit, {', '.join(_FIELDS)} FROM effects{where} ORDER BY ts LIMIT ?", [*args, limit]
+            )
+            names = ["circuit", *_FIELDS]
+            return [dict(zip(names, row)) for row in cur]
+
+    def aggregate(
+        self, circuit: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None, bucket_s: Optional[float] = None
+    ) -> List[dict]:
+        """count/mean/min/max/std of the effect per circuit, per time bucket of bucket_s if given.
+
+        The spread is summed around each group's mean (second pass in SQLite), which stays
+        exact for large effects with a small spread, unlike E[x²] - mean².
+        """
+        where, args = self._where(circuit, start, end)
+        bucket = "CAST(ts / ? AS INTEGER) * ?" if bucket_s else "NULL"
+        bargs: List[Any] = [bucket_s, bucket_s] if bucket_s else []
+        sql = (
+            f"WITH g AS (SELECT circuit, {bucket} AS bucket, effect, ts FROM effects{where}),"
+            " m AS (SELECT circuit, bucket, AVG(effect) AS mean FROM g GROUP BY circuit, bucket)"
+            " SELECT g.circuit, g.bucket, COUNT(g.effect), m.mean, MIN(g.effect), MAX(g.effect),"
+            " SUM((g.effect - m.mean) * (g.effect - m.mean)), MIN(g.ts), MAX(g.ts)"
+            " FROM g JOIN m ON g.circuit = m.circuit AND g.bucket IS m.bucket"
+            " GROUP BY g.circuit, g.bucket ORDER BY g.circuit, g.bucket"
+        )
+        with self._lock:
+            rows = self._connect().execute(sql, [*bargs, *args]).fetchall()
+        out = []
+        for cid, b, n, mean, mn, mx, ss, first, last in rows:
+            var = (ss or 0.0) / n if n else 0.0
+            out.append({
+                "circuit": cid,
+                "bucket": b,
+                "count": n,
+                "mean": mean,
+                "min": mn,
+                "max": mx,
+                "std": var ** 0.5,
+                "first": first,
+                "last": last,
+            })
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EffectHistory:
+    """Long-term history of finished measurements in HISTORY_DB_FILE (config dir).
+
+    measure_history stays the in-memory index of the most recent history_size entries per
+    circuit; with long_term_history enabled every finished measurement is also appended
+    here. Rows are buffered on the event loop and inserted in one executor job
+    WRITE_DELAY_S later; the database is opened on first use.
+    """
+
+    def __init__(self, hass: HomeAssistant, data: PCAData, path: Optional[str] = None) -> None:
+        self.hass = hass
+        self.data = data
+        self.db = HistoryDB(path or hass.config.path(HISTORY_DB_FILE))
+        self._pending: List[tuple] = []
+        self._unsub_flush: Optional[Callable[[], None]] = None
+        self._unsub_event: Optional[Callable[[], None]] = None
+
+    @callback
+    def async_listen(self) -> None:
+        self._unsub_event = self.hass.bus.async_listen(f"{DOMAIN}.measure_finished", self._on_measure_finished)
+
+    @callback
+    def _on_measure_finished(self, event: Event) -> None:
+        if not self.data.long_term_history:
+            return
+        cid = event.data.get("circuit_id")
+        hist = self.data.measure_history.get(cid) if cid else None
+        if hist:
+            self.async_record(cid, hist[-1])
+
+    @callback
+    def async_record(self, circuit: str, entry: dict) -> None:
+        row = history_row(circuit, entry)
+        if row is None:
+            return
+        self._pending.append(row)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, WRITE_DELAY_S, self._flush_later)
+
+    @callback
+    def _flush_later(self, _now: Any) -> None:
+        self._unsub_flush = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        try:
+            await self.hass.async_add_executor_job(self.db.append, rows)
+        except Exception:
+            _LOGGER.exception("Failed to write %d rows to the long-term history", len(rows))
+
+    async def async_query(self, **kwargs: Any) -> List[dict]:
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(lambda: self.db.query(**kwargs))
+
+    async def async_aggregate(self, **kwargs: Any) -> List[dict]:
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(lambda: self.db.aggregate(**kwargs))
+
+    async def async_close(self) -> None:
+        """Stop listening, write buffered rows and close the database."""
+        if self._unsub_event is not None:
+            self._unsub_event()
+            self._unsub_event = None
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        await self.async_flush()
+        await self.hass.async_add_executor_job(self.db.close)
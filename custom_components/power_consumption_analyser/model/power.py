@@ -0,0 +1,215 @@
+from __future__ import annotations
+from math import fsum
+from typing import Callable, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .state_cache import StateValueCache
+
+# (dimension, key, weight) a meter contributes to, e.g. ("circuit", "2F7", 1.0)
+GroupRef = Tuple[str, str, float]
+
+
+class PowerAggregator:
+    """Running tracked/untracked power totals shared by all power sensors and measurements.
+
+    Keeps the last parsed value per meter and applies only the delta when one meter
+    changes, so an update is O(1) and tracked/untracked/coverage/ratio reads are O(1)
+    regardless of how many meters are linked or labelled.
+
+    Unavailable meters count as 0 W but are kept in a live set together with their
+    last known value, so outages are visible instead of silently inflating untracked.
+
+    Optional sub-totals (per circuit, RCD group, phase, ...) are maintained from the
+    same delta via set_groups().
+    """
+
+    # Recompute the running total exactly every N delta updates to bound float drift
+    RESUM_EVERY = 10000
+
+    def __init__(self, cache: Optional[StateValueCache] = None) -> None:
+        self.cache: StateValueCache = cache if cache is not None else StateValueCache()
+        self.home_entity: Optional[str] = None
+        self.home_w: float = 0.0
+        self._values: Dict[str, float] = {}
+        self._total: float = 0.0
+        self._updates: int = 0
+        self._unavailable: Set[str] = set()
+        self._last_known: Dict[str, float] = {}
+        self._groups: Dict[str, Tuple[GroupRef, ...]] = {}
+        self._subtotals: Dict[str, Dict[str, float]] = {}
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def entity_ids(self) -> Set[str]:
+        """All entities the aggregator depends on (meters plus home sensor)."""
+        ids = set(self._values)
+        if self.home_entity:
+            ids.add(self.home_entity)
+        return ids
+
+    def set_home(self, entity_id: Optional[str], state=None) -> None:
+        self.home_entity = entity_id or None
+        self.home_w = self.cache.value(entity_id, state) if entity_id else 0.0
+
+    def add_meter(self, entity_id: str, state=None) -> bool:
+        if entity_id in self._values:
+            return False
+        parsed = self.cache.get(entity_id, state)
+        self._set_available(entity_id, parsed.available, parsed.value)
+        self._values[entity_id] = parsed.value
+        self._total += parsed.value
+        self._apply_groups(entity_id, parsed.value)
+        return True
+
+    def remove_meter(self, entity_id: str) -> bool:
+        v = self._values.pop(entity_id, None)
+        if v is None:
+            return False
+        if entity_id != self.home_entity:
+            self.cache.discard(entity_id)
+        self._unavailable.discard(entity_id)
+        self._last_known.pop(entity_id, None)
+        self._total -= v
+        self._apply_groups(entity_id, -v)
+        return True
+
+    def sync_meters(self, meter_ids: Iterable[str], get_state: Callable[[str], object]) -> bool:
+        """Align the tracked meter set with meter_ids; only added meters are read. Returns True if changed."""
+        wanted = set(meter_ids)
+        current = set(self._values)
+        removed = current - wanted
+        added = wanted - current
+        for eid in removed:
+            self.remove_meter(eid)
+        for eid in added:
+            self.add_meter(eid, get_state(eid))
+        if removed or added:
+            self.resum()
+            return True
+        return False
+
+    def update(self, entity_id: str, state) -> bool:
+        """Apply a new state for a meter or the home sensor. Returns True if the entity is tracked.
+
+        Idempotent: applying the same state twice leaves the totals unchanged.
+        """
+        handled = False
+        if entity_id == self.home_entity:
+            self.home_w = self.cache.value(entity_id, state)
+            handled = True
+        old = self._values.get(entity_id)
+        if old is not None:
+            parsed = self.cache.get(entity_id, state)
+            self._set_available(entity_id, parsed.available, parsed.value)
+            new = parsed.value
+            if new != old:
+                self._values[entity_id] = new
+                self._total += new - old
+                self._apply_groups(entity_id, new - old)
+                self._updates += 1
+                if self._updates >= self.RESUM_EVERY:
+                    self.resum()
+            handled = True
+        return handled
+
+    def _set_available(self, entity_id: str, available: bool, value: float) -> None:
+        if available:
+            self._last_known[entity_id] = value
+            self._unavailable.discard(entity_id)
+        else:
+            self._unavailable.add(entity_id)
+
+    def set_groups(self, groups: Mapping[str, Sequence[GroupRef]]) -> bool:
+        """Replace the meter -> sub-total assignment. Returns True if it changed."""
+        new = {eid: tuple(refs) for eid, refs in groups.items() if refs}
+        if new == self._groups:
+            return False
+        self._groups = new
+        self.resum()
+        return True
+
+    def _apply_groups(self, entity_id: str, delta: float) -> None:
+        refs = self._groups.get(entity_id)
+        if not refs or not delta:
+            return
+        for dim, key, weight in refs:
+            bucket = self._subtotals.setdefault(dim, {})
+            bucket[key] = bucket.get(key, 0.0) + delta * weight
+
+    def resum(self) -> None:
+        """Recompute the running total and sub-totals exactly from the per-meter values."""
+        self._total = fsum(self._values.values())
+        parts: Dict[str, Dict[str, List[float]]] = {}
+        for eid, refs in self._groups.items():
+            v = self._values.get(eid)
+            if v is None:
+                continue
+            for dim, key, weight in refs:
+                parts.setdefault(dim, {}).setdefault(key, []).append(v * weight)
+        self._subtotals = {dim: {key: fsum(vals) for key, vals in bucket.items()} for dim, bucket in parts.items()}
+        self._updates = 0
+
+    def group_keys(self, entity_id: str, dim: str) -> List[str]:
+        """Sub-total keys of one dimension a meter contributes to (e.g. its circuit)."""
+        return [key for d, key, _ in self._groups.get(entity_id, ()) if d == dim]
+
+    def subtotal(self, dim: str, key: str) -> float:
+        return self._subtotals.get(dim, {}).get(key, 0.0)
+
+    def subtotals(self, dim: str) -> Dict[str, float]:
+        """Copy of the running sub-totals of one dimension (key -> W)."""
+        return dict(self._subtotals.get(dim, {}))
+
+    def value(self, entity_id: str) -> Optional[float]:
+        return self._values.get(entity_id)
+
+    @property
+    def unavailable_count(self) -> int:
+        return len(self._unavailable)
+
+    def unavailable_ids(self) -> List[str]:
+        return sorted(self._unavailable)
+
+    def last_known(self, entity_id: str) -> Optional[float]:
+        """Last available value of a meter (None if never seen available)."""
+        return self._last_known.get(entity_id)
+
+    def outages(self, min_w: float = 0.0, exclude: Collection[str] = ()) -> Dict[str, float]:
+        """Unavailable meters whose last known value is >= min_w, mapped to that value."""
+        if not self._unavailable:
+            return {}
+        out: Dict[str, float] = {}
+        for eid in self._unavailable:
+            if eid in exclude:
+                continue
+            w = self._last_known.get(eid, 0.0)
+            if w >= min_w:
+                out[eid] = w
+        return out
+
+    @property
+    def tracked(self) -> float:
+        return self._total
+
+    @property
+    def untracked(self) -> float:
+        val = self.home_w - self._total
+        return val if val >= 0 else 0.0
+
+    @property
+    def coverage(self) -> float:
+        """Tracked share of home power in percent (0 when home is 0 or unavailable)."""
+        if self.home_w <= 0:
+            return 0.0
+        return (self._total / self.home_w) * 100.0
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Tracked/untracked ratio, None when untracked is 0."""
+        untracked = self.untracked
+        if untracked <= 0:
+            return None
+        return self._total / untracked
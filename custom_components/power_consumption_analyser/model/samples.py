@@ -0,0 +1,173 @@
+from __future__ import annotations
+from array import array
+from math import ceil
+from typing import Iterator, List, Optional, Tuple
+
+# Initial sizing for event-driven sampling, where the rate is not known up front
+EVENT_RATE_HINT_HZ = 2.0
+# Hard cap per window (8 MB of doubles); beyond it the oldest samples are overwritten
+MAX_SAMPLES = 1_000_000
+# Always-on history of untracked power between measurements (ON windows): 10 min at 1 Hz
+UNTRACKED_HISTORY_S = 600
+UNTRACKED_HISTORY_HZ = 1.0
+
+
+def buffer_capacity(duration_s: float, rate_hz: float) -> int:
+    return max(16, min(MAX_SAMPLES, int(ceil(max(0.0, duration_s) * max(0.0, rate_hz))) + 1))
+
+
+class SampleBuffer:
+    """Compact columnar buffer of (timestamp, value) doubles for one measurement window.
+
+    Preallocated from the expected window size, grows by doubling up to MAX_SAMPLES and
+    then acts as a ring (oldest samples dropped from both columns). view() and times()
+    expose values and timestamps in arrival order as zero-copy memoryviews for the
+    strategies.
+    """
+
+    __slots__ = ("_buf", "_t", "_n", "_start", "_timed")
+
+    def __init__(self, capacity: int = 64) -> None:
+        cap = max(1, int(capacity))
+        self._buf = array("d", bytes(8 * cap))
+        self._t = array("d", bytes(8 * cap))
+        self._n = 0
+        self._start = 0  # index of the oldest sample once wrapped
+        self._timed = True  # every sample so far came with a timestamp
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.view())
+
+    def append(self, value: float, t: Optional[float] = None) -> None:
+        """Add a sample; t is its timestamp (s), needed for time-weighted strategies."""
+        if t is None:
+            self._timed = False
+            t = 0.0
+        cap = len(self._buf)
+        if self._n < cap:
+            i = (self._start + self._n) % cap
+            self._buf[i] = value
+            self._t[i] = t
+            self._n += 1
+            return
+        if cap < MAX_SAMPLES:
+            self._linearize()
+            grow = bytes(8 * min(cap, MAX_SAMPLES - cap))
+            self._buf.frombytes(grow)
+            self._t.frombytes(grow)
+            self._buf[self._n] = value
+            self._t[self._n] = t
+            self._n += 1
+            return
+        self._buf[self._start] = value
+        self._t[self._start] = t
+        self._start = (self._start + 1) % cap
+
+    def view(self) -> memoryview:
+        """Samples in arrival order without copying (release the view before appending)."""
+        self._linearize()
+        return memoryview(self._buf)[: self._n]
+
+    def times(self) -> Optional[memoryview]:
+        """Timestamps aligned with view(), zero-copy; None unless every sample has one."""
+        if not self._timed:
+            return None
+        self._linearize()
+        return memoryview(self._t)[: self._n]
+
+    def tolist(self) -> List[float]:
+        return list(self.view())
+
+    def clear(self) -> None:
+        self._n = 0
+        self._start = 0
+        self._timed = True
+
+    def _linearize(self) -> None:
+        if self._start:
+            s = self._start
+            self._buf[:] = self._buf[s:] + self._buf[:s]
+            self._t[:] = self._t[s:] + self._t[:s]
+            self._start = 0
+
+
+class SampleBufferPool:
+    """Recycles released buffers so repeated measurements do not reallocate.
+
+    Oversized buffers (above max_capacity) are dropped instead of pooled.
+    """
+
+    def __init__(self, keep: int = 4, max_capacity: int = 65536) -> None:
+        self.keep = keep
+        self.max_capacity = max_capacity
+        self._free: List[SampleBuffer] = []
+
+    def acquire(self, capacity: int) -> SampleBuffer:
+        for i, buf in enumerate(self._free):
+            if buf.capacity >= capacity:
+                return self._free.pop(i)
+        return SampleBuffer(capacity)
+
+    def release(self, buf: SampleBuffer) -> None:
+        buf.clear()
+        if len(self._free) < self.keep and buf.capacity <= self.max_capacity:
+            self._free.append(buf)
+
+
+class TimedRing:
+    """Fixed-size ring of (timestamp, value) pairs; the oldest pair is overwritten.
+
+    Holds the recent untracked power between measurements (ON windows).
+    """
+
+    __slots__ = ("_t", "_v", "_n", "_head")
+
+    def __init__(self, capacity: int) -> None:
+        cap = max(1, int(capacity))
+        self._t = array("d", bytes(8 * cap))
+        self._v = array("d", bytes(8 * cap))
+        self._n = 0
+        self._head = 0  # next write position
+
+    @property
+    def capacity(self) -> int:
+        return len(self._v)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, t: float, value: float) -> None:
+        self._t[self._head] = t
+        self._v[self._head] = value
+        self._head = (self._head + 1) % len(self._v)
+        self._n = min(self._n + 1, len(self._v))
+
+    def last_time(self) -> Optional[float]:
+        return self._t[self._head - 1] if self._n else None
+
+    def since(self, t0: float) -> array:
+        """Values with timestamp >= t0 in arrival order (a copy, newest last)."""
+        return self.window(t0)[1]
+
+    def window(self, t0: float) -> Tuple[array, array]:
+        """(timestamps, values) of the pairs with timestamp >= t0, oldest first."""
+        cap = len(self._v)
+        k = 0
+        while k < self._n and self._t[(self._head - 1 - k) % cap] >= t0:
+            k += 1
+        start = (self._head - k) % cap
+        if start + k <= cap:
+            return self._t[start : start + k], self._v[start : start + k]
+        wrap = start + k - cap
+        return self._t[start:] + self._t[:wrap], self._v[start:] + self._v[:wrap]
+
+    def clear(self) -> None:
+        self._n = 0
+        self._head = 0
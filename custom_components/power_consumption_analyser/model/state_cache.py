@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import Dict, NamedTuple, Optional, Tuple
+
+UNAVAILABLE_STATES = ("unknown", "unavailable")
+
+# Scale factors to watts by unit_of_measurement; unknown/missing units are taken as W
+UNIT_TO_W = {
+    "W": 1.0,
+    "kW": 1000.0,
+    "MW": 1000000.0,
+    "mW": 0.001,
+}
+
+
+class ParsedState(NamedTuple):
+    value: float  # in W, 0.0 when unavailable
+    available: bool
+    unit: Optional[str]
+
+
+UNAVAILABLE = ParsedState(0.0, False, None)
+
+
+def parse_state(state) -> ParsedState:
+    """Parse a State into watts, resolving the unit once.
+
+    Only a missing state or unknown/unavailable counts as unavailable; any other
+    non-numeric state reads as 0 W but available.
+    """
+    if state is None or state.state in UNAVAILABLE_STATES:
+        return UNAVAILABLE
+    unit = None
+    try:
+        unit = state.attributes.get("unit_of_measurement")
+    except Exception:
+        pass
+    try:
+        raw = float(state.state)
+    except Exception:
+        return ParsedState(0.0, True, unit)
+    return ParsedState(raw * UNIT_TO_W.get(unit, 1.0), True, unit)
+
+
+class StateValueCache:
+    """Per-entity cache of parsed values keyed on State identity.
+
+    HA replaces the State object on every change, so an identical object means the
+    value is unchanged and is never parsed again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[object, ParsedState]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, entity_id: str, state) -> ParsedState:
+        cached = self._entries.get(entity_id)
+        if cached is not None and cached[0] is state:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        parsed = parse_state(state)
+        self._entries[entity_id] = (state, parsed)
+        return parsed
+
+    def value(self, entity_id: str, state) -> float:
+        return self.get(entity_id, state).value
+
+    def discard(self, entity_id: str) -> None:
+        self._entries.pop(entity_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import logging
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.storage import Store
+
+from ..const import DOMAIN
+from .data import PCAData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Schema of the stored measurements; bump and convert in _PCAStore on changes
+STORAGE_VERSION = 1
+STORAGE_MINOR_VERSION = 2
+STORAGE_KEY = f"{DOMAIN}.measurements"
+# Changes within this many seconds are written together
+SAVE_DELAY_S = 10
+
+# PCAData attributes that survive a restart (all JSON-serializable dicts)
+PERSISTED = (
+    "measure_results",
+    "measure_clamped",
+    "measure_valid",
+    "measure_reason",
+    "measure_stats",
+    "measure_effects",
+    "measure_baseline",
+    "measure_history",
+    "settle_prior",
+)
+# Raw sample windows (dicts of array("d")), stored as lists so re-evaluation and
+# confidence intervals work after a restart; added in minor version 2
+PERSISTED_WINDOWS = (
+    "measure_windows",
+    "measure_on_windows",
+    "measure_window_times",
+)
+# Signals and events after which the persisted state may have changed
+_SIGNALS = (f"{DOMAIN}_measure_state", f"{DOMAIN}_effects_changed", f"{DOMAIN}_workflow_state")
+_EVENTS = (f"{DOMAIN}.measure_finished",)
+
+
+class _PCAStore(Store[Dict[str, Any]]):
+    async def _async_migrate_func(self, old_major_version: int, old_minor_version: int, old_data: Dict[str, Any]) -> Dict[str, Any]:
+        # 1.1 -> 1.2 only adds PERSISTED_WINDOWS; data without them loads as is
+        return old_data
+
+
+def _copy(value: Any) -> Any:
+    # Per-circuit dicts and history entries are copied (CI keys are merged into them later)
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class MeasurementStore:
+    """Measurement results and history persisted through Home Assistant's Store.
+
+    A snapshot (copies of the containers, not the numbers; sample windows as lists) is
+    taken on the event loop whenever results change; async_delay_save coalesces changes within SAVE_DELAY_S into
+    one write, and Store serializes and writes the JSON in the executor. Pending changes
+    are flushed on unload and at Home Assistant's final write.
+    """
+
+    def __init__(self, hass: HomeAssistant, data: PCAData) -> None:
+        self.hass = hass
+        self.data = data
+        self._store = _PCAStore(hass, STORAGE_VERSION, STORAGE_KEY, minor_version=STORAGE_MINOR_VERSION)
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._unsubs: List[Callable[[], None]] = []
+
+    async def async_load(self) -> bool:
+        """Restore the persisted attributes into data; False when nothing was stored."""
+        try:
+            stored = await self._store.async_load()
+        except Exception:
+            _LOGGER.exception("Failed to load stored measurements")
+            return False
+        if not isinstance(stored, dict):
+            return False
+        for attr in PERSISTED:
+            value = stored.get(attr)
+            if isinstance(value, dict):
+                getattr(self.data, attr).update(value)
+        for attr in PERSISTED_WINDOWS:
+            value = stored.get(attr)
+            if isinstance(value, dict):
+                getattr(self.data, attr).update(
+                    {cid: array("d", samples) for cid, samples in value.items() if isinstance(samples, list)}
+                )
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        snap = {attr: _copy(getattr(self.data, attr)) for attr in PERSISTED}
+        for attr in PERSISTED_WINDOWS:
+            snap[attr] = {cid: list(samples) for cid, samples in getattr(self.data, attr).items()}
+        return snap
+
+    @callback
+    def async_schedule_save(self, *_args: Any) -> None:
+        self._snapshot = self.snapshot()
+        self._store.async_delay_save(self._pending, SAVE_DELAY_S)
+
+    def _pending(self) -> Dict[str, Any]:
+        # Called by Store on the event loop when the delay expires (and at the final
+        # write); returns the snapshot taken when the change was scheduled
+        return self._snapshot if self._snapshot is not None else {}
+
+    @callback
+    def async_listen(self) -> None:
+        for signal in _SIGNALS:
+            self._unsubs.append(async_dispatcher_connect(self.hass, signal, self.async_schedule_save))
+        for event in _EVENTS:
+            self._unsubs.append(self.hass.bus.async_listen(event, self.async_schedule_save))
+
+    async def async_unload(self) -> None:
+        """Stop listening and write pending changes now."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        if self._snapshot is not None:
+            await self._store.async_save(self.snapshot())
@@ -2,9 +2,11 @@ from __future__ import annotations
 from homeassistant.core import HomeAssistant
 from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from .const import DOMAIN, OPT_MEASURE_DURATION_S, OPT_MIN_EFFECT_W, OPT_MIN_SAMPLES
 from .const import OPT_TRIM_FRACTION, OPT_PRE_WAIT_S, OPT_DISCARD_FIRST_N
 from .model import PCAData
+from .measurement import rederive_effects, schedule_effect_ci
 
 NAME = "Measure Duration"
 UNIT = "s"
@@ -167,6 +169,11 @@ class TrimFractionNumber(NumberEntity):
             opts = dict(entry.options)
             opts[OPT_TRIM_FRACTION] = new_val
             self.hass.config_entries.async_update_entry(entry, options=opts)
+        # Re-evaluate kept OFF windows with the new trim
+        changed = rederive_effects(self._data, reevaluate=True)
+        if changed:
+            schedule_effect_ci(self.hass, self._data, changed)
+            async_dispatcher_send(self.hass, f"{DOMAIN}_effects_changed")
         self.async_write_ha_state()
 
 class PreWaitNumber(NumberEntity):
@@ -3,14 +3,23 @@ from typing import List
 from homeassistant.components.select import SelectEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from .const import DOMAIN, OPT_EFFECT_STRATEGY
 from .model import PCAData
+from .measurement import rederive_effects, schedule_effect_ci
 
 OPTIONS = [
     ("average", "Average"),
     ("median", "Median"),
     ("trimmed_mean", "Trimmed Mean"),
     ("median_of_means", "Median of Means"),
+    ("huber", "Huber M-Estimator"),
+    ("tukey", "Tukey Biweight"),
+    ("hodges_lehmann", "Hodges-Lehmann"),
+    ("exponential", "Exponential Fit"),
+    ("tw_average", "Time-weighted Average"),
+    ("tw_median", "Time-weighted Median"),
+    ("tw_trimmed_mean", "Time-weighted Trimmed Mean"),
 ]
 
 class EffectStrategySelect(SelectEntity):
@@ -56,6 +65,11 @@ class EffectStrategySelect(SelectEntity):
         idx = self._options.index(option)
         self._current_key = self._keys[idx]
         self._data.effect_strategy = self._current_key
+        # Past measurements switch to the cached effect of the new strategy
+        changed = rederive_effects(self._data)
+        if changed:
+            schedule_effect_ci(self.hass, self._data, changed)
+            async_dispatcher_send(self.hass, f"{DOMAIN}_effects_changed")
         # Persist to options
         entry = getattr(self.hass.data.get(DOMAIN), "config_entry", None)
         if entry:
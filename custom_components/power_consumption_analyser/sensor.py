@@ -15,6 +15,7 @@ from .sensors.unavailable_meter_count import UnavailableMeterCountSensor
 from .sensors.analysis_status import AnalysisStatusSensor
 from .sensors.measurement_status import MeasurementStatusSensor
 from .sensors.circuit_effect import CircuitEffectSensor
+from .sensors.circuit_power import CircuitTrackedPowerSensor
 from .sensors.summary_effect import SummaryEffectSensor
 from .sensors.workflow_progress import WorkflowProgressSensor
 from .sensors.rcd_layout import RCDLayoutSensor
@@ -36,6 +37,7 @@ async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
     ]
     for cid in data.circuits.keys():
         entities.append(CircuitEffectSensor(data, cid))
+        entities.append(CircuitTrackedPowerSensor(data, cid))
     entities.append(MeasurementStatusSensor(data))
     entities.append(SummaryEffectSensor(data))
     entities.append(WorkflowProgressSensor(data))
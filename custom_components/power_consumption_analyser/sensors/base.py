@@ -1,8 +1,14 @@
 from __future__ import annotations
+import time
+from typing import Callable, Optional
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from ..const import DOMAIN
 from ..model import PCAData
+from .publish import PublishThrottle, WRITE, DEFER
 
 class BasePCASensor(SensorEntity):
     _attr_has_entity_name = True
@@ -15,3 +21,76 @@ class BasePCASensor(SensorEntity):
             manufacturer="Custom",
         )
 
+class BasePowerSensor(BasePCASensor):
+    """Sensor derived from data.power; refreshed by the shared power_state signal.
+
+    State writes go through the configured publish policy (max rate, W/% deadband).
+    Deadbands apply to continuous power readings only (_publish_deadband); changed
+    attributes or availability are always published, rate-limited like the value.
+    """
+
+    _publish_deadband = True
+    # Counters change on every write: recording them would store new attributes each time
+    _unrecorded_attributes = frozenset({"publish_emitted", "publish_suppressed"})
+
+    def __init__(self, data: PCAData):
+        super().__init__(data)
+        self._home_entity: Optional[str] = data.baseline_sensors.get("home_consumption") if data.baseline_sensors else None
+        self._throttle = PublishThrottle()
+        self._unsub_flush: Optional[Callable[[], None]] = None
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {
+            "publish_emitted": self._throttle.emitted,
+            "publish_suppressed": self._throttle.suppressed,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        @callback
+        def _on_power_state(entity_id: Optional[str]):
+            # Meter set changes (entity_id None) bypass the policy
+            self._async_publish(force=entity_id is None)
+        self.async_on_remove(async_dispatcher_connect(self.hass, self._power_signal, _on_power_state))
+        self.async_on_remove(self._cancel_flush)
+
+    @property
+    def _publishes_watts(self) -> bool:
+        return self.native_unit_of_measurement == "W"
+
+    @property
+    def _power_signal(self) -> str:
+        return f"{DOMAIN}_power_state"
+
+    @callback
+    def _async_publish(self, force: bool = False) -> None:
+        data = self.data
+        rate = float(getattr(data, "publish_max_rate", 0) or 0)
+        # Watt deadband only makes sense for W sensors; the percent deadband is relative
+        db_w = float(getattr(data, "publish_deadband_w", 0) or 0) if self._publish_deadband and self._publishes_watts else 0.0
+        db_pct = float(getattr(data, "publish_deadband_pct", 0) or 0) if self._publish_deadband else 0.0
+        now = time.monotonic()
+        decision = self._throttle.offer(self.native_value, now, rate, db_w, db_pct, force=force, attrs=self._publish_attrs())
+        if decision == WRITE:
+            self._cancel_flush()
+            self.async_write_ha_state()
+        elif decision == DEFER and self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, self._throttle.flush_delay(now, rate), self._async_flush)
+
+    @callback
+    def _async_flush(self, _now) -> None:
+        self._unsub_flush = None
+        if self._throttle.flush(self.native_value, time.monotonic(), self._publish_attrs()):
+            self.async_write_ha_state()
+
+    def _publish_attrs(self) -> dict:
+        # What the policy compares besides the value; its own counters are left out
+        attrs = {k: v for k, v in self.extra_state_attributes.items() if not k.startswith("publish_")}
+        attrs["available"] = self.available
+        return attrs
+
+    @callback
+    def _cancel_flush(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
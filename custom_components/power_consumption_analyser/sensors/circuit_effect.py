@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional
 from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from ..const import DOMAIN
 from ..model import PCAData
 from .base import BasePCASensor
@@ -45,7 +46,22 @@ class CircuitEffectSensor(BasePCASensor):
         mn = round(min(effects), 2) if effects else 0.0
         mx = round(max(effects), 2) if effects else 0.0
         stats = getattr(self.data, "measure_stats", {}).get(self._circuit_id, {})
+        effects = self.data.measure_effects.get(self._circuit_id)
+        if effects:
+            # Effect of the last window under every strategy
+            attrs["effects"] = {k: round(v, 2) for k, v in effects.items()}
+        if stats.get("ci_strategy") == self.data.effect_strategy:
+            if "ci_low" in stats:
+                # Bootstrap confidence interval of the last effect (only for the selected strategy)
+                attrs.update({k: stats[k] for k in ("ci_low", "ci_high", "ci_method", "ci_confidence", "ci_strategy")})
+            elif stats.get("ci_supported") is False:
+                attrs.update({"ci_supported": False, "ci_strategy": stats["ci_strategy"]})
+        live = getattr(self.data, "measure_live", {}).get(self._circuit_id)
+        if live:
+            # Running estimate while this circuit is being measured
+            attrs.update({f"running_{k}": v for k, v in live.items()})
         return {
+            **attrs,
             "history_size": len(hist),
             "history_max": self.data.measure_history_max,
             "avg_effect": avg,
@@ -64,3 +80,15 @@ class CircuitEffectSensor(BasePCASensor):
             if event.data.get("circuit_id") == self._circuit_id:
                 self.async_schedule_update_ha_state()
         self.async_on_remove(self.hass.bus.async_listen(f"{DOMAIN}.measure_finished", _on_measure_finished))
+
+        @callback
+        def _on_live_effect(circuit_id):
+            if circuit_id == self._circuit_id:
+                self.async_write_ha_state()
+        self.async_on_remove(async_dispatcher_connect(self.hass, f"{DOMAIN}_live_effect", _on_live_effect))
+
+        @callback
+        def _on_effects_changed():
+            if self._circuit_id in self.data.measure_effects:
+                self.async_write_ha_state()
+        self.async_on_remove(async_dispatcher_connect(self.hass, f"{DOMAIN}_effects_changed", _on_effects_changed))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+from ..const import DOMAIN
+from ..model import PCAData
+from .base import BasePowerSensor
+
+class CircuitTrackedPowerSensor(BasePowerSensor):
+    """Live tracked power of one circuit's meters (running sub-total, no rescan).
+
+    Refreshed by its own circuit's power signal only, not by every meter event.
+    """
+    _attr_native_unit_of_measurement = "W"
+
+    def __init__(self, data: PCAData, circuit_id: str):
+        super().__init__(data)
+        self._circuit_id = circuit_id
+        self._attr_name = f"Circuit {circuit_id} Tracked Power"
+
+    @property
+    def unique_id(self) -> str:
+        return f"{DOMAIN}_circuit_{self._circuit_id.lower()}_tracked_power"
+
+    @property
+    def native_value(self) -> float:
+        return round(self.data.power.subtotal("circuit", self._circuit_id), 2)
+
+    @property
+    def _power_signal(self) -> str:
+        return f"{DOMAIN}_power_state_{self._circuit_id}"
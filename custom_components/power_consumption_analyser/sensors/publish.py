@@ -0,0 +1,88 @@
+from __future__ import annotations
+from typing import Any, Optional
+
+WRITE = "write"
+DEFER = "defer"
+SKIP = "skip"
+
+
+class PublishThrottle:
+    """Per-sensor publish policy: cap writes per second and skip changes inside a deadband.
+
+    offer() decides what to do with a new value: WRITE now, DEFER to the end of the
+    current rate window (caller arms a timer and calls flush()), or SKIP because the
+    change is inside the deadband. Deferred values are never lost: flush() always
+    publishes the latest value at the end of the window.
+
+    attrs (attributes and availability) are compared with the published ones: numbers
+    through the same deadband, anything else (ids, flags, lists) on any change, so a
+    change there is published even when the state value did not move.
+    """
+
+    def __init__(self) -> None:
+        self.last_value: Optional[float] = None
+        self.last_attrs: Optional[dict] = None
+        self.last_write: Optional[float] = None
+        self.pending: bool = False
+        self.emitted: int = 0
+        self.suppressed: int = 0
+
+    def offer(self, value: Optional[float], now: float, max_rate: float = 0.0,
+              deadband_abs: float = 0.0, deadband_pct: float = 0.0, force: bool = False,
+              attrs: Optional[dict] = None) -> str:
+        if force or self.last_write is None or value is None or self.last_value is None:
+            return self._write(value, now, attrs)
+        if not (_changed(self.last_value, value, deadband_abs, deadband_pct)
+                or _changed(self.last_attrs, attrs, deadband_abs, deadband_pct)):
+            # Back inside the deadband of the published value: nothing left to flush
+            self.pending = False
+            self.suppressed += 1
+            return SKIP
+        if max_rate > 0 and now - self.last_write < 1.0 / max_rate:
+            self.pending = True
+            self.suppressed += 1
+            return DEFER
+        return self._write(value, now, attrs)
+
+    def flush_delay(self, now: float, max_rate: float) -> float:
+        """Seconds until the current rate window ends."""
+        if max_rate <= 0 or self.last_write is None:
+            return 0.0
+        return max(0.0, self.last_write + 1.0 / max_rate - now)
+
+    def flush(self, value: Optional[float], now: float, attrs: Optional[dict] = None) -> bool:
+        """End of window: publish the latest value if a write was deferred. Returns True to write."""
+        if not self.pending:
+            return False
+        self.pending = False
+        if value is not None and value == self.last_value and attrs == self.last_attrs:
+            return False
+        self._write(value, now, attrs)
+        return True
+
+    def _write(self, value: Optional[float], now: float, attrs: Optional[dict] = None) -> str:
+        self.last_value = value
+        self.last_attrs = attrs
+        self.last_write = now
+        self.pending = False
+        self.emitted += 1
+        return WRITE
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _changed(old: Any, new: Any, deadband_abs: float, deadband_pct: float) -> bool:
+    # Numbers (also inside dicts, e.g. per-phase subtotals) change beyond the deadband;
+    # everything else on any difference
+    if _is_number(old) and _is_number(new):
+        delta = abs(new - old)
+        return not (delta == 0 or delta < deadband_abs or (
+            deadband_pct > 0 and old != 0 and delta / abs(old) * 100.0 < deadband_pct
+        ))
+    if isinstance(old, dict) and isinstance(new, dict):
+        if old.keys() != new.keys():
+            return True
+        return any(_changed(old[k], new[k], deadband_abs, deadband_pct) for k in new)
+    return old != new
@@ -1,11 +1,19 @@
 from __future__ import annotations
-from typing import Dict, List
-from .base import BasePCASensor
+from typing import Dict, List, Optional
+from homeassistant.core import callback
+from .base import BasePowerSensor
 from ..const import DOMAIN
+from ..model import PCAData
+
+class RCDLayoutSensor(BasePowerSensor):
+    """RCD layout and workflow progress; load_w is published through the power policy."""
 
-class RCDLayoutSensor(BasePCASensor):
     _attr_name = "RCD Layout"
 
+    def __init__(self, data: PCAData):
+        super().__init__(data)
+        self._last_load: Optional[Dict[str, float]] = None
+
     @property
     def unique_id(self) -> str:
         return f"{DOMAIN}_rcd_layout"
@@ -14,22 +22,37 @@ class RCDLayoutSensor(BasePCASensor):
     def native_value(self) -> str:
         return "ready"
 
+    @property
+    def _publishes_watts(self) -> bool:
+        # The value is a label; the W deadband applies to the per-RCD loads
+        return True
+
+    def _load_w(self) -> Dict[str, float]:
+        loads = self.data.power.subtotals("rcd")
+        return {rcd: round(loads.get(rcd, 0.0), 1) for rcd in self.data.rcd_to_circuits}
+
     @property
     def extra_state_attributes(self) -> Dict[str, object]:
-        # Expose rcd list and mapping for dashboard
         rcds = list(self.data.rcd_to_circuits.keys())
         layout = {rcd: list(self.data.rcd_to_circuits.get(rcd, [])) for rcd in rcds}
-        # Progress for styling
         queue: List[str] = list(self.data.workflow_queue)
         idx = int(self.data.workflow_index or 0)
         done = queue[:idx] if queue else []
         remaining = queue[idx:] if queue else []
         current = remaining[0] if remaining else None
+        load = self._last_load if self._last_load is not None else self._load_w()
         return {
-            "rcds": rcds,
-            "layout": layout,
-            "done": done,
-            "remaining": remaining,
-            "current": current,
+            "rcds": rcds, "layout": layout, "done": done, "remaining": remaining, "current": current,
+            "load_w": load, **super().extra_state_attributes,
         }
 
+    async def async_added_to_hass(self) -> None:
+        self._last_load = self._load_w()
+        await super().async_added_to_hass()
+
+    @callback
+    def _async_publish(self, force: bool = False) -> None:
+        if not self.data.rcd_to_circuits:
+            return
+        self._last_load = self._load_w()
+        super()._async_publish(force)
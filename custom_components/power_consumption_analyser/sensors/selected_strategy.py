@@ -8,6 +8,13 @@ STRAT_NAMES = {
     "median": "Median",
     "trimmed_mean": "Trimmed Mean",
     "median_of_means": "Median of Means",
+    "huber": "Huber M-Estimator",
+    "tukey": "Tukey Biweight",
+    "hodges_lehmann": "Hodges-Lehmann",
+    "exponential": "Exponential Fit",
+    "tw_average": "Time-weighted Average",
+    "tw_median": "Time-weighted Median",
+    "tw_trimmed_mean": "Time-weighted Trimmed Mean",
 }
 
 class SelectedStrategySensor(BasePCASensor):
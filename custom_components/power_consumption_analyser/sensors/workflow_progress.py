@@ -31,6 +31,11 @@ class WorkflowProgressSensor(BasePCASensor):
             "done": done,
             "remaining": remaining,
             "current": current,
+            "mode": self.data.workflow_mode,
+            # "restore": the current step's circuits are back on and the second ON window is sampled
+            "phase": "restore" if current is not None and self.data.restore_circuit == current else "measure",
+            "groups": {k: list(v) for k, v in self.data.workflow_groups.items()},
+            "group_results": dict(self.data.group_results),
         }
 
     async def async_added_to_hass(self) -> None:
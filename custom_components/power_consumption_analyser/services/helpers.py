@@ -4,24 +4,31 @@ from homeassistant.core import HomeAssistant
 
 from ..const import DOMAIN
 from ..model import PCAData
+from ..model.state_cache import parse_state
 
 async def state_float(hass: HomeAssistant, entity_id: Optional[str]) -> float:
+    """Power of a home/grid sensor in W, parsed like the meters (0.0 when missing).
+
+    Only power units (kW, MW, mW) are scaled, so the step snapshot's home_w matches the
+    aggregator's home value; any other unit is returned as is.
+    """
     if not entity_id:
         return 0.0
     state = hass.states.get(entity_id)
-    try:
-        return float(state.state) if state else 0.0
-    except Exception:
-        return 0.0
+    data: Optional[PCAData] = hass.data.get(DOMAIN)
+    if isinstance(data, PCAData):
+        return data.state_cache.value(entity_id, state)
+    return parse_state(state).value
 
 async def calc_tracked_power(hass: HomeAssistant, data: PCAData) -> float:
+    """Sum of the circuit-mapped meters (meter_to_circuit) as in the step snapshots.
+
+    Label-only meters are not included, unlike data.power.tracked; values come from the
+    aggregator's per-meter cache instead of re-parsing states.
+    """
     total = 0.0
-    for eid in list(data.meter_to_circuit.keys()):
-        st = hass.states.get(eid)
-        try:
-            v = float(st.state) if st and st.state not in ("unknown", "unavailable") else 0.0
-        except Exception:
-            v = 0.0
-        total += v
+    for eid in data.meter_to_circuit:
+        v = data.power.value(eid)
+        total += v if v is not None else data.state_cache.value(eid, hass.states.get(eid))
     return round(total, 2)
 
@@ -1,11 +1,141 @@
 from __future__ import annotations
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from homeassistant.components import persistent_notification
 from homeassistant.core import HomeAssistant
 from datetime import datetime, timezone
 
 from ..const import DOMAIN
 from ..model import PCAData
+from ..measurement import start_group_run
+from ..strategies.design import design_rows, solve_design
+
+# Queue entries for group-testing and design steps; plain circuit ids are single-circuit steps
+GROUP_STEP_PREFIX = "group:"
+DESIGN_STEP_PREFIX = "design:"
+UNGROUPED_LABEL = "ungrouped"
+
+
+def group_label(step: str) -> str:
+    if step.startswith(DESIGN_STEP_PREFIX):
+        return f"Versuch {step[len(DESIGN_STEP_PREFIX):]}"
+    return step[len(GROUP_STEP_PREFIX):] if step.startswith(GROUP_STEP_PREFIX) else step
+
+
+def plan_group_steps(groups: Dict[str, List[str]], eligible: List[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Initial group-testing queue: one step per group, restricted to eligible circuits.
+
+    A circuit listed in several groups stays in the first; eligible circuits in no group form
+    an extra group. Groups left with a single circuit become plain circuit steps.
+    """
+    allowed = set(eligible)
+    seen: set = set()
+    queue: List[str] = []
+    steps: Dict[str, List[str]] = {}
+
+    def _add(label: str, members: List[str]) -> None:
+        if len(members) == 1:
+            queue.append(members[0])
+        elif members:
+            key = f"{GROUP_STEP_PREFIX}{label}"
+            queue.append(key)
+            steps[key] = members
+
+    for label, cids in groups.items():
+        members = [c for c in dict.fromkeys(cids) if c in allowed and c not in seen]
+        seen.update(members)
+        _add(str(label), members)
+    _add(UNGROUPED_LABEL, [c for c in eligible if c not in seen])
+    return queue, steps
+
+
+def plan_design_steps(eligible: List[str]) -> Tuple[List[str], Dict[str, List[str]], List[List[int]]]:
+    """Factorial (Hadamard S-matrix) schedule: each step switches off about half the circuits."""
+    rows = design_rows(len(eligible))
+    queue: List[str] = []
+    steps: Dict[str, List[str]] = {}
+    for i, row in enumerate(rows, start=1):
+        key = f"{DESIGN_STEP_PREFIX}{i}"
+        queue.append(key)
+        steps[key] = [c for c, off in zip(eligible, row) if off]
+    return queue, steps, rows
+
+
+def apply_design_results(hass: HomeAssistant, data: PCAData) -> List[str]:
+    """Least-squares circuit effects from the finished design steps into measure_results/history.
+
+    Returns the circuits that were updated (none while steps are missing).
+    """
+    design = data.workflow_design
+    circuits: List[str] = list(design.get("circuits") or [])
+    steps: List[str] = list(design.get("steps") or [])
+    results = [data.group_results.get(step) for step in steps]
+    if not circuits or not steps or any(r is None for r in results):
+        return []
+    effects = [float(r.get("effect_raw", r.get("effect", 0.0)) or 0.0) for r in results]
+    est, se = solve_design(design["rows"], effects, [r.get("se") for r in results])
+    invalid = [group_label(step) for step, r in zip(steps, results) if not r.get("valid", True)]
+    reason = ("design_step_invalid:" + ",".join(invalid)) if invalid else ""
+    thr = float(getattr(data, "min_effect_w", 0) or 0)
+    samples = sum(int(r.get("samples") or 0) for r in results)
+    ts = datetime.now(timezone.utc).isoformat()
+    for i, cid in enumerate(circuits):
+        effect = est[i]
+        clamped = abs(effect) < thr
+        if clamped:
+            effect = 0.0
+        cse = round(se[i], 2) if se is not None else None
+        data.measure_results[cid] = effect
+        data.measure_clamped[cid] = clamped
+        data.measure_valid[cid] = not invalid
+        if reason:
+            data.measure_reason[cid] = reason
+        else:
+            data.measure_reason.pop(cid, None)
+        data.measure_stats[cid] = {"samples": samples, "se": cse, "design_steps": len(steps)}
+        # Not a single OFF window: nothing to re-derive on a strategy change
+        data.measure_effects.pop(cid, None)
+        data.measure_windows.pop(cid, None)
+        data.measure_window_times.pop(cid, None)
+        data.measure_on_windows.pop(cid, None)
+        hist = data.measure_history.setdefault(cid, [])
+        hist.append({
+            "ts": ts,
+            "effect": round(effect, 2),
+            "se": cse,
+            "samples": samples,
+            "duration_s": data.measure_duration_s,
+            "design": "hadamard",
+            "design_steps": len(steps),
+            "strategy": data.effect_strategy,
+            "sampling": getattr(data, "sampling_mode", "event"),
+            "clamped": clamped,
+            "valid": not invalid,
+            "reason": reason,
+        })
+        maxlen = max(1, data.measure_history_max)
+        if len(hist) > maxlen:
+            del hist[: len(hist) - maxlen]
+        hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": cid, "effect": effect, "se": cse, "samples": samples, "design": True})
+    return circuits
+
+
+def split_group_step(data: PCAData, step: str) -> List[str]:
+    """Bisect a group step: queue its two halves right after the current step."""
+    members = data.workflow_groups.get(step) or []
+    if len(members) < 2:
+        return []
+    mid = (len(members) + 1) // 2
+    children: List[str] = []
+    for i, half in enumerate((members[:mid], members[mid:]), start=1):
+        if len(half) == 1:
+            children.append(half[0])
+        else:
+            key = f"{step}.{i}"
+            data.workflow_groups[key] = half
+            children.append(key)
+    pos = data.workflow_index + 1
+    data.workflow_queue[pos:pos] = children
+    return children
 
 async def notify(hass: HomeAssistant, data: PCAData, message: str, title: str = "PCA", actions: Optional[List[Dict[str, str]]] = None) -> None:
     # Always create a persistent notification as a fallback
@@ -56,6 +186,7 @@ async def workflow_finish(hass: HomeAssistant, data: PCAData, reason: Optional[s
     data.workflow_notify_service = None
     data.workflow_skip_circuits = set()
     data.workflow_ignore_result_for = None
+    data.workflow_groups = {}
 
 async def workflow_start_current_step(hass: HomeAssistant, data: PCAData) -> None:
     if not data.workflow_active or data.workflow_index >= len(data.workflow_queue):
@@ -63,9 +194,13 @@ async def workflow_start_current_step(hass: HomeAssistant, data: PCAData) -> Non
         return
     current = data.workflow_queue[data.workflow_index]
     nxt = data.workflow_queue[data.workflow_index + 1] if data.workflow_index + 1 < len(data.workflow_queue) else None
-    msg = f"Schalte jetzt Stromkreis {current} AUS. Warte {data.workflow_wait_s} Sekunden."
+    members = data.workflow_groups.get(current)
+    if members:
+        msg = f"Schalte jetzt {group_label(current)} AUS (Stromkreise {', '.join(members)}). Warte {data.workflow_wait_s} Sekunden."
+    else:
+        msg = f"Schalte jetzt Stromkreis {current} AUS. Warte {data.workflow_wait_s} Sekunden."
     if nxt:
-        msg += f" Danach folgt: {nxt}."
+        msg += f" Danach folgt: {group_label(nxt)}."
     # Actions presented to the user in the mobile notification
     actions = [
         {"action": "PCA_SKIP", "title": "Überspringen"},
@@ -74,10 +209,14 @@ async def workflow_start_current_step(hass: HomeAssistant, data: PCAData) -> Non
         {"action": "PCA_RESTART", "title": "Neu starten"},
     ]
     await notify(hass, data, msg, title="PCA Schritt gestartet", actions=actions)
-    # Start measurement via switch
     data.measurement_origin = "workflow"
-    switch_eid = f"switch.measure_circuit_{current.lower()}"
-    await hass.services.async_call("switch", "turn_on", {"entity_id": switch_eid}, blocking=True)
+    if members:
+        # Group step: one window with all member circuits off
+        start_group_run(hass, data, current, members)
+    else:
+        # Start measurement via switch
+        switch_eid = f"switch.measure_circuit_{current.lower()}"
+        await hass.services.async_call("switch", "turn_on", {"entity_id": switch_eid}, blocking=True)
     # Start countdown timer helper if present
     try:
         await hass.services.async_call("timer", "start", {"entity_id": "timer.pca_step", "duration": data.workflow_wait_s}, blocking=False)
@@ -1,14 +1,21 @@
 from __future__ import annotations
 from statistics import mean
 from typing import Dict
+from . import vectorized
 from .base import EffectStrategy, MeasurementWindow
 
 class AverageStrategy(EffectStrategy):
     key = "average"
     name = "Average"
+    running_location = "mean"
 
     def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
-        avg_off = mean(off.samples) if off.samples else on.baseline
+        if off.stats is not None and off.stats.n:
+            avg_off = off.stats.mean
+        elif vectorized.enabled(off.samples):
+            avg_off = vectorized.mean(vectorized.as_array(off.samples))
+        else:
+            avg_off = mean(off.samples) if off.samples else on.baseline
         effect = on.baseline - avg_off
         return {"effect": effect, "avg_off": avg_off}
 
@@ -1,16 +1,32 @@
 from __future__ import annotations
-from typing import List, Dict
+from typing import Dict, Optional, Sequence
 from dataclasses import dataclass
+from .streaming import RunningStats
 
 @dataclass
 class MeasurementWindow:
     baseline: float
-    samples: List[float]
+    samples: Sequence[float]  # list or zero-copy memoryview of doubles
+    stats: Optional[RunningStats] = None  # running stats of samples, if maintained
+    ordered: Optional[Sequence[float]] = None  # samples sorted ascending, shared by strategies
+    times: Optional[Sequence[float]] = None  # epoch seconds of the samples, if known
 
 class EffectStrategy:
     key: str = "base"
     name: str = "Base"
+    # RunningStats location that follows this strategy's estimate ("mean" or "median"),
+    # used by the SPRT early stop; None when no running statistic fits (no early stop)
+    running_location: Optional[str] = None
+    # Resampling samples with replacement (i.i.d. bootstrap) keeps the estimator's meaning;
+    # False for estimators that depend on sample order or timestamps
+    supports_bootstrap: bool = True
 
     def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
         raise NotImplementedError
 
+
+
+def window_level(strategy: EffectStrategy, samples: Sequence[float]) -> float:
+    """A strategy's location estimate of one window (its effect against a zero baseline, negated)."""
+    zero = MeasurementWindow(baseline=0.0, samples=[0.0])
+    return -float(strategy.compute(zero, MeasurementWindow(baseline=0.0, samples=samples)).get("effect", 0.0))
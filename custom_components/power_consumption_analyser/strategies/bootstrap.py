@@ -0,0 +1,157 @@
+from __future__ import annotations
+import random
+from math import ceil
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Sequence
+
+from . import vectorized
+from .base import EffectStrategy, MeasurementWindow, window_level
+
+# Doubles per vectorized resampling batch (about 8 MB)
+BATCH_VALUES = 1_000_000
+# Delete-a-group jackknife for the BCa acceleration keeps long windows affordable
+JACKKNIFE_GROUPS = 200
+
+
+def _level(strategy: EffectStrategy) -> Callable[[Sequence[float]], float]:
+    # Location estimate of one window under the strategy
+    def level(vals: Sequence[float]) -> float:
+        return window_level(strategy, _as_seq(vals))
+
+    return level
+
+
+def _as_seq(vals: Sequence[float]) -> Sequence[float]:
+    # Strategies take lists/memoryviews; NumPy rows are passed as zero-copy views
+    if vectorized.np is not None and isinstance(vals, vectorized.np.ndarray):
+        return memoryview(vectorized.np.ascontiguousarray(vals, dtype=vectorized.np.float64))
+    return vals
+
+
+def _rows_location(strategy: EffectStrategy, mat, loc: Callable[[Sequence[float]], float]):
+    # Location of every resample (row) at once for the built-in strategies
+    np = vectorized.np
+    key = getattr(strategy, "key", "")
+    n = mat.shape[1]
+    if key == "average":
+        return mat.mean(axis=1)
+    if key in ("median", "hodges_lehmann"):
+        # Against a single ON value the Hodges-Lehmann shift is the median
+        return np.median(mat, axis=1)
+    if key == "trimmed_mean":
+        k = int(n * getattr(strategy, "trim", 0.2))
+        if k * 2 >= n or k == 0:
+            return mat.mean(axis=1)
+        return np.partition(mat, (k, n - k - 1), axis=1)[:, k : n - k].mean(axis=1)
+    if key == "median_of_means":
+        size = ceil(n / min(getattr(strategy, "bins", 3), n))
+        full = n // size
+        means = mat[:, : full * size].reshape(mat.shape[0], full, size).mean(axis=2)
+        if full * size < n:
+            means = np.column_stack((means, mat[:, full * size :].mean(axis=1)))
+        return np.median(means, axis=1)
+    return np.array([loc(row) for row in mat])
+
+
+def _quantile(ordered: Sequence[float], p: float) -> float:
+    pos = max(0.0, min(1.0, p)) * (len(ordered) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _acceleration(samples: Sequence[float], effect: Callable[[Sequence[float]], float]) -> float:
+    n = len(samples)
+    g = min(n, JACKKNIFE_GROUPS)
+    vals = list(samples)
+    jack = [effect([v for i, v in enumerate(vals) if i % g != j]) for j in range(g)]
+    mean_j = sum(jack) / g
+    num = sum((mean_j - t) ** 3 for t in jack)
+    den = sum((mean_j - t) ** 2 for t in jack)
+    return num / (6 * den ** 1.5) if den > 0 else 0.0
+
+
+def bootstrap_ci(
+    strategy: EffectStrategy,
+    baseline: float,
+    samples: Sequence[float],
+    resamples: int = 2000,
+    confidence: float = 0.95,
+    method: str = "percentile",
+    seed: Optional[int] = None,
+    on_samples: Optional[Sequence[float]] = None,
+) -> Optional[Dict[str, object]]:
+    """Bootstrap confidence interval of a strategy's effect.
+
+    Resamples the OFF window with replacement, and the ON window too when on_samples holds
+    at least two values (otherwise the effect is baseline - OFF level). Vectorized with
+    NumPy, batched to bound memory; pure Python otherwise. method is "percentile" or "bca"
+    (bias-corrected and accelerated, acceleration from a grouped jackknife of the OFF
+    window). CPU-bound: run it in an executor. None for strategies whose estimate depends
+    on sample order or timestamps (supports_bootstrap False): resampling would give the
+    interval of a different estimator.
+    """
+    n = len(samples)
+    if n < 2 or resamples < 1 or not getattr(strategy, "supports_bootstrap", True):
+        return None
+    two = on_samples is not None and len(on_samples) >= 2
+    on_vals = list(on_samples) if two else [baseline]
+    key = getattr(strategy, "key", "")
+    level = _level(strategy)
+
+    def effect(on: Sequence[float], off: Sequence[float]) -> float:
+        on_win = MeasurementWindow(baseline=level(on) if two else baseline, samples=_as_seq(on))
+        return float(strategy.compute(on_win, MeasurementWindow(baseline=on_win.baseline, samples=_as_seq(off))).get("effect", 0.0))
+
+    theta = effect(on_vals, list(samples))
+    np = vectorized.np
+    if np is not None:
+        arr = np.array(samples, dtype=np.float64)
+        on_arr = np.array(on_vals, dtype=np.float64)
+        m = len(on_vals)
+        rng = np.random.default_rng(seed)
+        batch = max(1, BATCH_VALUES // (n + m))
+        parts = []
+        done = 0
+        while done < resamples:
+            b = min(batch, resamples - done)
+            off_rows = arr[rng.integers(0, n, size=(b, n))]
+            if not two:
+                parts.append(baseline - _rows_location(strategy, off_rows, level))
+            else:
+                on_rows = on_arr[rng.integers(0, m, size=(b, m))]
+                if key == "hodges_lehmann":
+                    # Genuinely two-sample: no per-window level to subtract
+                    parts.append(np.array([effect(a, o) for a, o in zip(on_rows, off_rows)]))
+                else:
+                    parts.append(_rows_location(strategy, on_rows, level) - _rows_location(strategy, off_rows, level))
+            done += b
+        stats: List[float] = np.sort(np.concatenate(parts)).tolist()
+    else:
+        vals = list(samples)
+        rnd = random.Random(seed)
+        stats = sorted(
+            effect(rnd.choices(on_vals, k=len(on_vals)) if two else on_vals, rnd.choices(vals, k=n))
+            for _ in range(resamples)
+        )
+    alpha = 1.0 - max(0.5, min(0.999, confidence))
+    p_lo, p_hi = alpha / 2, 1 - alpha / 2
+    if method == "bca":
+        nd = NormalDist()
+        below = sum(1 for s in stats if s < theta) / len(stats)
+        z0 = nd.inv_cdf(min(max(below, 1.0 / (len(stats) + 1)), 1 - 1.0 / (len(stats) + 1)))
+        a = _acceleration(samples, lambda off: effect(on_vals, off))
+
+        def _adjust(p: float) -> float:
+            z = nd.inv_cdf(p)
+            return nd.cdf(z0 + (z0 + z) / (1 - a * (z0 + z)))
+
+        p_lo, p_hi = _adjust(p_lo), _adjust(p_hi)
+    return {
+        "ci_low": round(_quantile(stats, p_lo), 2),
+        "ci_high": round(_quantile(stats, p_hi), 2),
+        "ci_method": method,
+        "ci_confidence": confidence,
+        "ci_resamples": resamples,
+        "ci_strategy": key or "average",
+    }
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from math import sqrt
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python solver below
+    np = None
+
+
+# Design steps measure for this fraction of the workflow wait at least: shorter windows
+# still beat the sweep's variance but leave little time for the load to settle
+DESIGN_MIN_WINDOW_SCALE = 0.25
+
+
+def _is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    i = 2
+    while i * i <= n:
+        if n % i == 0:
+            return False
+        i += 1
+    return True
+
+
+def _paley(q: int) -> List[List[int]]:
+    # Paley I: order q + 1 from the quadratic residues of a prime q = 3 (mod 4)
+    residues = {(x * x) % q for x in range(1, q)}
+    chi = [0] + [1 if x in residues else -1 for x in range(1, q)]
+    h = [[1] * (q + 1)]
+    for i in range(q):
+        # Rows negated so the first column is +1 too (normalized form)
+        h.append([1] + [-(1 if i == j else chi[(j - i) % q]) for j in range(q)])
+    return h
+
+
+def hadamard(order: int) -> List[List[int]]:
+    """Normalized Hadamard matrix of ±1 entries (first row and column +1).
+
+    Sylvester doubling for powers of two, Paley's construction for order - 1 a prime
+    = 3 (mod 4), and doublings of those; ValueError for other orders.
+    """
+    if order < 1 or (order > 2 and order % 4):
+        raise ValueError(f"no Hadamard matrix of order {order}")
+    if order == 1:
+        return [[1]]
+    if _is_prime(order - 1) and (order - 1) % 4 == 3:
+        return _paley(order - 1)
+    if order % 2:
+        raise ValueError(f"no Hadamard matrix of order {order}")
+    try:
+        h = hadamard(order // 2)
+    except ValueError:
+        raise ValueError(f"no Hadamard matrix of order {order}") from None
+    return [row + row for row in h] + [row + [-v for v in row] for row in h]
+
+
+def design_rows(k: int) -> List[List[int]]:
+    """Two-level weighing design for k circuits: rows are steps, 1 = circuit OFF in that step.
+
+    Uses the S-matrix of the smallest constructible Hadamard order m (a multiple of 4)
+    with m - 1 >= k (core of the normalized H_m with -1 -> OFF), restricted to the first
+    k columns: m - 1 steps with m/2 circuits off each. The columns of an S-matrix are
+    independent, so every k is solvable. For k = m - 1 the variance of every estimate is
+    4k/(k+1)^2 times that of a one-at-a-time measurement of the same window length.
+    """
+    if k < 1:
+        return []
+    m = k + 1
+    while True:
+        try:
+            h = hadamard(m)
+            break
+        except ValueError:
+            m += 1
+    return [[1 if h[i][j] < 0 else 0 for j in range(1, k + 1)] for i in range(1, m)]
+
+
+def design_window_scale(rows: Sequence[Sequence[float]]) -> float:
+    """Step window (fraction of a sweep step) at which the design matches the sweep's variance.
+
+    The largest diagonal entry of (X'X)^-1 is the worst estimate's variance relative to a
+    one-circuit window of full length, so windows that much shorter still estimate every
+    circuit at least as well. Bounded to [DESIGN_MIN_WINDOW_SCALE, 1].
+    """
+    if not rows:
+        return 1.0
+    k = len(rows[0])
+    inv = _invert([[sum(r[p] * r[q] for r in rows) for q in range(k)] for p in range(k)])
+    if inv is None:
+        return 1.0
+    return max(DESIGN_MIN_WINDOW_SCALE, min(1.0, max(inv[p][p] for p in range(k))))
+
+
+def _invert(a: List[List[float]]) -> Optional[List[List[float]]]:
+    # Gauss-Jordan with partial pivoting; None if singular
+    n = len(a)
+    m = [list(row) + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(a)]
+    for col in range(n):
+        piv = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[piv][col]) < 1e-12:
+            return None
+        m[col], m[piv] = m[piv], m[col]
+        p = m[col][col]
+        m[col] = [v / p for v in m[col]]
+        for r in range(n):
+            if r != col and m[r][col]:
+                f = m[r][col]
+                m[r] = [v - f * w for v, w in zip(m[r], m[col])]
+    return [row[n:] for row in m]
+
+
+def _solve_python(x: Sequence[Sequence[float]], y: Sequence[float], w: Sequence[float]):
+    k = len(x[0])
+    a = [[sum(w[i] * x[i][p] * x[i][q] for i in range(len(y))) for q in range(k)] for p in range(k)]
+    b = [sum(w[i] * x[i][p] * y[i] for i in range(len(y))) for p in range(k)]
+    inv = _invert(a)
+    if inv is None:
+        raise ValueError("design matrix is rank deficient")
+    est = [sum(inv[p][q] * b[q] for q in range(k)) for p in range(k)]
+    return est, [inv[p][p] for p in range(k)]
+
+
+def _solve_numpy(x: Sequence[Sequence[float]], y: Sequence[float], w: Sequence[float]):
+    xs = np.asarray(x, dtype=float)
+    sw = np.sqrt(np.asarray(w, dtype=float))
+    xw = xs * sw[:, None]
+    if np.linalg.matrix_rank(xw) < xs.shape[1]:
+        raise ValueError("design matrix is rank deficient")
+    est = np.linalg.lstsq(xw, np.asarray(y, dtype=float) * sw, rcond=None)[0]
+    cov = np.linalg.inv(xw.T @ xw)
+    return [float(v) for v in est], [float(v) for v in np.diag(cov)]
+
+
+def solve_design(
+    rows: Sequence[Sequence[float]],
+    effects: Sequence[float],
+    step_se: Optional[Sequence[Optional[float]]] = None,
+    use_numpy: bool = True,
+) -> Tuple[List[float], Optional[List[float]]]:
+    """Least-squares per-circuit effects from the step effects of a design.
+
+    With standard errors for every step the fit is weighted (1/se^2) and the per-circuit
+    standard errors come from (X'WX)^-1; otherwise it is ordinary least squares and no
+    standard errors are returned. Uses NumPy when available.
+    """
+    if not rows or len(rows) != len(effects):
+        raise ValueError("need one effect per design row")
+    if len(rows) < len(rows[0]):
+        raise ValueError("design matrix is rank deficient: fewer steps than circuits")
+    weighted = step_se is not None and all(se is not None and se > 0 for se in step_se)
+    w = [1.0 / (se * se) for se in step_se] if weighted else [1.0] * len(rows)
+    solver = _solve_numpy if (use_numpy and np is not None) else _solve_python
+    est, var = solver(rows, effects, w)
+    return est, ([sqrt(max(0.0, v)) for v in var] if weighted else None)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from array import array
+from statistics import mean, median
+from typing import Optional, Sequence
+from . import vectorized
+
+
+def fit_drift(
+    before_t: Sequence[float],
+    before_v: Sequence[float],
+    after_t: Sequence[float],
+    after_v: Sequence[float],
+    method: str = "robust",
+) -> Optional[float]:
+    """Slope (W/s) of untracked power from the ON window before to the ON window after an OFF window.
+
+    "robust": line through the (time, value) medians of both windows, unaffected by spikes;
+    "linear": least squares over all ON samples. None without two samples on each side or
+    without elapsed time.
+    """
+    if len(before_v) < 2 or len(after_v) < 2:
+        return None
+    if method == "linear":
+        t = list(before_t) + list(after_t)
+        v = list(before_v) + list(after_v)
+        tm = mean(t)
+        vm = mean(v)
+        sxx = sum((x - tm) ** 2 for x in t)
+        if sxx <= 0:
+            return None
+        return sum((x - tm) * (y - vm) for x, y in zip(t, v)) / sxx
+    dt = median(after_t) - median(before_t)
+    if dt <= 0:
+        return None
+    return (median(after_v) - median(before_v)) / dt
+
+
+def detrend(times: Sequence[float], values: Sequence[float], slope: float, t_ref: float) -> array:
+    """values - slope * (t - t_ref): every sample moved to the drift level at t_ref."""
+    if vectorized.enabled(values):
+        out = vectorized.as_array(values) - slope * (vectorized.as_array(times) - t_ref)
+        return array("d", out.tobytes())
+    return array("d", (v - slope * (t - t_ref) for t, v in zip(times, values)))
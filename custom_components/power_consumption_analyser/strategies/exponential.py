@@ -0,0 +1,162 @@
+from __future__ import annotations
+from math import exp, log, sqrt
+from statistics import fmean, median
+from typing import Dict, Optional, Sequence, Tuple
+from . import vectorized
+from .base import EffectStrategy, MeasurementWindow
+from .median import sorted_median
+
+# Fewer samples than this are not fitted
+EXP_MIN_SAMPLES = 10
+# Time constants searched: log-spaced grid from half a sample step to EXP_TAU_MAX_SPANS windows
+EXP_GRID = 32
+EXP_TAU_MAX_SPANS = 2.0
+# Golden-section refinement of log(tau): at most EXP_MAX_ITER steps, down to EXP_LOG_TOL
+EXP_MAX_ITER = 40
+EXP_LOG_TOL = 1e-4
+# The decay must explain this much more than noise (F statistic) to be used
+EXP_MIN_F = 20.0
+# Doubles per vectorized grid batch (about 8 MB)
+EXP_BATCH_VALUES = 1_000_000
+
+_GOLD = (sqrt(5.0) - 1.0) / 2.0
+
+
+def _profile_py(t: Sequence[float], y: Sequence[float], tau: float) -> Tuple[float, float, float]:
+    # For fixed tau the model is linear: least squares of y on exp(-t / tau)
+    e = [exp(-x / tau) for x in t]
+    em = fmean(e)
+    ym = fmean(y)
+    see = sum((v - em) ** 2 for v in e)
+    sey = sum((v - em) * (w - ym) for v, w in zip(e, y))
+    syy = sum((w - ym) ** 2 for w in y)
+    b = sey / see if see > 0 else 0.0
+    return max(0.0, syy - b * sey), ym - b * em, b
+
+
+def _profile_np(t, y, tau):
+    np = vectorized.np
+    e = np.exp(-t / tau)
+    ec = e - e.mean()
+    yc = y - y.mean()
+    see = float(ec @ ec)
+    sey = float(ec @ yc)
+    b = sey / see if see > 0 else 0.0
+    return max(0.0, float(yc @ yc) - b * sey), float(y.mean()) - b * float(e.mean()), b
+
+
+def _grid_np(t, y, taus):
+    # SSE of every grid tau, a batch of columns (n x k) at a time
+    np = vectorized.np
+    yc = y - y.mean()
+    syy = float(yc @ yc)
+    k = max(1, EXP_BATCH_VALUES // len(t))
+    parts = []
+    for i in range(0, len(taus), k):
+        e = np.exp(-t[:, None] / taus[None, i : i + k])
+        ec = e - e.mean(axis=0)
+        see = (ec * ec).sum(axis=0)
+        sey = yc @ ec
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parts.append(syy - np.where(see > 0, sey * sey / see, 0.0))
+    return np.maximum(np.concatenate(parts), 0.0)
+
+
+def fit_exponential(times: Optional[Sequence[float]], values: Sequence[float]) -> Optional[Dict[str, float]]:
+    """Least-squares fit of values = asymptote + amplitude * exp(-(t - t0) / tau).
+
+    Variable projection: for a fixed tau the model is linear, so only log(tau) is searched,
+    on a grid then by golden section (bounded by EXP_MAX_ITER). Without times the samples
+    are taken as evenly spaced 1 s apart; the asymptote does not depend on that scale.
+    None when the window is too short or the decay is not identifiable (best tau at the
+    edge of the grid, or no better than a constant within noise).
+    """
+    n = len(values)
+    if n < EXP_MIN_SAMPLES or (times is not None and len(times) != n):
+        return None
+    use_np = vectorized.enabled(values)
+    if use_np:
+        np = vectorized.np
+        y = vectorized.as_array(values)
+        t = vectorized.as_array(times) - float(times[0]) if times is not None else np.arange(n, dtype=np.float64)
+        span = float(t[-1] - t[0])
+        syy = float(((y - y.mean()) ** 2).sum())
+        profile = _profile_np
+    else:
+        y = list(values)
+        t = [float(x) - float(times[0]) for x in times] if times is not None else [float(i) for i in range(n)]
+        span = t[-1] - t[0]
+        ym = fmean(y)
+        syy = sum((w - ym) ** 2 for w in y)
+        profile = _profile_py
+    if span <= 0 or syy <= 0:
+        return None
+    lo = log(span / (n - 1) / 2.0)
+    hi = log(span * EXP_TAU_MAX_SPANS)
+    grid = [lo + (hi - lo) * i / (EXP_GRID - 1) for i in range(EXP_GRID)]
+    if use_np:
+        sse = _grid_np(t, y, np.exp(np.array(grid))).tolist()
+    else:
+        sse = [profile(t, y, exp(g))[0] for g in grid]
+    best = min(range(EXP_GRID), key=sse.__getitem__)
+    if best in (0, EXP_GRID - 1):
+        return None
+    # Golden section between the neighbours of the best grid point
+    a, b = grid[best - 1], grid[best + 1]
+    c = b - _GOLD * (b - a)
+    d = a + _GOLD * (b - a)
+    fc = profile(t, y, exp(c))[0]
+    fd = profile(t, y, exp(d))[0]
+    it = 0
+    while it < EXP_MAX_ITER and b - a > EXP_LOG_TOL:
+        it += 1
+        if fc <= fd:
+            b, d, fd = d, c, fc
+            c = b - _GOLD * (b - a)
+            fc = profile(t, y, exp(c))[0]
+        else:
+            a, c, fc = c, d, fd
+            d = a + _GOLD * (b - a)
+            fd = profile(t, y, exp(d))[0]
+    tau = exp((a + b) / 2)
+    sse_fit, asymptote, amplitude = profile(t, y, tau)
+    dof = n - 3
+    if sse_fit > 0 and (syy - sse_fit) / (sse_fit / dof) < EXP_MIN_F:
+        return None
+    return {
+        "asymptote": asymptote,
+        "amplitude": amplitude,
+        "tau_s": tau,
+        "r2": 1.0 - sse_fit / syy,
+        "rmse": sqrt(sse_fit / n),
+        "iterations": it,
+    }
+
+
+class ExponentialStrategy(EffectStrategy):
+    """Steady OFF level extrapolated from an exponential settling curve.
+
+    Loads that decay slowly after the breaker opens (buffered supplies, thermal loads) pull
+    every averaging strategy towards the ON level unless the window is long. Fitting
+    asymptote + amplitude * exp(-t / tau) to the timestamped window reads the level the
+    decay is heading to. Without a clear decay it falls back to the median (fit = False).
+    """
+
+    key = "exponential"
+    name = "Exponential Fit"
+    # A shuffled window has no decay to fit: the CI would be the median's
+    supports_bootstrap = False
+
+    def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
+        if not len(off.samples):
+            return {"effect": 0.0, "n": 0}
+        res = fit_exponential(off.times, off.samples)
+        if res is None:
+            if off.ordered is not None and len(off.ordered):
+                level = sorted_median(off.ordered)
+            elif vectorized.enabled(off.samples):
+                level = vectorized.median(vectorized.as_array(off.samples))
+            else:
+                level = median(off.samples)
+            return {"effect": on.baseline - level, "level_off": level, "fit": False, "n": len(off.samples)}
+        return {"effect": on.baseline - res["asymptote"], "level_off": res["asymptote"], "fit": True, "n": len(off.samples), **res}
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Sequence, Tuple
+from . import vectorized
+from .base import EffectStrategy, MeasurementWindow
+from .median import sorted_median
+
+# Once this few pairwise differences remain undecided they are sorted directly
+GATHER_PAIRS = 4096
+
+
+def _counts_py(x: Sequence[float], z: Sequence[float], p: float) -> Tuple[List[int], List[int]]:
+    # Per row i: number of j with x[i] + z[j] < p and <= p; both fall as x[i] grows (two pointers)
+    n = len(z)
+    lt: List[int] = []
+    le: List[int] = []
+    a = b = n
+    for xi in x:
+        while a > 0 and xi + z[a - 1] >= p:
+            a -= 1
+        while b > 0 and xi + z[b - 1] > p:
+            b -= 1
+        lt.append(a)
+        le.append(b)
+    return lt, le
+
+
+def _counts_np(x, z, p):
+    np = vectorized.np
+    n = len(z)
+    lt = np.searchsorted(z, p - x, side="left")
+    le = np.searchsorted(z, p - x, side="right")
+    # p - x rounds; settle the cut points on the exact sums x + z
+    for idx, strict in ((lt, True), (le, False)):
+        while True:
+            prev = np.clip(idx - 1, 0, n - 1)
+            s = x + z[prev]
+            down = (idx > 0) & ((s >= p) if strict else (s > p))
+            cur = np.clip(idx, 0, n - 1)
+            s = x + z[cur]
+            up = (idx < n) & ((s < p) if strict else (s <= p))
+            if not down.any() and not up.any():
+                break
+            idx -= down.astype(idx.dtype)
+            idx += (up & ~down).astype(idx.dtype)
+    return lt, le
+
+
+def select_pairwise_sum(x: Sequence[float], z: Sequence[float], k: int, seed: int = 0) -> float:
+    """k-th smallest (0-based) of all sums x[i] + z[j], x and z sorted ascending.
+
+    Randomized selection in the sorted matrix X + Z: each round picks a pivot among the
+    undecided sums and counts the sums below it with two pointers in O(m + n); the
+    undecided band shrinks geometrically, so O((m + n) log(mn)) overall instead of
+    materializing all m * n sums.
+    """
+    m, n = len(x), len(z)
+    use_np = vectorized.np is not None and (m + n) >= vectorized.MIN_VECTOR_SAMPLES
+    rng = random.Random(seed)
+    if use_np:
+        np = vectorized.np
+        x = vectorized.as_array(x)
+        z = vectorized.as_array(z)
+        lo = np.zeros(m, dtype=np.int64)
+        hi = np.full(m, n, dtype=np.int64)
+    else:
+        lo = [0] * m
+        hi = [n] * m
+    while True:
+        if use_np:
+            widths = hi - lo
+            cum = np.cumsum(widths)
+            total = int(cum[-1])
+            below = int(lo.sum())
+        else:
+            widths = [h - l for l, h in zip(lo, hi)]
+            cum = list(accumulate(widths))
+            total = cum[-1]
+            below = sum(lo)
+        if total <= max(GATHER_PAIRS, m + n):
+            rest = sorted(float(x[i]) + float(z[j]) for i in range(m) for j in range(int(lo[i]), int(hi[i])))
+            return rest[k - below]
+        r = rng.randrange(total)
+        i = int(np.searchsorted(cum, r, side="right")) if use_np else bisect_right(cum, r)
+        j = int(lo[i]) + r - (int(cum[i - 1]) if i else 0)
+        p = float(x[i]) + float(z[j])
+        lt, le = _counts_np(x, z, p) if use_np else _counts_py(x, z, p)
+        n_lt = int(lt.sum()) if use_np else sum(lt)
+        n_le = int(le.sum()) if use_np else sum(le)
+        if k < n_lt:
+            hi = np.minimum(hi, lt) if use_np else [min(h, c) for h, c in zip(hi, lt)]
+        elif k >= n_le:
+            lo = np.maximum(lo, le) if use_np else [max(l, c) for l, c in zip(lo, le)]
+        else:
+            return p
+
+
+def hodges_lehmann_shift(on: Sequence[float], off: Sequence[float]) -> float:
+    """Median of all pairwise differences on[i] - off[j] (two-sample Hodges-Lehmann), O(n log n)."""
+    x = vectorized.sort_samples(on)
+    # on - off == on + (-off); negated OFF sorted ascending
+    if vectorized.enabled(off):
+        z = -vectorized.np.sort(vectorized.as_array(off))[::-1]
+    else:
+        z = [-v for v in sorted(off, reverse=True)]
+    total = len(x) * len(z)
+    mid = total // 2
+    if total % 2:
+        return select_pairwise_sum(x, z, mid)
+    return (select_pairwise_sum(x, z, mid - 1) + select_pairwise_sum(x, z, mid)) / 2
+
+
+class HodgesLehmannStrategy(EffectStrategy):
+    """Shift between ON and OFF windows: median of all pairwise ON - OFF differences.
+
+    With a single ON sample (the baseline) this is baseline - median(OFF); with real ON
+    samples it is the robust two-sample shift estimator.
+    """
+
+    key = "hodges_lehmann"
+    name = "Hodges-Lehmann"
+    running_location = "median"
+
+    def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
+        if not len(off.samples):
+            return {"effect": 0.0, "n": 0}
+        on_vals = on.samples if len(on.samples) else [on.baseline]
+        if len(on_vals) == 1 and off.ordered is not None and len(off.ordered):
+            # Shared sort of the window: the median of the differences is read directly
+            return {"effect": float(on_vals[0]) - sorted_median(off.ordered), "n": len(off.samples)}
+        effect = hodges_lehmann_shift(on_vals, off.samples)
+        return {"effect": effect, "n": len(off.samples), "n_on": len(on_vals)}
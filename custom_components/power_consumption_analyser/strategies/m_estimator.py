@@ -0,0 +1,103 @@
+from __future__ import annotations
+from statistics import median
+from typing import Dict, Sequence, Tuple
+from . import vectorized
+from .base import EffectStrategy, MeasurementWindow
+from .median import sorted_median
+from .streaming import MAD_TO_SIGMA
+
+# IRLS stops after this many reweightings or once the location moves less than IRLS_TOL_W
+MAX_IRLS_ITER = 20
+IRLS_TOL_W = 1e-3
+
+
+class MEstimatorStrategy(EffectStrategy):
+    """Location of the OFF window by iteratively reweighted least squares.
+
+    Starts at the median with the MAD as a fixed scale; samples far from the current
+    location get small weights (subclasses define the weight function). Bounded by
+    MAX_IRLS_ITER, so the cost is O(n) per iteration on top of the median.
+    """
+
+    key = "m_estimator"
+    name = "M-Estimator"
+    running_location = "median"
+    tuning = 1.345
+
+    def weights(self, r: Sequence[float]) -> Sequence[float]:
+        raise NotImplementedError
+
+    def weights_np(self, r):
+        raise NotImplementedError
+
+    def location(self, off: MeasurementWindow) -> Tuple[float, float, int]:
+        """(location, scale, iterations) of the OFF samples."""
+        if vectorized.enabled(off.samples):
+            a = vectorized.as_array(off.samples)
+            mu = vectorized.median(a)
+            scale = vectorized.median(abs(a - mu)) * MAD_TO_SIGMA
+            if scale <= 0:
+                return mu, 0.0, 0
+            for it in range(1, MAX_IRLS_ITER + 1):
+                w = self.weights_np((a - mu) / scale)
+                sw = float(w.sum())
+                if sw <= 0:
+                    return mu, scale, it
+                new = float((w * a).sum()) / sw
+                if abs(new - mu) < IRLS_TOL_W:
+                    return new, scale, it
+                mu = new
+            return mu, scale, MAX_IRLS_ITER
+        vals = list(off.samples)
+        mu = sorted_median(off.ordered) if off.ordered is not None and len(off.ordered) else median(vals)
+        scale = median(abs(x - mu) for x in vals) * MAD_TO_SIGMA
+        if scale <= 0:
+            return mu, 0.0, 0
+        for it in range(1, MAX_IRLS_ITER + 1):
+            w = self.weights([(x - mu) / scale for x in vals])
+            sw = sum(w)
+            if sw <= 0:
+                return mu, scale, it
+            new = sum(wi * x for wi, x in zip(w, vals)) / sw
+            if abs(new - mu) < IRLS_TOL_W:
+                return new, scale, it
+            mu = new
+        return mu, scale, MAX_IRLS_ITER
+
+    def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
+        if not len(off.samples):
+            return {"effect": 0.0, "n": 0}
+        loc, scale, it = self.location(off)
+        return {"effect": on.baseline - loc, "location_off": loc, "scale": scale, "iterations": it, "n": len(off.samples)}
+
+
+class HuberStrategy(MEstimatorStrategy):
+    """Huber: mean-like near the center, linear (down-weighted) influence in the tails."""
+
+    key = "huber"
+    name = "Huber M-Estimator"
+    tuning = 1.345  # 95 % efficiency under Gaussian noise
+
+    def weights(self, r: Sequence[float]) -> Sequence[float]:
+        c = self.tuning
+        return [1.0 if abs(x) <= c else c / abs(x) for x in r]
+
+    def weights_np(self, r):
+        ar = abs(r)
+        return vectorized.np.where(ar <= self.tuning, 1.0, self.tuning / vectorized.np.maximum(ar, self.tuning))
+
+
+class TukeyStrategy(MEstimatorStrategy):
+    """Tukey biweight: samples beyond tuning * scale get zero weight (redescending)."""
+
+    key = "tukey"
+    name = "Tukey Biweight"
+    tuning = 4.685  # 95 % efficiency under Gaussian noise
+
+    def weights(self, r: Sequence[float]) -> Sequence[float]:
+        c = self.tuning
+        return [(1.0 - (x / c) ** 2) ** 2 if abs(x) < c else 0.0 for x in r]
+
+    def weights_np(self, r):
+        u = (r / self.tuning) ** 2
+        return vectorized.np.where(u < 1.0, (1.0 - u) ** 2, 0.0)
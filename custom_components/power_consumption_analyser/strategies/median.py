@@ -1,14 +1,53 @@
 from __future__ import annotations
+from bisect import bisect_left
 from statistics import median
-from typing import Dict
+from typing import Dict, Sequence
+from . import vectorized
 from .base import EffectStrategy, MeasurementWindow
 
+
+def sorted_median(vals: Sequence[float]) -> float:
+    """Median of already sorted values, O(1)."""
+    n = len(vals)
+    mid = n // 2
+    return vals[mid] if n % 2 else (vals[mid - 1] + vals[mid]) / 2
+
+
+def sorted_mad(vals: Sequence[float], center: float) -> float:
+    """Median absolute deviation from center of already sorted values, without re-sorting.
+
+    The deviations below and above center are each sorted already; merging them up to
+    the middle is O(n). NumPy arrays use selection on the deviations instead.
+    """
+    n = len(vals)
+    if not n:
+        return 0.0
+    if vectorized.np is not None and isinstance(vals, vectorized.np.ndarray):
+        return vectorized.median(vectorized.np.abs(vals - center))
+    lo = bisect_left(vals, center) - 1
+    hi = lo + 1
+    devs = []
+    while len(devs) <= n // 2:
+        if hi >= n or (lo >= 0 and center - vals[lo] <= vals[hi] - center):
+            devs.append(center - vals[lo])
+            lo -= 1
+        else:
+            devs.append(vals[hi] - center)
+            hi += 1
+    return devs[-1] if n % 2 else (devs[-2] + devs[-1]) / 2
+
+
 class MedianStrategy(EffectStrategy):
     key = "median"
     name = "Median"
+    running_location = "median"
 
     def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
-        med_off = median(off.samples) if off.samples else on.baseline
+        if off.ordered is not None and len(off.ordered):
+            med_off = sorted_median(off.ordered)
+        elif vectorized.enabled(off.samples):
+            med_off = vectorized.median(vectorized.as_array(off.samples))
+        else:
+            med_off = median(off.samples) if off.samples else on.baseline
         effect = on.baseline - med_off
         return {"effect": effect, "median_off": med_off}
-
@@ -3,21 +3,27 @@ from __future__ import annotations
 from typing import Dict, List
 from math import ceil
 from statistics import mean, median
+from . import vectorized
 from .base import EffectStrategy, MeasurementWindow
 
 class MedianOfMeansStrategy(EffectStrategy):
     key = "median_of_means"
     name = "Median of Means"
+    running_location = "median"
 
     def __init__(self, bins: int = 3):
         self.bins = max(1, int(bins))
 
     def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
-        vals: List[float] = list(off.samples) if off.samples else []
+        # Slices of a memoryview are views, so binning does not copy the window
+        vals = off.samples if off.samples else []
         n = len(vals)
         if n == 0:
             return {"effect": 0.0, "bins": self.bins, "n": 0}
         b = min(self.bins, n)
+        if vectorized.enabled(vals):
+            mom = vectorized.median_of_means(vectorized.as_array(vals), b)
+            return {"effect": on.baseline - mom, "bins": b, "n": n}
         size = ceil(n / b)
         means: List[float] = []
         for i in range(0, n, size):
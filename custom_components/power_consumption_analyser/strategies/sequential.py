@@ -0,0 +1,37 @@
+from __future__ import annotations
+from math import log
+from typing import Optional, Tuple
+
+EFFECT_PRESENT = "effect_present"
+EFFECT_ABSENT = "effect_below_threshold"
+
+
+def sprt_bounds(confidence: float) -> Tuple[float, float]:
+    """Wald's log-likelihood ratio bounds (lower, upper) with alpha = beta = 1 - confidence."""
+    err = max(1e-6, min(0.5, 1.0 - confidence))
+    return log(err / (1 - err)), log((1 - err) / err)
+
+
+def sprt_decide(n: int, mean_effect: float, sigma: float, threshold: float, confidence: float) -> Optional[str]:
+    """Two-sided SPRT on the running OFF-window effect against threshold.
+
+    Tests H0: effect = 0 against H1: effect = +threshold and against H1: effect = -threshold
+    with Gaussian noise of standard deviation sigma, using only n and the running effect
+    (baseline - running location), so each call is O(1). For a location other than the
+    mean, sigma is its per-sample spread (standard error * sqrt(n)). Samples are assumed
+    independent and identically distributed; correlated samples (bursty event sampling, a
+    load still settling) make the decision overconfident. Returns EFFECT_PRESENT once
+    either alternative is accepted, EFFECT_ABSENT once both are rejected, else None.
+    """
+    if n <= 0 or threshold <= 0 or sigma <= 0:
+        return None
+    lower, upper = sprt_bounds(confidence)
+    k = threshold / (sigma * sigma)
+    total = n * mean_effect
+    llr_pos = k * (total - n * threshold / 2)
+    llr_neg = k * (-total - n * threshold / 2)
+    if llr_pos >= upper or llr_neg >= upper:
+        return EFFECT_PRESENT
+    if llr_pos <= lower and llr_neg <= lower:
+        return EFFECT_ABSENT
+    return None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from collections import deque
+from math import sqrt
+from statistics import fmean, pstdev
+from typing import List, Optional, Tuple
+
+# Samples per half of the comparison window, decision threshold and noise floor (W)
+SETTLE_WINDOW = 5
+SETTLE_Z = 2.0
+SETTLE_SIGMA_FLOOR_W = 1.0
+# A prior settling time skips testing for this fraction of it
+SETTLE_PRIOR_FRACTION = 0.5
+# A sample this far (W) from the ON level marks the change point (circuit actually off)
+SETTLE_CHANGE_MIN_W = 5.0
+
+
+class SettlingDetector:
+    """Streaming settling test for the start of an OFF window.
+
+    Keeps the last 2 * window (time, value) samples and reports the signal settled once
+    the mean of the newest half agrees with the older half within z standard errors
+    (pooled noise, floored). Transients keep the halves apart; a flat or merely noisy
+    signal settles after 2 * window samples.
+
+    With the ON level as reference, stability is tested only after a change point (a
+    sample more than change_w away from it), so a window started before the breaker is
+    switched does not settle on the ON level. Without a change the test starts once
+    min_wait_s has passed (a circuit with no load); such a provisional settle is revoked
+    by a later change point, and settle_s stays None. With a prior settling time (s) no
+    test is made before prior * SETTLE_PRIOR_FRACTION has elapsed since the change.
+    """
+
+    def __init__(
+        self,
+        start: float,
+        prior_s: Optional[float] = None,
+        window: int = SETTLE_WINDOW,
+        z: float = SETTLE_Z,
+        floor_w: float = SETTLE_SIGMA_FLOOR_W,
+        reference: Optional[float] = None,
+        change_w: float = SETTLE_CHANGE_MIN_W,
+        min_wait_s: float = 0.0,
+    ) -> None:
+        self.start = start
+        self.window = max(2, int(window))
+        self.z = z
+        self.floor_w = floor_w
+        self.reference = reference
+        self.change_w = max(0.0, float(change_w))
+        self.min_wait_s = max(0.0, float(min_wait_s))
+        self.min_delay_s = max(0.0, float(prior_s or 0.0)) * SETTLE_PRIOR_FRACTION
+        # Without a reference level the window starts at the change
+        self.changed_at: Optional[float] = start if reference is None else None
+        self.settled_at: Optional[float] = None
+        self._buf: deque = deque(maxlen=2 * self.window)
+
+    @property
+    def settle_s(self) -> Optional[float]:
+        """Settling time after the change point; None while unsettled or without a change."""
+        if self.settled_at is None or self.changed_at is None:
+            return None
+        return round(self.settled_at - self.changed_at, 1)
+
+    def push(self, t: float, value: float) -> bool:
+        """Add a sample; True while settled.
+
+        A change point after a provisional settle returns False again: the caller drops
+        the samples collected so far.
+        """
+        if self.changed_at is None and abs(value - self.reference) > self.change_w:
+            self.changed_at = t
+            self.settled_at = None
+            self._buf.clear()
+        if self.settled_at is not None:
+            return True
+        self._buf.append((t, value))
+        if len(self._buf) < 2 * self.window:
+            return False
+        if self.changed_at is None:
+            if t - self.start < self.min_wait_s:
+                return False
+        elif t - self.changed_at < self.min_delay_s:
+            return False
+        vals = [v for _, v in self._buf]
+        older, newer = vals[: self.window], vals[self.window :]
+        sigma = max(self.floor_w, sqrt((pstdev(older) ** 2 + pstdev(newer) ** 2) / 2))
+        if abs(fmean(newer) - fmean(older)) <= self.z * sigma * sqrt(2.0 / self.window):
+            self.settled_at = t
+            return True
+        return False
+
+    def stable(self) -> List[Tuple[float, float]]:
+        """The newest half of the window: already settled samples, (time, value) oldest first."""
+        return list(self._buf)[-self.window :]
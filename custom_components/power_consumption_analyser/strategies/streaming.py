@@ -0,0 +1,167 @@
+from __future__ import annotations
+from bisect import bisect_right, insort
+from math import pi, sqrt
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+# MAD -> sigma for normally distributed noise
+MAD_TO_SIGMA = 1.4826
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal quantile, e.g. 0.95 -> 1.96."""
+    return NormalDist().inv_cdf(0.5 + max(0.5, min(0.999, confidence)) / 2)
+
+
+class P2Quantile:
+    """Streaming quantile estimate with the P² algorithm (Jain & Chlamtac), O(1) per sample.
+
+    Exact while at most 5 samples have been seen.
+    """
+
+    __slots__ = ("p", "count", "_q", "_n", "_np", "_dn")
+
+    def __init__(self, p: float = 0.5) -> None:
+        self.p = p
+        self.count = 0
+        self._q: List[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def push(self, x: float) -> None:
+        self.count += 1
+        q = self._q
+        if self.count <= 5:
+            insort(q, x)
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+        n = self._n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+        for i in (1, 2, 3):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                qp = self._parabolic(i, s)
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = qp
+                n[i] += s
+
+    def _parabolic(self, i: int, s: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.count:
+            return None
+        if self.count <= 5:
+            # Exact, interpolated like statistics.median for p=0.5
+            pos = self.p * (self.count - 1)
+            lo = int(pos)
+            hi = min(lo + 1, self.count - 1)
+            return self._q[lo] + (self._q[hi] - self._q[lo]) * (pos - lo)
+        return self._q[2]
+
+
+class RunningStats:
+    """One-pass statistics of a measurement window, O(1) per sample and to read.
+
+    Welford mean/variance, min/max, P² median. MAD is approximated by a P² median of
+    absolute deviations from the running median estimate at the time each sample arrived.
+    """
+
+    __slots__ = ("n", "mean", "_m2", "min", "max", "_median", "_absdev")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._median = P2Quantile(0.5)
+        self._absdev = P2Quantile(0.5)
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+        self._median.push(x)
+        self._absdev.push(abs(x - self._median.value))
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than 2 samples)."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return sqrt(self.variance)
+
+    @property
+    def median(self) -> Optional[float]:
+        return self._median.value
+
+    @property
+    def mad(self) -> float:
+        return self._absdev.value or 0.0
+
+    @property
+    def sigma(self) -> float:
+        return MAD_TO_SIGMA * self.mad
+
+    def as_dict(self, ndigits: int = 2) -> Dict[str, Optional[float]]:
+        def _r(v):
+            return round(v, ndigits) if v is not None else None
+        return {
+            "samples": self.n,
+            "mean": _r(self.mean) if self.n else None,
+            "std": _r(self.std),
+            "min": _r(self.min),
+            "max": _r(self.max),
+            "median": _r(self.median),
+            "mad": _r(self.mad),
+            "sigma": _r(self.sigma),
+        }
+
+
+def location_spread(key: str, stats: RunningStats) -> float:
+    """Per-sample noise scale of a strategy's location estimate (its standard error * sqrt(n)).
+
+    Robust strategies use the MAD-based sigma.
+    """
+    if key == "average":
+        return stats.std
+    if key == "median":
+        # Asymptotic efficiency of the median under normal noise
+        return sqrt(pi / 2) * (stats.sigma or stats.std)
+    return stats.sigma or stats.std
+
+
+def standard_error(key: str, stats: RunningStats) -> Optional[float]:
+    """Approximate standard error of the OFF-window location estimate of a strategy.
+
+    Assumes independent samples; robust strategies use the MAD-based sigma.
+    """
+    if stats.n < 2:
+        return None
+    return location_spread(key, stats) / sqrt(stats.n)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence
+from . import vectorized
+from .average import AverageStrategy
+from .base import EffectStrategy, MeasurementWindow
+from .median import MedianStrategy
+from .trimmed_mean import TrimmedMeanStrategy
+
+
+def hold_weights(times: Optional[Sequence[float]], n: int):
+    """How long each sample held (s): until the next sample; the last one the mean interval.
+
+    NumPy array or list; None without usable timestamps (missing, misaligned or no span).
+    """
+    if times is None or len(times) != n or n < 2:
+        return None
+    if vectorized.enabled(times):
+        t = vectorized.as_array(times)
+        span = float(t[-1] - t[0])
+        if span <= 0:
+            return None
+        w = vectorized.np.empty(n)
+        w[:-1] = vectorized.np.maximum(vectorized.np.diff(t), 0.0)
+        w[-1] = span / (n - 1)
+        return w
+    span = times[-1] - times[0]
+    if span <= 0:
+        return None
+    w = [max(0.0, times[i + 1] - times[i]) for i in range(n - 1)]
+    w.append(span / (n - 1))
+    return w
+
+
+def _sorted_weights(values: Sequence[float], w):
+    # Values ascending with their weights and cumulative weights
+    if vectorized.np is not None and not isinstance(w, list):
+        np = vectorized.np
+        x = vectorized.as_array(values)
+        order = np.argsort(x, kind="stable")
+        ws = w[order]
+        return x[order], ws, np.cumsum(ws)
+    pairs = sorted(zip(values, w))
+    xs = [p[0] for p in pairs]
+    ws = [p[1] for p in pairs]
+    cum: List[float] = []
+    acc = 0.0
+    for v in ws:
+        acc += v
+        cum.append(acc)
+    return xs, ws, cum
+
+
+def weighted_mean(values: Sequence[float], w) -> float:
+    if not isinstance(w, list):
+        return float((vectorized.as_array(values) * w).sum() / w.sum())
+    return sum(x * v for x, v in zip(values, w)) / sum(w)
+
+
+def weighted_median(values: Sequence[float], w) -> float:
+    """Value at half the total weight; the midpoint of two values when it falls exactly between them."""
+    xs, _, cum = _sorted_weights(values, w)
+    total = float(cum[-1])
+    half = total / 2
+    if not isinstance(cum, list):
+        k = int(vectorized.np.searchsorted(cum, half, side="left"))
+    else:
+        k = next(i for i, c in enumerate(cum) if c >= half)
+    k = min(k, len(xs) - 1)
+    if abs(float(cum[k]) - half) <= 1e-12 * total and k + 1 < len(xs):
+        return (float(xs[k]) + float(xs[k + 1])) / 2
+    return float(xs[k])
+
+
+def weighted_trimmed_mean(values: Sequence[float], w, trim: float) -> float:
+    """Mean over the central (1 - 2 * trim) of the total time; samples at the cuts count partially."""
+    xs, ws, cum = _sorted_weights(values, w)
+    total = float(cum[-1])
+    lo, hi = trim * total, (1 - trim) * total
+    if hi <= lo:
+        return weighted_mean(xs, ws)
+    if not isinstance(cum, list):
+        np = vectorized.np
+        part = np.clip(np.minimum(cum, hi) - np.maximum(cum - ws, lo), 0.0, None)
+        return float((part * xs).sum() / (hi - lo))
+    acc = 0.0
+    for x, c, v in zip(xs, cum, ws):
+        part = min(c, hi) - max(c - v, lo)
+        if part > 0:
+            acc += part * x
+    return acc / (hi - lo)
+
+
+class TimeWeightedStrategy(EffectStrategy):
+    """Level of the OFF window with every sample weighted by how long it held.
+
+    Event sampling takes a sample per meter update, so bursty meters (many updates in a
+    short time) dominate a plain estimator; weighting by hold time measures power over
+    time instead. Without timestamps the unweighted counterpart is used.
+    """
+
+    key = "time_weighted"
+    name = "Time-weighted"
+    # Shuffled resamples have no hold times: the CI would be the unweighted estimator's
+    supports_bootstrap = False
+    plain: EffectStrategy = AverageStrategy()
+
+    def level(self, values: Sequence[float], w) -> float:
+        raise NotImplementedError
+
+    def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
+        n = len(off.samples)
+        w = hold_weights(off.times, n) if n else None
+        if w is None or float(sum(w) if isinstance(w, list) else w.sum()) <= 0:
+            res = self.plain.compute(on, off)
+            return {**res, "time_weighted": False}
+        level = self.level(off.samples, w)
+        return {"effect": on.baseline - level, "level_off": level, "time_weighted": True, "n": n}
+
+
+class TimeWeightedAverageStrategy(TimeWeightedStrategy):
+    key = "tw_average"
+    name = "Time-weighted Average"
+    plain = AverageStrategy()
+
+    def level(self, values: Sequence[float], w) -> float:
+        return weighted_mean(values, w)
+
+
+class TimeWeightedMedianStrategy(TimeWeightedStrategy):
+    key = "tw_median"
+    name = "Time-weighted Median"
+    plain = MedianStrategy()
+
+    def level(self, values: Sequence[float], w) -> float:
+        return weighted_median(values, w)
+
+
+class TimeWeightedTrimmedMeanStrategy(TimeWeightedStrategy):
+    key = "tw_trimmed_mean"
+    name = "Time-weighted Trimmed Mean"
+
+    def __init__(self, trim: float = 0.2):
+        self.trim = max(0.0, min(0.45, float(trim)))
+        self.plain = TrimmedMeanStrategy(trim=self.trim)
+
+    def level(self, values: Sequence[float], w) -> float:
+        return weighted_trimmed_mean(values, w, self.trim)
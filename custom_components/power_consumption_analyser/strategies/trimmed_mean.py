@@ -1,21 +1,35 @@
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict
 from statistics import mean
+from . import vectorized
 from .base import EffectStrategy, MeasurementWindow
 
 class TrimmedMeanStrategy(EffectStrategy):
     key = "trimmed_mean"
+    running_location = "median"
     name = "Trimmed Mean"
 
     def __init__(self, trim: float = 0.2):
         self.trim = max(0.0, min(0.45, float(trim)))
 
     def compute(self, on: MeasurementWindow, off: MeasurementWindow) -> Dict[str, float]:
-        vals: List[float] = list(off.samples) if off.samples else []
-        if not vals:
+        if not len(off.samples):
             # No samples -> effect 0 (baseline - baseline)
             return {"effect": 0.0, "trim": self.trim}
-        vals.sort()
+        shared = off.ordered is not None and len(off.ordered) > 0
+        if vectorized.enabled(off.samples):
+            n = len(off.samples)
+            k = int(n * self.trim)
+            if shared:
+                arr = vectorized.as_array(off.ordered)
+                avg = vectorized.mean(arr[k : n - k] if k * 2 < n else arr)
+            else:
+                # Selection around the two cut points instead of a full sort
+                arr = vectorized.as_array(off.samples)
+                avg = vectorized.trimmed_mean(arr, k) if k * 2 < n else vectorized.mean(arr)
+            return {"effect": on.baseline - avg, "trim": self.trim, "n": n}
+        # Reuse a shared sort of the window; otherwise sorting needs its own list
+        vals = off.ordered if shared else sorted(off.samples)
         n = len(vals)
         k = int(n * self.trim)
         if k * 2 >= n:
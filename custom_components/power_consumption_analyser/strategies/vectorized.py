@@ -0,0 +1,67 @@
+from __future__ import annotations
+from math import ceil
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # strategies keep their pure-Python path
+    np = None
+
+# Below this many samples converting to an array costs more than it saves
+MIN_VECTOR_SAMPLES = 64
+
+
+def enabled(samples: Sequence[float]) -> bool:
+    """Whether the NumPy engine should handle this window."""
+    return np is not None and len(samples) >= MIN_VECTOR_SAMPLES
+
+
+def as_array(samples: Sequence[float]):
+    """Contiguous float64 array of the samples, zero-copy for memoryviews/arrays of doubles."""
+    if isinstance(samples, np.ndarray):
+        return samples.astype(np.float64, copy=False)
+    try:
+        return np.frombuffer(samples, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.asarray(samples, dtype=np.float64)
+
+
+def mean(a) -> float:
+    return float(a.mean())
+
+
+def median(a) -> float:
+    """Median by selection (O(n) partition) instead of a full sort."""
+    n = a.size
+    mid = n // 2
+    if n % 2:
+        return float(np.partition(a, mid)[mid])
+    part = np.partition(a, (mid - 1, mid))
+    return float((part[mid - 1] + part[mid]) / 2)
+
+
+def trimmed_mean(a, k: int) -> float:
+    """Mean without the k smallest and k largest values; partitioning around both cut points suffices."""
+    n = a.size
+    if k <= 0:
+        return mean(a)
+    part = np.partition(a, (k, n - k - 1))
+    return float(part[k : n - k].mean())
+
+
+def median_of_means(a, bins: int) -> float:
+    """Median of consecutive bin means (arrival order), binned by reshaping."""
+    n = a.size
+    size = ceil(n / min(bins, n))
+    full = n // size
+    means = a[: full * size].reshape(full, size).mean(axis=1)
+    if full * size < n:
+        means = np.append(means, a[full * size :].mean())
+    return float(np.median(means))
+
+
+def sort_samples(samples: Sequence[float]):
+    """Sorted copy of a window to share between strategies (C sort when the engine is enabled)."""
+    if enabled(samples):
+        return np.sort(as_array(samples))
+    return sorted(samples)
@@ -0,0 +1,72 @@
+"""Per-event cost of the shared power aggregator versus the number of meters.
+
+Run directly for a table: python -m tests.benchmarks.test_power_aggregator_bench
+The timing test runs only with pytest --benchmark.
+"""
+import time
+from typing import Dict, List
+
+import pytest
+from homeassistant.core import State
+
+from custom_components.power_consumption_analyser.model.power import PowerAggregator
+
+METER_COUNTS = [10, 100, 1000, 5000]
+EVENTS = 20000
+
+
+def _rescan_untracked(states: Dict[str, State], meter_ids: List[str], home: str) -> float:
+    # Previous per-sensor approach: re-parse every meter on each event
+    tracked = 0.0
+    for eid in set(meter_ids):
+        st = states.get(eid)
+        try:
+            tracked += float(st.state) if st and st.state not in ("unknown", "unavailable") else 0.0
+        except Exception:
+            pass
+    return max(float(states[home].state) - tracked, 0.0)
+
+
+def _bench_aggregator(n_meters: int, events: int = EVENTS) -> float:
+    ids = [f"sensor.m{i}" for i in range(n_meters)]
+    agg = PowerAggregator()
+    agg.set_home("sensor.home", State("sensor.home", "100000"))
+    agg.sync_meters(ids, lambda eid: State(eid, "10"))
+    # Prebuild states so only aggregator cost is measured
+    new_states = [State(ids[i % n_meters], str(10 + (i % 7))) for i in range(events)]
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for st in new_states:
+            agg.update(st.entity_id, st)
+            agg.untracked
+        best = min(best, time.perf_counter() - start)
+    return best / events
+
+
+def _bench_rescan(n_meters: int, events: int = 200) -> float:
+    ids = [f"sensor.m{i}" for i in range(n_meters)]
+    states = {eid: State(eid, "10") for eid in ids}
+    states["sensor.home"] = State("sensor.home", "100000")
+    start = time.perf_counter()
+    for _ in range(events):
+        _rescan_untracked(states, ids, "sensor.home")
+    return (time.perf_counter() - start) / events
+
+
+@pytest.mark.benchmark
+def test_cost_per_event_stays_flat_as_meter_count_grows():
+    small = _bench_aggregator(METER_COUNTS[0])
+    large = _bench_aggregator(METER_COUNTS[-1])
+    # O(1) per event: a 500x larger meter set must not make events meaningfully slower
+    assert large < small * 3
+
+
+def main() -> None:
+    print(f"{'meters':>8} {'aggregator us/event':>20} {'rescan us/event':>16}")
+    for n in METER_COUNTS:
+        print(f"{n:>8} {_bench_aggregator(n) * 1e6:>20.2f} {_bench_rescan(n) * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cost of the robust strategies: M-estimators (bounded IRLS) and the two-sample Hodges-Lehmann shift.
+
+The Hodges-Lehmann selection is compared with the naive median of all m * n pairwise differences.
+Run directly for a table: python -m tests.benchmarks.test_robust_strategies_bench
+The timing test runs only with pytest --benchmark.
+"""
+import random
+import time
+from statistics import median
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.m_estimator import HuberStrategy, TukeyStrategy
+from custom_components.power_consumption_analyser.strategies.hodges_lehmann import hodges_lehmann_shift
+
+SIZES = [1000, 10000, 100000]
+
+
+def _samples(n: int, level: float, seed: int):
+    rng = random.Random(seed)
+    return [level + rng.gauss(0, 20) + (1000.0 if rng.random() < 0.03 else 0.0) for _ in range(n)]
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _naive_hl(on, off) -> float:
+    return median([x - y for x in on for y in off])
+
+
+def test_hodges_lehmann_selection_matches_pairwise_median():
+    on, off = _samples(1000, 500.0, 1), _samples(1000, 300.0, 2)
+    saved = vectorized.np
+    vectorized.np = None
+    try:
+        assert hodges_lehmann_shift(on, off) == _naive_hl(on, off)
+    finally:
+        vectorized.np = saved
+
+
+@pytest.mark.benchmark
+def test_hodges_lehmann_selection_beats_pairwise_sort():
+    on, off = _samples(1000, 500.0, 1), _samples(1000, 300.0, 2)
+    saved = vectorized.np
+    vectorized.np = None
+    try:
+        fast = _time(lambda: hodges_lehmann_shift(on, off), repeat=1)
+    finally:
+        vectorized.np = saved
+    naive = _time(lambda: _naive_hl(on, off), repeat=1)
+    # 1M pairwise differences versus O(n log n) selection, both pure Python
+    assert fast * 5 < naive
+
+
+def test_m_estimators_cost_is_linear_per_iteration():
+    on = MeasurementWindow(baseline=500.0, samples=[500.0])
+    for strat in (HuberStrategy(), TukeyStrategy()):
+        res = strat.compute(on, MeasurementWindow(baseline=500.0, samples=_samples(10000, 300.0, 3)))
+        assert res["iterations"] <= 20
+
+
+def main() -> None:
+    on1 = MeasurementWindow(baseline=500.0, samples=[500.0])
+    print(f"{'samples':>8} {'huber ms':>9} {'tukey ms':>9} {'HL n x n ms':>12} {'HL naive ms':>12}")
+    for n in SIZES:
+        off = _samples(n, 300.0, n)
+        on = _samples(n, 500.0, n + 1)
+        window = MeasurementWindow(baseline=500.0, samples=off)
+        hub = _time(lambda: HuberStrategy().compute(on1, window)) * 1e3
+        tuk = _time(lambda: TukeyStrategy().compute(on1, window)) * 1e3
+        hl = _time(lambda: hodges_lehmann_shift(on, off), repeat=1) * 1e3
+        naive = f"{_time(lambda: _naive_hl(on, off), repeat=1) * 1e3:12.1f}" if n <= 1000 else f"{'-':>12}"
+        print(f"{n:>8} {hub:9.2f} {tuk:9.2f} {hl:12.1f} {naive}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""NumPy strategy engine versus the pure-Python strategies at large window sizes.
+
+Run directly for a table: python -m tests.benchmarks.test_strategy_engine_bench
+The timing test runs only with pytest --benchmark.
+"""
+import random
+import time
+from array import array
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.average import AverageStrategy
+from custom_components.power_consumption_analyser.strategies.median import MedianStrategy
+from custom_components.power_consumption_analyser.strategies.trimmed_mean import TrimmedMeanStrategy
+from custom_components.power_consumption_analyser.strategies.median_of_means import MedianOfMeansStrategy
+
+SIZES = [1000, 10000, 100000]
+STRATS = [AverageStrategy(), MedianStrategy(), TrimmedMeanStrategy(0.2), MedianOfMeansStrategy(3)]
+
+
+def _window(n: int) -> array:
+    rng = random.Random(n)
+    return array("d", (rng.gauss(300, 20) for _ in range(n)))
+
+
+def _bench(strat, buf: array, repeat: int = 3) -> float:
+    on = MeasurementWindow(baseline=400.0, samples=[400.0])
+    best = float("inf")
+    with memoryview(buf) as view:
+        off = MeasurementWindow(baseline=400.0, samples=view)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            strat.compute(on, off)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _bench_pure(strat, buf: array) -> float:
+    saved = vectorized.np
+    vectorized.np = None
+    try:
+        return _bench(strat, buf)
+    finally:
+        vectorized.np = saved
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(vectorized.np is None, reason="NumPy not installed")
+def test_engine_is_10x_faster_at_100k_samples():
+    buf = _window(100000)
+    fast = sum(_bench(s, buf) for s in STRATS)
+    slow = sum(_bench_pure(s, buf) for s in STRATS)
+    assert slow > 10 * fast
+
+
+def main() -> None:
+    print(f"{'strategy':>16} {'samples':>8} {'python ms':>10} {'numpy ms':>9} {'speed-up':>9}")
+    for n in SIZES:
+        buf = _window(n)
+        for s in STRATS:
+            slow, fast = _bench_pure(s, buf), _bench(s, buf)
+            print(f"{s.key:>16} {n:>8} {slow * 1e3:>10.3f} {fast * 1e3:>9.3f} {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
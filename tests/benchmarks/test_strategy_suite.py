@@ -0,0 +1,205 @@
+"""Benchmark suite for the effect strategies and the finalize statistics path.
+
+Synthetic OFF windows (Gaussian noise, heavy-tailed spikes, a step change, a cycling
+fridge) at 10 to 1,000,000 samples; per strategy, engine and window: time per compute(),
+peak allocation and estimator error against the known OFF level. Results are written as
+JSON so releases can be compared:
+
+    python -m tests.benchmarks.test_strategy_suite --out bench.json
+    python -m tests.benchmarks.test_strategy_suite --out new.json --compare bench.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from custom_components.power_consumption_analyser.measurement import STRATEGIES, evaluate_strategies
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.streaming import RunningStats
+
+SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+BASELINE_W = 500.0
+OFF_LEVEL_W = 300.0  # true untracked level while the circuit is off -> true effect 200 W
+SEED = 1234
+
+
+def _gaussian(rng: random.Random, n: int) -> List[float]:
+    return [OFF_LEVEL_W + rng.gauss(0, 15) for _ in range(n)]
+
+
+def _spikes(rng: random.Random, n: int) -> List[float]:
+    # Short kettle/induction bursts on other circuits: 3 % of samples, +0.5..2 kW
+    return [OFF_LEVEL_W + rng.gauss(0, 15) + (rng.uniform(500, 2000) if rng.random() < 0.03 else 0.0) for _ in range(n)]
+
+
+def _step(rng: random.Random, n: int) -> List[float]:
+    # Another appliance switches on (+80 W) 60 % into the window
+    cut = int(n * 0.6)
+    return [OFF_LEVEL_W + rng.gauss(0, 15) + (80.0 if i >= cut else 0.0) for i in range(n)]
+
+
+def _fridge(rng: random.Random, n: int) -> List[float]:
+    # Compressor cycling: +90 W for 40 % of each period, period ~ n/3 samples (at least 10)
+    period = max(10, n // 3)
+    return [OFF_LEVEL_W + rng.gauss(0, 10) + (90.0 if (i % period) < 0.4 * period else 0.0) for i in range(n)]
+
+
+DISTRIBUTIONS: Dict[str, Callable[[random.Random, int], List[float]]] = {
+    "gaussian": _gaussian,
+    "spikes": _spikes,
+    "step": _step,
+    "fridge": _fridge,
+}
+
+
+def _timed(fn: Callable[[], float], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_alloc(fn: Callable[[], float]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _engines() -> List[str]:
+    return ["numpy", "python"] if vectorized.np is not None else ["python"]
+
+
+def _run_case(dist: str, n: int, engine: str, window: array) -> List[dict]:
+    data = SimpleNamespace(trim_fraction=20)
+    on = MeasurementWindow(baseline=BASELINE_W, samples=[BASELINE_W])
+    repeat = 3 if n <= 100000 else 1
+    records = []
+    saved = vectorized.np
+    if engine == "python":
+        vectorized.np = None
+    try:
+        with memoryview(window) as view:
+            off = MeasurementWindow(baseline=BASELINE_W, samples=view)
+            paths: Dict[str, Callable[[], float]] = {
+                key: (lambda s=strat: s.compute(on, off)["effect"]) for key, strat in STRATEGIES.items()
+            }
+
+            def _running_stats() -> float:
+                # Paid per sample while sampling, listed for the whole window
+                stats = RunningStats()
+                for x in view:
+                    stats.push(x)
+                return BASELINE_W - stats.mean
+
+            stats = RunningStats()
+            for x in view:
+                stats.push(x)
+            off_stats = MeasurementWindow(baseline=BASELINE_W, samples=view, stats=stats)
+
+            def _finalize() -> float:
+                # What finishing a window costs: one sort shared by all strategies
+                return evaluate_strategies(data, on, off_stats)["average"]
+
+            paths["running_stats"] = _running_stats
+            paths["finalize"] = _finalize
+            for path, fn in paths.items():
+                effect = float(fn())
+                records.append({
+                    "distribution": dist,
+                    "samples": n,
+                    "path": path,
+                    "engine": engine,
+                    "time_ms": round(_timed(fn, repeat) * 1e3, 4),
+                    "peak_alloc_kib": round(_peak_alloc(fn) / 1024, 1),
+                    "effect": round(effect, 3),
+                    "error_w": round(abs(effect - (BASELINE_W - OFF_LEVEL_W)), 3),
+                })
+    finally:
+        vectorized.np = saved
+    return records
+
+
+def run_suite(sizes: List[int] = SIZES, distributions: Optional[List[str]] = None, engines: Optional[List[str]] = None) -> dict:
+    results: List[dict] = []
+    for dist in distributions or list(DISTRIBUTIONS):
+        for n in sizes:
+            window = array("d", DISTRIBUTIONS[dist](random.Random(f"{SEED}:{dist}:{n}"), n))
+            for engine in engines or _engines():
+                results.append(_run_case(dist, n, engine, window))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "numpy": getattr(vectorized.np, "__version__", None),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "true_effect_w": BASELINE_W - OFF_LEVEL_W,
+        },
+        "results": [r for case in results for r in case],
+    }
+
+
+def compare(new: dict, old: dict, threshold: float = 1.25) -> List[str]:
+    """Cases whose time grew by more than threshold between two suite runs."""
+    key = lambda r: (r["distribution"], r["samples"], r["path"], r["engine"])
+    before = {key(r): r for r in old.get("results", [])}
+    slower = []
+    for r in new.get("results", []):
+        prev = before.get(key(r))
+        if prev and prev["time_ms"] > 0 and r["time_ms"] / prev["time_ms"] > threshold:
+            slower.append(f"{'/'.join(map(str, key(r)))}: {prev['time_ms']:.3f} -> {r['time_ms']:.3f} ms")
+    return slower
+
+
+def test_suite_reports_time_allocations_and_error():
+    report = run_suite(sizes=[10, 2000], distributions=["gaussian", "spikes"])
+    json.dumps(report)
+    paths = {r["path"] for r in report["results"]}
+    assert paths == set(STRATEGIES) | {"running_stats", "finalize"}
+    assert all(r["time_ms"] >= 0 and r["peak_alloc_kib"] >= 0 for r in report["results"])
+    err = {(r["distribution"], r["path"]): r["error_w"] for r in report["results"] if r["samples"] == 2000 and r["engine"] == "python"}
+    # Spikes bias the mean; the robust estimators stay close to the true effect
+    assert err[("spikes", "median")] < 5 < err[("spikes", "average")]
+    assert err[("gaussian", "average")] < 2
+    assert compare(report, report) == []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--engines", nargs="+", choices=["numpy", "python"])
+    parser.add_argument("--out", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON report; list cases more than 25 %% slower")
+    args = parser.parse_args()
+    report = run_suite(args.sizes, args.distributions, args.engines)
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            slower = compare(report, json.load(fh))
+        for line in slower:
+            print("slower:", line, file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import pytest
+from array import array
+from datetime import timedelta
 from homeassistant.core import HomeAssistant
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
 
 from custom_components.power_consumption_analyser import DOMAIN
+from custom_components.power_consumption_analyser.model.store import PERSISTED, PERSISTED_WINDOWS, SAVE_DELAY_S, STORAGE_KEY
 
 @pytest.mark.asyncio
 async def test_device_buttons_stop_and_reset(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
@@ -42,3 +45,39 @@ async def test_device_buttons_stop_and_reset(hass: HomeAssistant, sample_yaml, e
     await hass.services.async_call("button", "press", {"entity_id": "button.stop_workflow"}, blocking=True)
     await hass.async_block_till_done()
 
+
+
+@pytest.mark.asyncio
+async def test_reset_clears_everything_persisted(hass: HomeAssistant, sample_yaml, enable_custom_integrations, hass_storage, freezer):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="testreset",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    data = hass.data[DOMAIN]
+    data.measure_results["2F7"] = 12.3
+    data.measure_stats["2F7"] = {"median_off": 300.0}
+    data.measure_baseline["2F7"] = 312.3
+    data.settle_prior["2F7"] = 8.0
+    data.measure_windows["2F7"] = array("d", [300.0, 301.0])
+
+    await hass.services.async_call("button", "press", {"entity_id": "button.reset_values"}, blocking=True)
+    await hass.async_block_till_done()
+    for attr in PERSISTED + PERSISTED_WINDOWS:
+        assert getattr(data, attr) == {}, attr
+
+    # The emptied state is written, so nothing comes back after a restart
+    freezer.tick(timedelta(seconds=SAVE_DELAY_S + 1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    saved = hass_storage[STORAGE_KEY]["data"]
+    assert all(saved[attr] == {} for attr in PERSISTED + PERSISTED_WINDOWS)
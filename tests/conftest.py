@@ -8,6 +8,18 @@ import pytest
 
 pytest_plugins = ["pytest_homeassistant_custom_component"]
 
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", default=False, help="run wall-clock benchmark tests")
+
+# Wall-clock ratios depend on the machine and its load: opt-in only
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
 # Ignore legacy files after test split to avoid duplicate module basenames
 def pytest_ignore_collect(collection_path: Path, config):
     p = str(collection_path)
@@ -0,0 +1,97 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+from custom_components.power_consumption_analyser.model import history_db
+from custom_components.power_consumption_analyser.model.history_db import WRITE_DELAY_S, HistoryDB, history_row
+
+DAY = 86400.0
+
+
+def _entry(day, effect, valid=True):
+    return {"ts": f"2026-01-{day:02d}T12:00:00+00:00", "effect": effect, "samples": 30, "valid": valid, "strategy": "median"}
+
+
+def test_range_query_and_aggregates_in_database(tmp_path):
+    db = HistoryDB(str(tmp_path / "h.db"))
+    # A month of nightly sweeps: standby of 2F7 creeping up by 1 W a day
+    db.append([history_row("2F7", _entry(d, 20.0 + d)) for d in range(1, 31)])
+    db.append([history_row("3F11", _entry(d, 100.0)) for d in range(1, 31)])
+    start = history_row("x", _entry(10, 0))[1] - 1
+    end = history_row("x", _entry(20, 0))[1] - 1
+    rows = db.query(circuit="2F7", start=start, end=end)
+    assert [r["effect"] for r in rows] == [20.0 + d for d in range(10, 20)]
+    assert rows[0]["valid"] == 1 and rows[0]["strategy"] == "median" and rows[0]["baseline"] is None
+    assert len(db.query(start=start, end=end, limit=5)) == 5
+
+    (agg,) = db.aggregate(circuit="2F7")
+    assert agg["count"] == 30 and agg["mean"] == pytest.approx(35.5)
+    assert agg["min"] == 21.0 and agg["max"] == 50.0
+    weekly = db.aggregate(circuit="2F7", bucket_s=7 * DAY)
+    assert sum(b["count"] for b in weekly) == 30
+    assert [b["mean"] for b in weekly] == sorted(b["mean"] for b in weekly)
+    assert {a["circuit"] for a in db.aggregate()} == {"2F7", "3F11"}
+    db.close()
+
+
+def test_std_is_exact_for_large_effects_with_small_spread(tmp_path):
+    db = HistoryDB(str(tmp_path / "h.db"))
+    db.append([history_row("2F7", _entry(d, 1e9 + d % 3)) for d in range(1, 31)])
+    (agg,) = db.aggregate(circuit="2F7")
+    assert agg["std"] == pytest.approx((2 / 3) ** 0.5, rel=1e-9)
+    db.close()
+
+
+def test_rows_survive_reopening(tmp_path):
+    path = str(tmp_path / "h.db")
+    db = HistoryDB(path)
+    db.append([history_row("2F7", _entry(1, 25.0, valid=False))])
+    db.close()
+    (row,) = HistoryDB(path).query()
+    assert row["circuit"] == "2F7" and row["effect"] == 25.0 and row["valid"] == 0
+    assert history_row("2F7", {"effect": 1.0}) is None
+
+
+@pytest.mark.asyncio
+async def test_finished_measurements_are_appended_and_queryable(
+    hass: HomeAssistant, sample_yaml, enable_custom_integrations, tmp_path, monkeypatch, freezer
+):
+    monkeypatch.setattr(history_db, "HISTORY_DB_FILE", str(tmp_path / "h.db"))
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="long_term_history",
+        options={"long_term_history": True, "history_size": 2},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    for d in range(1, 6):
+        hist = data.measure_history.setdefault("2F7", [])
+        hist.append(_entry(d, 30.0 + d))
+        del hist[:-2]
+        hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "2F7"})
+        await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=WRITE_DELAY_S + 1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    # In memory only the last two; on disk all five
+    assert len(data.measure_history["2F7"]) == 2
+    res = await hass.services.async_call(
+        DOMAIN, "query_effect_history", {"circuit_id": "2F7", "start": "2026-01-02T00:00:00+00:00"}, blocking=True, return_response=True
+    )
+    assert [e["effect"] for e in res["entries"]] == [32.0, 33.0, 34.0, 35.0]
+    assert res["entries"][0]["ts"].startswith("2026-01-02T12:00:00") and res["entries"][0]["valid"] is True
+    res = await hass.services.async_call(DOMAIN, "query_effect_history", {"aggregate": True}, blocking=True, return_response=True)
+    (agg,) = res["aggregates"]
+    assert agg["count"] == 5 and agg["mean"] == pytest.approx(33.0)
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,121 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+from custom_components.power_consumption_analyser.model.store import SAVE_DELAY_S, STORAGE_KEY, STORAGE_VERSION
+
+
+def _entry(sample_yaml, uid):
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id=uid,
+    )
+
+
+@pytest.mark.asyncio
+async def test_results_are_restored_before_sensors(hass: HomeAssistant, sample_yaml, enable_custom_integrations, hass_storage):
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "measure_results": {"3F11": 123.4},
+            "measure_valid": {"3F11": True},
+            "measure_history": {"3F11": [{"effect": 123.4, "samples": 30}]},
+        },
+    }
+    entry = _entry(sample_yaml, "store_restore")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    st = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect")
+    assert float(st.state) == pytest.approx(123.4)
+    assert st.attributes["history_size"] == 1 and st.attributes["valid"] is True
+
+
+@pytest.mark.asyncio
+async def test_finished_measurement_is_saved_debounced(hass: HomeAssistant, sample_yaml, enable_custom_integrations, hass_storage, freezer):
+    entry = _entry(sample_yaml, "store_save")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    data.measure_results["3F11"] = 80.0
+    data.measure_history["3F11"] = [{"effect": 80.0}]
+    hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "3F11"})
+    data.measure_results["2F7"] = 40.0
+    hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "2F7"})
+    await hass.async_block_till_done()
+    # Nothing written until the delay has passed; then both changes in one write
+    assert STORAGE_KEY not in hass_storage
+    freezer.tick(timedelta(seconds=SAVE_DELAY_S + 1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    saved = hass_storage[STORAGE_KEY]
+    assert saved["version"] == STORAGE_VERSION
+    assert saved["data"]["measure_results"] == {"3F11": 80.0, "2F7": 40.0}
+    assert saved["data"]["measure_history"]["3F11"] == [{"effect": 80.0}]
+
+
+@pytest.mark.asyncio
+async def test_unload_flushes_pending_changes(hass: HomeAssistant, sample_yaml, enable_custom_integrations, hass_storage):
+    entry = _entry(sample_yaml, "store_unload")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    data.measure_results["3F11"] = 55.0
+    hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "3F11"})
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY]["data"]["measure_results"] == {"3F11": 55.0}
+
+
+@pytest.mark.asyncio
+async def test_sample_windows_survive_a_restart(hass: HomeAssistant, sample_yaml, enable_custom_integrations, hass_storage, freezer):
+    off = [300.0 + (i % 5) for i in range(40)]
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "measure_results": {"3F11": 200.0},
+            "measure_effects": {"3F11": {"average": 198.0}},
+            "measure_baseline": {"3F11": 500.0},
+            "measure_windows": {"3F11": off},
+            "measure_on_windows": {"3F11": [500.0, 501.0, 499.0]},
+            "measure_window_times": {"3F11": [float(i) for i in range(40)]},
+        },
+    }
+    entry = _entry(sample_yaml, "store_windows")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    assert data.measure_windows["3F11"].typecode == "d"
+    assert list(data.measure_windows["3F11"]) == off
+    assert list(data.measure_on_windows["3F11"]) == [500.0, 501.0, 499.0]
+
+    # Confidence intervals can be computed from the restored window
+    await hass.services.async_call(DOMAIN, "recompute_confidence_intervals", {"resamples": 200}, blocking=True)
+    await hass.async_block_till_done()
+    assert "ci_low" in data.measure_stats["3F11"]
+
+    # And the windows are written back as lists
+    hass.bus.async_fire(f"{DOMAIN}.measure_finished", {"circuit_id": "3F11"})
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=SAVE_DELAY_S + 1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    saved = hass_storage[STORAGE_KEY]["data"]
+    assert saved["measure_windows"]["3F11"] == off
+    assert saved["measure_window_times"]["3F11"] == [float(i) for i in range(40)]
@@ -1,7 +1,7 @@
 import pytest
 from homeassistant.core import HomeAssistant
 
-from custom_components.power_consumption_analyser.model.data import PCAData, Circuit
+from custom_components.power_consumption_analyser.model.data import PCAData, Circuit, circuit_phases
 
 @pytest.mark.asyncio
 async def test_initializes_with_empty_collections(hass: HomeAssistant):
@@ -89,3 +89,20 @@ async def test_workflow_fields_change_as_expected(hass: HomeAssistant):
     data.workflow_queue = []
     assert data.workflow_active is False
     assert data.workflow_queue == []
+
+def test_circuit_phases_parses_single_multi_and_three_phase():
+    assert circuit_phases("L2") == ("L2",)
+    assert circuit_phases("l1/l3") == ("L1", "L3")
+    assert circuit_phases("3P") == ("L1", "L2", "L3")
+    assert circuit_phases("") == ()
+
+@pytest.mark.asyncio
+async def test_meter_groups_cover_circuit_rcd_and_phase(hass: HomeAssistant):
+    data = PCAData(hass)
+    data.circuits["1F1"] = Circuit(id="1F1", phase="L1")
+    data.circuits["1F2"] = Circuit(id="1F2", phase="3P")
+    data.meter_to_circuit = {"sensor.m1": "1F1", "sensor.m2": "1F2"}
+    data.rcd_to_circuits = {"RCD-A": ["1F1", "1F2"]}
+    groups = data.meter_groups()
+    assert groups["sensor.m1"] == [("circuit", "1F1", 1.0), ("rcd", "RCD-A", 1.0), ("phase", "L1", 1.0)]
+    assert [r for r in groups["sensor.m2"] if r[0] == "phase"] == [("phase", ph, 1.0 / 3) for ph in ("L1", "L2", "L3")]
@@ -0,0 +1,172 @@
+import pytest
+from homeassistant.core import State
+
+from custom_components.power_consumption_analyser.model.power import PowerAggregator
+
+
+def _states(**values):
+    return {eid: State(eid, str(v)) for eid, v in values.items()}
+
+
+def test_sync_seeds_totals_from_current_states():
+    states = _states(**{"sensor.a": 100, "sensor.b": 50.5, "sensor.home": 400})
+    agg = PowerAggregator()
+    agg.set_home("sensor.home", states["sensor.home"])
+    assert agg.sync_meters(["sensor.a", "sensor.b"], states.get) is True
+    assert agg.tracked == pytest.approx(150.5)
+    assert agg.untracked == pytest.approx(249.5)
+    assert agg.coverage == pytest.approx(150.5 / 400 * 100)
+    assert agg.ratio == pytest.approx(150.5 / 249.5)
+    assert agg.entity_ids() == {"sensor.a", "sensor.b", "sensor.home"}
+
+
+def test_update_applies_delta_and_is_idempotent():
+    states = _states(**{"sensor.a": 100, "sensor.b": 20})
+    agg = PowerAggregator()
+    agg.sync_meters(states.keys(), states.get)
+    new_state = State("sensor.a", "130")
+    assert agg.update("sensor.a", new_state) is True
+    assert agg.update("sensor.a", new_state) is True
+    assert agg.tracked == pytest.approx(150.0)
+    # Unavailable and non-numeric states count as 0 W
+    agg.update("sensor.b", State("sensor.b", "unavailable"))
+    assert agg.tracked == pytest.approx(130.0)
+    agg.update("sensor.a", State("sensor.a", "garbage"))
+    assert agg.tracked == pytest.approx(0.0)
+    # Untracked entity is ignored
+    assert agg.update("sensor.other", State("sensor.other", "999")) is False
+    assert agg.tracked == pytest.approx(0.0)
+
+
+def test_link_unlink_and_label_changes_while_running():
+    states = _states(**{"sensor.a": 10, "sensor.b": 20, "sensor.c": 30, "sensor.home": 100})
+    agg = PowerAggregator()
+    agg.set_home("sensor.home", states["sensor.home"])
+    agg.sync_meters(["sensor.a"], states.get)
+    assert agg.tracked == pytest.approx(10.0)
+    # Link b, label c
+    agg.sync_meters(["sensor.a", "sensor.b", "sensor.c"], states.get)
+    assert agg.tracked == pytest.approx(60.0)
+    # Unlink a; unchanged membership returns False
+    assert agg.sync_meters(["sensor.b", "sensor.c"], states.get) is True
+    assert agg.sync_meters(["sensor.b", "sensor.c"], states.get) is False
+    assert agg.tracked == pytest.approx(50.0)
+    assert "sensor.a" not in agg
+    # Updates for a removed meter no longer count
+    agg.update("sensor.a", State("sensor.a", "500"))
+    assert agg.tracked == pytest.approx(50.0)
+
+
+def test_untracked_clamped_and_ratio_undefined_without_untracked():
+    states = _states(**{"sensor.a": 300, "sensor.home": 200})
+    agg = PowerAggregator()
+    agg.set_home("sensor.home", states["sensor.home"])
+    agg.sync_meters(["sensor.a"], states.get)
+    assert agg.untracked == 0.0
+    assert agg.ratio is None
+    agg.update("sensor.home", State("sensor.home", "unavailable"))
+    assert agg.coverage == 0.0
+
+
+def test_running_total_matches_exact_sum_after_many_updates():
+    agg = PowerAggregator()
+    ids = [f"sensor.m{i}" for i in range(50)]
+    agg.sync_meters(ids, lambda eid: State(eid, "0"))
+    expected = {eid: 0.0 for eid in ids}
+    for step in range(25000):
+        eid = ids[step % len(ids)]
+        val = (step * 7.31) % 1234.567
+        agg.update(eid, State(eid, str(val)))
+        expected[eid] = val
+    assert agg.tracked == pytest.approx(sum(expected.values()), abs=1e-6)
+
+
+def test_unavailable_set_tracks_availability_and_last_known_power():
+    states = _states(**{"sensor.a": 800, "sensor.b": 20, "sensor.home": 1000})
+    agg = PowerAggregator()
+    agg.set_home("sensor.home", states["sensor.home"])
+    agg.sync_meters(["sensor.a", "sensor.b"], states.get)
+    assert agg.unavailable_count == 0
+    agg.update("sensor.a", State("sensor.a", "unavailable"))
+    agg.update("sensor.b", State("sensor.b", "unknown"))
+    assert agg.unavailable_ids() == ["sensor.a", "sensor.b"]
+    # Outaged meters still count as 0 W, but their last known power is kept
+    assert agg.untracked == pytest.approx(1000.0)
+    assert agg.outages() == {"sensor.a": 800.0, "sensor.b": 20.0}
+    assert agg.outages(50.0) == {"sensor.a": 800.0}
+    assert agg.outages(50.0, exclude={"sensor.a"}) == {}
+    agg.update("sensor.a", State("sensor.a", "750"))
+    assert agg.unavailable_ids() == ["sensor.b"]
+    assert agg.last_known("sensor.a") == 750.0
+    # Other non-numeric states count as 0 W, not as an outage
+    agg.update("sensor.a", State("sensor.a", "error"))
+    assert agg.unavailable_ids() == ["sensor.b"]
+    assert agg.tracked == pytest.approx(0.0)
+    # Unlinking drops the meter from the set
+    agg.sync_meters(["sensor.a"], states.get)
+    assert agg.unavailable_count == 0
+
+
+def test_subtotals_follow_meter_deltas_and_regrouping():
+    states = _states(**{"sensor.a": 100, "sensor.b": 300, "sensor.c": 60})
+    agg = PowerAggregator()
+    agg.sync_meters(states.keys(), states.get)
+    groups = {
+        "sensor.a": [("circuit", "1F1", 1.0), ("rcd", "FI-1", 1.0), ("phase", "L1", 1.0)],
+        "sensor.b": [("circuit", "1F2", 1.0), ("rcd", "FI-1", 1.0), ("phase", "L2", 1.0)],
+        "sensor.c": [("circuit", "1F3", 1.0)] + [("phase", ph, 1.0 / 3) for ph in ("L1", "L2", "L3")],
+    }
+    assert agg.set_groups(groups) is True
+    assert agg.set_groups(groups) is False
+    assert agg.subtotals("rcd") == {"FI-1": pytest.approx(400.0)}
+    assert agg.subtotal("phase", "L1") == pytest.approx(120.0)
+    agg.update("sensor.b", State("sensor.b", "250"))
+    agg.update("sensor.c", State("sensor.c", "unavailable"))
+    assert agg.subtotal("circuit", "1F2") == pytest.approx(250.0)
+    assert agg.subtotal("rcd", "FI-1") == pytest.approx(350.0)
+    assert agg.subtotal("phase", "L2") == pytest.approx(250.0)
+    assert agg.subtotal("phase", "L3") == pytest.approx(0.0)
+    # Moving a meter to another circuit moves its sub-total
+    groups["sensor.a"] = [("circuit", "1F3", 1.0)]
+    agg.set_groups(groups)
+    assert agg.subtotal("circuit", "1F1") == 0.0
+    assert agg.subtotal("circuit", "1F3") == pytest.approx(100.0)
+    assert agg.subtotal("rcd", "FI-1") == pytest.approx(250.0)
+    # Removing a meter drops its contribution
+    agg.sync_meters(["sensor.a", "sensor.c"], states.get)
+    assert agg.subtotal("rcd", "FI-1") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_step_snapshot_tracked_power_excludes_label_only_meters(hass):
+    from custom_components.power_consumption_analyser.model import PCAData
+    from custom_components.power_consumption_analyser.services.helpers import calc_tracked_power
+
+    data = PCAData(hass)
+    data.meter_to_circuit = {"sensor.mapped": "2F7", "sensor.missing": "3F11"}
+    states = _states(**{"sensor.mapped": 120, "sensor.label_only": 80})
+    hass.states.async_set("sensor.missing", "15")
+    data.power.sync_meters(states.keys(), states.get)
+    # The aggregator's tracked total includes the labelled meter; the snapshot does not
+    assert data.power.tracked == pytest.approx(200.0)
+    assert await calc_tracked_power(hass, data) == pytest.approx(135.0)
+
+
+
+@pytest.mark.asyncio
+async def test_step_snapshot_home_power_is_scaled_only_for_power_units(hass):
+    from custom_components.power_consumption_analyser import DOMAIN
+    from custom_components.power_consumption_analyser.model import PCAData
+    from custom_components.power_consumption_analyser.services.helpers import state_float
+
+    hass.states.async_set("sensor.home_kw", "1.2", {"unit_of_measurement": "kW"})
+    hass.states.async_set("sensor.home_w", "800", {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.energy", "3.5", {"unit_of_measurement": "kWh"})
+    expected = {"sensor.home_kw": 1200.0, "sensor.home_w": 800.0, "sensor.energy": 3.5}
+    # Same values without the integration and through its shared cache
+    for eid, w in expected.items():
+        assert await state_float(hass, eid) == pytest.approx(w)
+    hass.data[DOMAIN] = PCAData(hass)
+    for eid, w in expected.items():
+        assert await state_float(hass, eid) == pytest.approx(w)
+    assert await state_float(hass, None) == 0.0
@@ -0,0 +1,96 @@
+from statistics import mean
+
+from custom_components.power_consumption_analyser.model.samples import (
+    SampleBuffer,
+    SampleBufferPool,
+    TimedRing,
+    buffer_capacity,
+)
+from custom_components.power_consumption_analyser.model import samples as samples_mod
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.median_of_means import MedianOfMeansStrategy
+from custom_components.power_consumption_analyser.strategies.trimmed_mean import TrimmedMeanStrategy
+
+
+def test_capacity_from_duration_and_rate():
+    assert buffer_capacity(60, 1.0) == 61
+    assert buffer_capacity(3600, 10.0) == 36001
+    assert buffer_capacity(0, 1.0) == 16
+
+
+def test_append_grows_and_view_is_zero_copy():
+    buf = SampleBuffer(4)
+    for v in range(10):
+        buf.append(float(v))
+    assert len(buf) == 10
+    assert buf.capacity >= 10
+    view = buf.view()
+    assert view.obj is buf._buf
+    assert list(view) == [float(v) for v in range(10)]
+    assert mean(view) == 4.5
+    view.release()
+
+
+def test_ring_keeps_latest_samples_in_order_at_cap(monkeypatch):
+    monkeypatch.setattr(samples_mod, "MAX_SAMPLES", 8)
+    buf = SampleBuffer(4)
+    for v in range(12):
+        buf.append(float(v))
+    assert buf.capacity == 8
+    assert buf.tolist() == [float(v) for v in range(4, 12)]
+
+
+def test_pool_recycles_released_buffers():
+    pool = SampleBufferPool(keep=1, max_capacity=100)
+    buf = pool.acquire(50)
+    buf.append(1.0)
+    pool.release(buf)
+    again = pool.acquire(20)
+    assert again is buf and len(again) == 0
+    # Oversized buffers are not kept
+    big = pool.acquire(500)
+    pool.release(big)
+    assert pool.acquire(500) is not big
+
+
+def test_strategies_accept_memoryview_samples():
+    buf = SampleBuffer(8)
+    for v in (10.0, 11.0, 9.0, 50.0, 10.0, 10.0):
+        buf.append(v)
+    with buf.view() as view:
+        off = MeasurementWindow(baseline=100.0, samples=view)
+        on = MeasurementWindow(baseline=100.0, samples=[100.0])
+        tm = TrimmedMeanStrategy(trim=0.2).compute(on, off)
+        mom = MedianOfMeansStrategy(bins=3).compute(on, off)
+    assert tm["effect"] == 100.0 - mean([10.0, 10.0, 10.0, 11.0])
+    assert mom["effect"] == 100.0 - 10.5
+
+
+def test_timed_ring_keeps_recent_values_in_order():
+    ring = TimedRing(5)
+    assert ring.last_time() is None and list(ring.since(0.0)) == []
+    for t in range(8):
+        ring.append(float(t), 100.0 + t)
+    assert len(ring) == 5 and ring.last_time() == 7.0
+    # Wrapped: only the last five remain, oldest first
+    assert list(ring.since(0.0)) == [103.0, 104.0, 105.0, 106.0, 107.0]
+    assert list(ring.since(5.5)) == [106.0, 107.0]
+    ring.clear()
+    assert len(ring) == 0
+
+
+def test_timestamps_stay_aligned_through_growth_and_ring(monkeypatch):
+    monkeypatch.setattr(samples_mod, "MAX_SAMPLES", 8)
+    buf = SampleBuffer(2)
+    for v in range(12):
+        buf.append(100.0 + v, 1000.0 + v)
+    times = buf.times()
+    assert list(times) == [1000.0 + v for v in range(4, 12)]
+    assert buf.tolist() == [100.0 + v for v in range(4, 12)]
+    times.release()
+    # A sample without a timestamp makes the window untimed until cleared
+    buf.append(1.0)
+    assert buf.times() is None
+    buf.clear()
+    buf.append(1.0, 5.0)
+    assert list(buf.times()) == [5.0]
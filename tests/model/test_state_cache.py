@@ -0,0 +1,56 @@
+import pytest
+from homeassistant.core import State
+
+from custom_components.power_consumption_analyser.model.power import PowerAggregator
+from custom_components.power_consumption_analyser.model.state_cache import StateValueCache, parse_state
+
+
+def test_parse_state_resolves_units_and_availability():
+    assert parse_state(State("sensor.a", "1.5", {"unit_of_measurement": "kW"})).value == pytest.approx(1500.0)
+    p = parse_state(State("sensor.a", "42", {"unit_of_measurement": "W"}))
+    assert (p.value, p.available, p.unit) == (42.0, True, "W")
+    # Missing unit is taken as W
+    assert parse_state(State("sensor.a", "7")).value == 7.0
+    for st in (None, State("sensor.a", "unavailable"), State("sensor.a", "unknown")):
+        p = parse_state(st)
+        assert p.value == 0.0 and p.available is False
+    # Other non-numeric states read as 0 W but are not outages
+    p = parse_state(State("sensor.a", "n/a", {"unit_of_measurement": "W"}))
+    assert (p.value, p.available) == (0.0, True)
+
+
+def test_cache_hits_on_same_state_object_and_reparses_new_one():
+    cache = StateValueCache()
+    st = State("sensor.a", "2", {"unit_of_measurement": "kW"})
+    assert cache.value("sensor.a", st) == pytest.approx(2000.0)
+    assert cache.value("sensor.a", st) == pytest.approx(2000.0)
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Equal content but a new State object is a change per HA semantics
+    assert cache.value("sensor.a", State("sensor.a", "3", {"unit_of_measurement": "kW"})) == pytest.approx(3000.0)
+    assert cache.misses == 2
+    cache.discard("sensor.a")
+    cache.value("sensor.a", st)
+    assert cache.misses == 3
+
+
+def test_aggregator_mixes_kw_and_w_meters_through_shared_cache():
+    cache = StateValueCache()
+    agg = PowerAggregator(cache)
+    home = State("sensor.home", "3", {"unit_of_measurement": "kW"})
+    states = {
+        "sensor.a": State("sensor.a", "0.5", {"unit_of_measurement": "kW"}),
+        "sensor.b": State("sensor.b", "250", {"unit_of_measurement": "W"}),
+    }
+    agg.set_home("sensor.home", home)
+    agg.sync_meters(states.keys(), states.get)
+    assert agg.tracked == pytest.approx(750.0)
+    assert agg.untracked == pytest.approx(2250.0)
+    # Replaying the same State objects hits the cache and leaves totals unchanged
+    misses = cache.misses
+    agg.update("sensor.a", states["sensor.a"])
+    agg.update("sensor.home", home)
+    assert cache.misses == misses
+    assert agg.tracked == pytest.approx(750.0)
+    # Unlinking a meter drops its cache entry
+    agg.sync_meters(["sensor.b"], states.get)
+    assert "sensor.a" not in cache._entries
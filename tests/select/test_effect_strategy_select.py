@@ -39,3 +39,50 @@ async def test_select_entity_changes_strategy_and_persists(hass: HomeAssistant,
     # Options should now contain effect_strategy
     saved = hass.config_entries.async_entries(DOMAIN)[0].options.get("effect_strategy")
     assert saved == "median"
+
+
+@pytest.mark.asyncio
+async def test_strategy_change_rederives_past_measurements(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="select_rederive",
+        options={"pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # OFF window 400, 400, 100 (one spike down)
+    for v in (400, 401, 100):
+        hass.states.async_set("sensor.home_consumption_now_w", v)
+        await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_results["3F11"] == pytest.approx(500 - 901 / 3)
+    effects = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").attributes["effects"]
+    assert set(effects) == {
+        "average", "median", "trimmed_mean", "median_of_means", "huber", "tukey", "hodges_lehmann", "exponential",
+        "tw_average", "tw_median", "tw_trimmed_mean",
+    }
+
+    await hass.services.async_call(
+        "select",
+        "select_option",
+        {"entity_id": "select.power_consumption_analyser_effect_strategy", "option": "Median"},
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+    # No re-measurement: the kept window gives the median effect immediately
+    assert data.measure_results["3F11"] == 100.0
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").state) == 100.0
+    assert len(data.measure_windows["3F11"]) == 3
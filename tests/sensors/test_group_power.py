@@ -0,0 +1,118 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+@pytest.mark.asyncio
+async def test_circuit_rcd_and_phase_power(hass: HomeAssistant, temp_config_dir, enable_custom_integrations):
+    yaml_path = temp_config_dir / "unterverteilung.yaml"
+    yaml_path.write_text(
+        """
+        protection_devices:
+          - type: RCD
+            label: FI Kitchen
+            protects: ["2F7", "2F8"]
+        circuits:
+          - id: "2F7"
+            phase: L1
+            energy_meters: [sensor.kitchen_plug_power]
+          - id: "2F8"
+            phase: 3P
+            energy_meters: [sensor.oven_power]
+          - id: "3F11"
+            phase: L3
+        """,
+        encoding="utf-8",
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={"unterverteilung_path": str(yaml_path), "safe_circuits": [], "baseline_sensors": {}},
+        unique_id="group_power",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    hass.states.async_set("sensor.oven_power", 3000)
+    await hass.async_block_till_done()
+
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_2f7_tracked_power").state) == 100.0
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_2f8_tracked_power").state) == 3000.0
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_3f11_tracked_power").state) == 0.0
+    tracked = hass.states.get("sensor.power_consumption_analyser_tracked_power_sum")
+    assert tracked.attributes["by_phase"] == {"L1": 1100.0, "L2": 1000.0, "L3": 1000.0}
+    layout = hass.states.get("sensor.power_consumption_analyser_rcd_layout")
+    assert layout.attributes["load_w"] == {"FI Kitchen": 3100.0}
+
+    # Relinking a meter moves its load without rescanning
+    hass.states.async_set("sensor.oven_power", 2000)
+    await hass.services.async_call(
+        DOMAIN, "circuit_link_energy_meter",
+        {"entity_id": "sensor.oven_power", "circuit_id": "3F11"}, blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_2f8_tracked_power").state) == 0.0
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_3f11_tracked_power").state) == 2000.0
+    assert hass.states.get("sensor.power_consumption_analyser_rcd_layout").attributes["load_w"] == {"FI Kitchen": 100.0}
+    assert hass.states.get("sensor.power_consumption_analyser_tracked_power_sum").attributes["by_phase"] == {
+        "L1": 100.0, "L2": 0.0, "L3": 2000.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_rcd_layout_load_follows_publish_policy(hass: HomeAssistant, temp_config_dir, enable_custom_integrations):
+    yaml_path = temp_config_dir / "unterverteilung.yaml"
+    yaml_path.write_text(
+        """
+        protection_devices:
+          - type: RCD
+            label: FI Kitchen
+            protects: ["2F7"]
+        circuits:
+          - id: "2F7"
+            phase: L1
+            energy_meters: [sensor.kitchen_plug_power]
+        """,
+        encoding="utf-8",
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={"unterverteilung_path": str(yaml_path), "safe_circuits": [], "baseline_sensors": {}},
+        unique_id="rcd_layout_policy",
+        options={"publish_max_rate": 0.5, "publish_deadband_w": 10.0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    layout_id = "sensor.power_consumption_analyser_rcd_layout"
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    assert hass.states.get(layout_id).attributes["load_w"] == {"FI Kitchen": 100.0}
+
+    # Inside the W deadband: not written
+    hass.states.async_set("sensor.kitchen_plug_power", 105)
+    await hass.async_block_till_done()
+    assert hass.states.get(layout_id).attributes["load_w"] == {"FI Kitchen": 100.0}
+
+    # Bursts inside the rate window are coalesced and the latest load flushed
+    hass.states.async_set("sensor.kitchen_plug_power", 150)
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.kitchen_plug_power", 180)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    st = hass.states.get(layout_id)
+    assert st.attributes["load_w"] == {"FI Kitchen": 180.0}
+    assert st.attributes["publish_suppressed"] >= 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,112 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+@pytest.mark.asyncio
+async def test_running_effect_with_confidence_interval(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="live_effect",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    effect_id = "sensor.power_consumption_analyser_circuit_3f11_effect"
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Circuit OFF: untracked drops from 400 to about 300 with some noise
+    now = dt_util.utcnow()
+    for i, home in enumerate((402, 398, 401, 399, 400, 403, 397, 400), start=1):
+        hass.states.async_set("sensor.home_consumption_now_w", home)
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+
+    # Published at a bounded rate, so the last publish may lag the newest sample
+    live = data.measure_live["3F11"]
+    assert 2 <= live["samples"] <= 8
+    assert live["effect"] == pytest.approx(100.0, abs=1.0)
+    assert live["ci_low"] < live["effect"] < live["ci_high"]
+    assert live["se"] > 0
+    attrs = hass.states.get(effect_id).attributes
+    assert attrs["running_effect"] == live["effect"]
+    assert attrs["running_ci_high"] == live["ci_high"]
+    assert hass.states.get("switch.measure_circuit_3f11").attributes["samples"] == live["samples"]
+
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    attrs = hass.states.get(effect_id).attributes
+    assert "running_effect" not in attrs
+    assert attrs["valid"] is False  # default min_samples=10
+    assert "3F11" not in data.measure_live
+
+
+@pytest.mark.parametrize("strategy, max_computes", [("average", 0), ("median", 0), ("huber", 1)])
+@pytest.mark.asyncio
+async def test_live_effect_avoids_full_recomputes(hass: HomeAssistant, sample_yaml, enable_custom_integrations, monkeypatch, strategy, max_computes):
+    from custom_components.power_consumption_analyser import measurement
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id=f"live_effect_{strategy}",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0, "effect_strategy": strategy},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+
+    computes = []
+    real = measurement.MeasurementRun._compute_live
+
+    def _spy(self, *args):
+        computes.append(data.measure_running[self.key].n)
+        return real(self, *args)
+
+    monkeypatch.setattr(measurement.MeasurementRun, "_compute_live", _spy)
+    published = []
+    from homeassistant.helpers.dispatcher import async_dispatcher_connect
+    async_dispatcher_connect(hass, f"{DOMAIN}_live_effect", lambda key: published.append(dict(data.measure_live.get(key) or {})))
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    now = dt_util.utcnow()
+    for i, home in enumerate((402, 398, 401, 399, 400, 403, 397, 400), start=1):
+        hass.states.async_set("sensor.home_consumption_now_w", home)
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+
+    live = data.measure_live["3F11"]
+    assert live["strategy"] == strategy
+    # A costly strategy's effect may lag up to LIVE_SLOW_RECOMPUTE_S (here: the first sample)
+    assert live["effect"] == pytest.approx(100.0, abs=2.5)
+    assert len(published) >= 2 and published[-1]["samples"] > published[0]["samples"]
+    # Streaming strategies never touch the window; costly ones recompute at most every few seconds
+    assert len(computes) <= max_computes
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
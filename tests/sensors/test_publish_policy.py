@@ -0,0 +1,142 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+from custom_components.power_consumption_analyser.sensors.publish import PublishThrottle, WRITE, DEFER, SKIP
+
+
+def test_rate_limit_defers_and_flushes_latest_value():
+    t = PublishThrottle()
+    assert t.offer(100.0, 0.0, max_rate=1.0) == WRITE
+    assert t.offer(150.0, 0.2, max_rate=1.0) == DEFER
+    assert t.offer(170.0, 0.4, max_rate=1.0) == DEFER
+    assert t.flush_delay(0.4, 1.0) == pytest.approx(0.6)
+    assert t.flush(170.0, 1.0) is True
+    assert t.last_value == 170.0
+    assert (t.emitted, t.suppressed) == (2, 2)
+    # Nothing pending -> nothing to flush
+    assert t.flush(170.0, 1.5) is False
+
+
+def test_deadband_skips_small_changes_and_accumulated_drift_publishes():
+    t = PublishThrottle()
+    t.offer(100.0, 0.0, deadband_abs=5.0)
+    assert t.offer(103.0, 1.0, deadband_abs=5.0) == SKIP
+    assert t.offer(104.9, 2.0, deadband_abs=5.0) == SKIP
+    # Compared against the published value, so slow drift eventually writes
+    assert t.offer(105.5, 3.0, deadband_abs=5.0) == WRITE
+    # Relative deadband
+    assert t.offer(110.0, 4.0, deadband_pct=10.0) == SKIP
+    assert t.offer(120.0, 5.0, deadband_pct=10.0) == WRITE
+
+
+def test_return_into_deadband_clears_pending_flush_and_force_bypasses():
+    t = PublishThrottle()
+    t.offer(100.0, 0.0, max_rate=1.0, deadband_abs=5.0)
+    assert t.offer(150.0, 0.1, max_rate=1.0, deadband_abs=5.0) == DEFER
+    assert t.offer(101.0, 0.2, max_rate=1.0, deadband_abs=5.0) == SKIP
+    assert t.flush(101.0, 1.0) is False
+    assert t.offer(300.0, 0.3, max_rate=1.0, force=True) == WRITE
+    # Transitions to/from unknown always publish
+    assert t.offer(None, 0.4, max_rate=1.0) == WRITE
+    assert t.offer(5.0, 0.5, max_rate=1.0) == WRITE
+
+
+def test_attribute_and_availability_changes_publish_despite_unchanged_value():
+    t = PublishThrottle()
+    t.offer(100.0, 0.0, deadband_abs=5.0, attrs={"available": True, "outage_meters": []})
+    assert t.offer(100.0, 1.0, deadband_abs=5.0, attrs={"available": True, "outage_meters": ["sensor.a"]}) == WRITE
+    assert t.offer(100.0, 2.0, deadband_abs=5.0, attrs={"available": False, "outage_meters": ["sensor.a"]}) == WRITE
+    # Numeric attributes share the value's deadband
+    t.offer(100.0, 3.0, deadband_abs=5.0, attrs={"by_phase": {"L1": 60.0, "L2": 40.0}})
+    assert t.offer(100.0, 4.0, deadband_abs=5.0, attrs={"by_phase": {"L1": 62.0, "L2": 38.0}}) == SKIP
+    assert t.offer(100.0, 5.0, deadband_abs=5.0, attrs={"by_phase": {"L1": 80.0, "L2": 20.0}}) == WRITE
+    # Rate-limited attribute change is flushed, not dropped
+    assert t.offer(100.0, 5.1, max_rate=1.0, attrs={"by_phase": {"L1": 90.0, "L2": 10.0}}) == DEFER
+    assert t.flush(100.0, 6.0, {"by_phase": {"L1": 90.0, "L2": 10.0}}) is True
+    assert t.last_attrs == {"by_phase": {"L1": 90.0, "L2": 10.0}}
+
+
+@pytest.mark.asyncio
+async def test_unavailable_count_ignores_percent_deadband(hass: HomeAssistant, temp_config_dir, enable_custom_integrations):
+    meters = [f"sensor.plug_{i}_power" for i in range(7)]
+    yaml_path = temp_config_dir / "unterverteilung.yaml"
+    yaml_path.write_text(
+        "circuits:\n  - id: \"1F1\"\n    energy_meters:\n" + "".join(f"      - {m}\n" for m in meters),
+        encoding="utf-8",
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={"unterverteilung_path": str(yaml_path), "safe_circuits": [], "baseline_sensors": {}},
+        unique_id="publish_count",
+        options={"publish_deadband_pct": 20.0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    count_id = "sensor.power_consumption_analyser_unavailable_meter_count"
+    for m in meters:
+        hass.states.async_set(m, 10)
+    await hass.async_block_till_done()
+    for m in meters[:6]:
+        hass.states.async_set(m, "unavailable")
+        await hass.async_block_till_done()
+    # 5 -> 6 is below 20 % but a count is published on every change
+    st = hass.states.get(count_id)
+    assert int(st.state) == 6
+    assert st.attributes["entity_ids"] == sorted(meters[:6])
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_power_sensor_publish_policy_from_options(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="publish_policy",
+        options={"publish_max_rate": 0.5, "publish_deadband_w": 10.0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    assert data.publish_max_rate == 0.5
+    assert data.publish_deadband_w == 10.0
+
+    tracked_id = "sensor.power_consumption_analyser_tracked_power_sum"
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(tracked_id).state) == 100.0
+
+    # Inside the deadband: skipped
+    hass.states.async_set("sensor.kitchen_plug_power", 105)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(tracked_id).state) == 100.0
+
+    # Outside the deadband but inside the 2 s window: deferred, latest flushed at window end
+    hass.states.async_set("sensor.kitchen_plug_power", 150)
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.kitchen_plug_power", 180)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(tracked_id).state) == 100.0
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    st = hass.states.get(tracked_id)
+    assert float(st.state) == 180.0
+    assert st.attributes["publish_suppressed"] >= 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,50 @@
+import pytest
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import StateAttributes, States, StatesMeta
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.recorder.common import async_wait_recording_done
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_recorded_attributes_stay_stable_across_writes(recorder_mock, hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="publish_recorder",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # Untracked power: value changes, its own attributes (outage info) do not
+    tracked_id = "sensor.power_consumption_analyser_untracked_power"
+    for v in (100, 150, 200, 250, 300):
+        hass.states.async_set("sensor.home_consumption_now_w", v)
+        await hass.async_block_till_done()
+    assert hass.states.get(tracked_id).attributes["publish_emitted"] >= 5
+    await async_wait_recording_done(hass)
+
+    def _recorded():
+        with get_instance(hass).get_session() as session:
+            rows = (
+                session.query(States.state, StateAttributes.shared_attrs)
+                .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .outerjoin(StateAttributes, States.attributes_id == StateAttributes.attributes_id)
+                .filter(StatesMeta.entity_id == tracked_id)
+                .all()
+            )
+            return [state for state, _ in rows], {attrs for _, attrs in rows}
+
+    states, attrs = await get_instance(hass).async_add_executor_job(_recorded)
+    assert "300.0" in states and len(states) >= 5
+    # One attributes row for all writes: the counters stay on the state, not in the recorder
+    assert len(attrs) == 1
+    assert "publish_emitted" not in next(iter(attrs))
@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import patch
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+import custom_components.power_consumption_analyser as pca
+from custom_components.power_consumption_analyser import DOMAIN
+
+@pytest.mark.asyncio
+async def test_single_subscription_fans_out_to_power_sensors(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="shared_sub",
+    )
+    entry.add_to_hass(hass)
+    real_track = pca.async_track_state_change_event
+    calls = []
+
+    def _spy(hass_, entity_ids, action):
+        calls.append(sorted(entity_ids))
+        return real_track(hass_, entity_ids, action)
+
+    with patch.object(pca, "async_track_state_change_event", _spy):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        # One integration-level subscription covering home + meters
+        assert calls == [["sensor.home_consumption_now_w", "sensor.kitchen_plug_power"]]
+
+        signals = []
+        async_dispatcher_connect(hass, f"{DOMAIN}_power_state", lambda eid: signals.append(eid))
+
+        hass.states.async_set("sensor.home_consumption_now_w", 500)
+        hass.states.async_set("sensor.kitchen_plug_power", 120)
+        await hass.async_block_till_done()
+        assert signals == ["sensor.home_consumption_now_w", "sensor.kitchen_plug_power"]
+        assert float(hass.states.get("sensor.power_consumption_analyser_tracked_power_sum").state) == 120.0
+        assert float(hass.states.get("sensor.power_consumption_analyser_untracked_power").state) == 380.0
+
+        # Linking a meter resubscribes once and refreshes sensors without a meter event
+        hass.states.async_set("sensor.media_plug_power", 30)
+        await hass.services.async_call(
+            DOMAIN, "circuit_link_energy_meter",
+            {"entity_id": "sensor.media_plug_power", "circuit_id": "3F11"}, blocking=True,
+        )
+        await hass.async_block_till_done()
+        assert len(calls) == 2
+        assert "sensor.media_plug_power" in calls[-1]
+        assert float(hass.states.get("sensor.power_consumption_analyser_tracked_power_sum").state) == 150.0
+
+        # Events for unrelated entities are not fanned out
+        signals.clear()
+        hass.states.async_set("sensor.unrelated", 1)
+        await hass.async_block_till_done()
+        assert signals == []
+
+
+@pytest.mark.asyncio
+async def test_circuit_sensors_only_get_their_own_circuit_signal(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="circuit_signal",
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    kitchen, media = [], []
+    async_dispatcher_connect(hass, f"{DOMAIN}_power_state_2F7", lambda eid: kitchen.append(eid))
+    async_dispatcher_connect(hass, f"{DOMAIN}_power_state_3F11", lambda eid: media.append(eid))
+
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 120)
+    await hass.async_block_till_done()
+    # The home meter belongs to no circuit; the kitchen plug only to 2F7
+    assert kitchen == ["sensor.kitchen_plug_power"] and media == []
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_2f7_tracked_power").state) == 120.0
+
+    # A meter set change refreshes every circuit
+    hass.states.async_set("sensor.media_plug_power", 30)
+    await hass.services.async_call(
+        DOMAIN, "circuit_link_energy_meter",
+        {"entity_id": "sensor.media_plug_power", "circuit_id": "3F11"}, blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert None in kitchen and None in media
+    assert float(hass.states.get("sensor.power_consumption_analyser_circuit_3f11_tracked_power").state) == 30.0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.average import AverageStrategy
+from custom_components.power_consumption_analyser.strategies.median import MedianStrategy
+from custom_components.power_consumption_analyser.strategies.median_of_means import MedianOfMeansStrategy
+from custom_components.power_consumption_analyser.strategies.trimmed_mean import TrimmedMeanStrategy
+from custom_components.power_consumption_analyser.strategies.hodges_lehmann import HodgesLehmannStrategy
+from custom_components.power_consumption_analyser.strategies.bootstrap import bootstrap_ci
+
+STRATS = [AverageStrategy(), MedianStrategy(), TrimmedMeanStrategy(0.2), MedianOfMeansStrategy(5)]
+
+
+@pytest.mark.parametrize("strategy", STRATS, ids=lambda s: s.key)
+@pytest.mark.parametrize("method", ["percentile", "bca"])
+def test_interval_covers_effect_and_orders_bounds(strategy, method):
+    rng = random.Random(7)
+    window = [300.0 + rng.gauss(0, 15) for _ in range(400)]
+    ci = bootstrap_ci(strategy, 500.0, window, resamples=1000, method=method, seed=1)
+    assert ci["ci_low"] < 200.0 < ci["ci_high"]
+    # Standard error of the mean is 0.75 W: the 95 % interval stays narrow
+    assert ci["ci_high"] - ci["ci_low"] < 8.0
+    assert ci["ci_method"] == method and ci["ci_strategy"] == strategy.key
+
+
+def test_python_fallback_agrees_with_numpy(monkeypatch):
+    rng = random.Random(3)
+    window = [300.0 + rng.gauss(0, 20) + (800.0 if rng.random() < 0.05 else 0.0) for _ in range(300)]
+    a = bootstrap_ci(TrimmedMeanStrategy(0.2), 500.0, window, resamples=2000, seed=2)
+    monkeypatch.setattr(vectorized, "np", None)
+    b = bootstrap_ci(TrimmedMeanStrategy(0.2), 500.0, window, resamples=2000, seed=2)
+    # Different random streams; the intervals agree within Monte Carlo error
+    assert a["ci_low"] == pytest.approx(b["ci_low"], abs=1.0)
+    assert a["ci_high"] == pytest.approx(b["ci_high"], abs=1.0)
+
+
+def test_coverage_of_percentile_interval():
+    rng = random.Random(11)
+    hits = 0
+    trials = 60
+    for t in range(trials):
+        window = [300.0 + rng.gauss(0, 10) for _ in range(50)]
+        ci = bootstrap_ci(AverageStrategy(), 500.0, window, resamples=500, seed=t)
+        hits += ci["ci_low"] <= 200.0 <= ci["ci_high"]
+    assert hits / trials > 0.85
+
+
+def test_too_small_window():
+    assert bootstrap_ci(AverageStrategy(), 500.0, [300.0], resamples=100) is None
+
+
+@pytest.mark.parametrize("strategy", [MedianStrategy(), HodgesLehmannStrategy()], ids=lambda s: s.key)
+def test_two_sample_interval_resamples_on_window(strategy):
+    rng = random.Random(9)
+    on = [500.0 + rng.gauss(0, 15) for _ in range(60)]
+    off = [300.0 + rng.gauss(0, 15) for _ in range(300)]
+    single = bootstrap_ci(strategy, 500.0, off, resamples=500, seed=4)
+    two = bootstrap_ci(strategy, 500.0, off, resamples=500, seed=4, on_samples=on)
+    assert two["ci_low"] < 200.0 < two["ci_high"]
+    # ON noise widens the interval
+    assert two["ci_high"] - two["ci_low"] > single["ci_high"] - single["ci_low"]
+
+
+def test_order_and_time_dependent_strategies_get_no_interval():
+    from custom_components.power_consumption_analyser.strategies.exponential import ExponentialStrategy
+    from custom_components.power_consumption_analyser.strategies.time_weighted import (
+        TimeWeightedAverageStrategy,
+        TimeWeightedTrimmedMeanStrategy,
+    )
+
+    window = [300.0 + 50.0 * 0.8 ** i for i in range(60)]
+    for strategy in (ExponentialStrategy(), TimeWeightedAverageStrategy(), TimeWeightedTrimmedMeanStrategy(0.2)):
+        assert strategy.supports_bootstrap is False
+        assert bootstrap_ci(strategy, 500.0, window, resamples=200, seed=1) is None
@@ -0,0 +1,123 @@
+import random
+from math import sqrt
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies.design import (
+    DESIGN_MIN_WINDOW_SCALE,
+    design_rows,
+    design_window_scale,
+    hadamard,
+    solve_design,
+)
+
+
+def test_hadamard_rows_are_orthogonal():
+    h = hadamard(8)
+    for i in range(8):
+        for j in range(8):
+            dot = sum(a * b for a, b in zip(h[i], h[j]))
+            assert dot == (8 if i == j else 0)
+    with pytest.raises(ValueError):
+        hadamard(6)
+
+
+@pytest.mark.parametrize("order", [12, 20, 24, 40, 44])
+def test_non_power_of_two_hadamard_orders(order):
+    h = hadamard(order)
+    assert all(v == 1 for v in h[0]) and all(row[0] == 1 for row in h)
+    for i in range(order):
+        for j in range(i, order):
+            assert sum(a * b for a, b in zip(h[i], h[j])) == (order if i == j else 0)
+
+
+def test_design_rows_switch_half_the_circuits_off():
+    rows = design_rows(7)
+    assert len(rows) == 7
+    assert all(sum(r) == 4 for r in rows)
+    # Fewer circuits than the order: extra steps, still full rank
+    assert len(design_rows(5)) == 7
+    assert len(design_rows(3)) == 3
+    # Order 12 (Paley) instead of 16: 11 steps for 8 circuits, 43 for 40
+    assert len(design_rows(8)) == 11
+    assert len(design_rows(40)) == 43
+
+
+def test_solve_design_rejects_fewer_steps_than_circuits():
+    rows = design_rows(3)
+    with pytest.raises(ValueError):
+        solve_design(rows[:2], [1.0, 2.0])
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_solve_design_recovers_effects_and_standard_errors(use_numpy):
+    truth = [120.0, 0.0, 35.0, 0.0, 800.0]
+    rows = design_rows(len(truth))
+    y = [sum(e for e, off in zip(truth, r) if off) for r in rows]
+    est, se = solve_design(rows, y, [10.0] * len(rows), use_numpy=use_numpy)
+    assert est == pytest.approx(truth, abs=1e-6)
+    assert se is not None and all(s < 10.0 for s in se)
+    # Without step standard errors: OLS, no per-circuit errors
+    est2, se2 = solve_design(rows, y, use_numpy=use_numpy)
+    assert est2 == pytest.approx(truth, abs=1e-6) and se2 is None
+
+
+def test_solvers_agree():
+    rng = random.Random(3)
+    rows = design_rows(11)
+    y = [rng.uniform(-50, 500) for _ in rows]
+    se = [rng.uniform(2, 20) for _ in rows]
+    a, sa = solve_design(rows, y, se, use_numpy=True)
+    b, sb = solve_design(rows, y, se, use_numpy=False)
+    assert a == pytest.approx(b, abs=1e-6)
+    assert sa == pytest.approx(sb, abs=1e-9)
+
+
+def test_simulation_design_beats_sequential_sweep():
+    # 7 circuits, noise sigma per full-length window; sequential sweep: one circuit per step
+    rng = random.Random(42)
+    k, sigma, trials = 7, 10.0, 400
+    truth = [rng.choice([0.0, 0.0, 60.0, 250.0]) for _ in range(k)]
+    rows = design_rows(k)
+    err_seq = err_design = err_half = 0.0
+    for _ in range(trials):
+        seq = [t + rng.gauss(0, sigma) for t in truth]
+        y = [sum(e for e, off in zip(truth, r) if off) + rng.gauss(0, sigma) for r in rows]
+        # Same steps with half-length windows (noise * sqrt 2)
+        y_half = [sum(e for e, off in zip(truth, r) if off) + rng.gauss(0, sigma * sqrt(2)) for r in rows]
+        est, _ = solve_design(rows, y)
+        est_half, _ = solve_design(rows, y_half)
+        err_seq += sum((a - b) ** 2 for a, b in zip(seq, truth))
+        err_design += sum((a - b) ** 2 for a, b in zip(est, truth))
+        err_half += sum((a - b) ** 2 for a, b in zip(est_half, truth))
+    rmse_seq = sqrt(err_seq / (trials * k))
+    rmse_design = sqrt(err_design / (trials * k))
+    rmse_half = sqrt(err_half / (trials * k))
+    # Same number of steps as the sweep; theory: variance ratio 4k/(k+1)^2 = 0.4375
+    assert len(rows) == k
+    assert rmse_design < 0.8 * rmse_seq
+    # Half the measuring time still matches the sweep
+    assert rmse_half < rmse_seq
+
+
+def test_simulation_design_saves_wall_time_at_40_circuits():
+    # Not a best case: 40 circuits need 43 steps (order 44), more than the 40-step sweep
+    rng = random.Random(7)
+    k, sigma, window, trials = 40, 10.0, 60.0, 60
+    truth = [rng.choice([0.0, 0.0, 60.0, 250.0]) for _ in range(k)]
+    rows = design_rows(k)
+    scale = design_window_scale(rows)
+    assert len(rows) == 43 and scale == DESIGN_MIN_WINDOW_SCALE
+    # Noise of a window scales with 1/sqrt(length)
+    step_sigma = sigma / sqrt(scale)
+    err_seq = err_design = 0.0
+    for _ in range(trials):
+        seq = [t + rng.gauss(0, sigma) for t in truth]
+        y = [sum(e for e, off in zip(truth, r) if off) + rng.gauss(0, step_sigma) for r in rows]
+        est, _ = solve_design(rows, y)
+        err_seq += sum((a - b) ** 2 for a, b in zip(seq, truth))
+        err_design += sum((a - b) ** 2 for a, b in zip(est, truth))
+    time_seq = k * window
+    time_design = len(rows) * window * scale
+    assert time_design < 0.3 * time_seq
+    assert sqrt(err_design / (trials * k)) < sqrt(err_seq / (trials * k))
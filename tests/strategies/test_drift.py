@@ -0,0 +1,22 @@
+import pytest
+
+from custom_components.power_consumption_analyser.strategies.drift import detrend, fit_drift
+
+
+def test_robust_fit_ignores_spike_linear_does_not():
+    before_t = [float(t) for t in range(10)]
+    after_t = [float(t) for t in range(40, 50)]
+    before = [500.0 + 0.5 * t for t in before_t]
+    after = [500.0 + 0.5 * t for t in after_t]
+    after[3] += 3000.0  # kettle during the verify window
+    assert fit_drift(before_t, before, after_t, after, "robust") == pytest.approx(0.5, abs=0.05)
+    assert abs(fit_drift(before_t, before, after_t, after, "linear") - 0.5) > 1.0
+    assert fit_drift(before_t, before, after_t[:1], after[:1]) is None
+
+
+@pytest.mark.parametrize("n", [10, 500])
+def test_detrend_moves_samples_to_reference_time(n):
+    times = [float(t) for t in range(n)]
+    values = [400.0 + 2.0 * t for t in times]
+    out = detrend(times, values, 2.0, 0.0)
+    assert list(out) == pytest.approx([400.0] * n)
@@ -0,0 +1,69 @@
+import random
+from math import exp
+from statistics import median
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.exponential import ExponentialStrategy, fit_exponential
+
+
+def _decay(rng, times, level=300.0, amp=150.0, tau=10.0, noise=2.0):
+    return [level + amp * exp(-t / tau) + rng.gauss(0, noise) for t in times]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_short_window_extrapolates_steady_state(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(vectorized, "np", None)
+    rng = random.Random(3)
+    # 30 s at 2 Hz: a third of a 90 s measurement, the decay still 75 W above its level at the start
+    times = [1000.0 + i * 0.5 for i in range(60)]
+    off = _decay(rng, [t - 1000.0 for t in times])
+    on = MeasurementWindow(baseline=400.0, samples=[400.0])
+    res = ExponentialStrategy().compute(on, MeasurementWindow(baseline=400.0, samples=off, times=times))
+    assert res["fit"] is True
+    assert res["effect"] == pytest.approx(100.0, abs=3.0)
+    assert res["tau_s"] == pytest.approx(10.0, rel=0.2)
+    assert res["r2"] > 0.95
+    # Averaging the tail underestimates the effect by far
+    assert 400.0 - median(off) < 80.0
+
+
+def test_numpy_and_python_paths_agree(monkeypatch):
+    rng = random.Random(8)
+    times = [i * 1.0 for i in range(200)]
+    vals = _decay(rng, times, tau=40.0)
+    fast = fit_exponential(times, vals)
+    monkeypatch.setattr(vectorized, "np", None)
+    slow = fit_exponential(times, vals)
+    assert fast["asymptote"] == pytest.approx(slow["asymptote"], abs=1e-6)
+    assert fast["tau_s"] == pytest.approx(slow["tau_s"], rel=1e-6)
+
+
+def test_uneven_sampling_uses_timestamps():
+    rng = random.Random(4)
+    # Event sampling: bursts of samples early, sparse later
+    times = sorted(rng.uniform(0, 40) ** 1.5 / 40 ** 0.5 for _ in range(80))
+    vals = _decay(rng, times, noise=1.0)
+    res = fit_exponential(times, vals)
+    assert res["asymptote"] == pytest.approx(300.0, abs=2.0)
+    # Taken as evenly spaced the curve loses its shape
+    blind = fit_exponential(None, vals)
+    assert blind is None or abs(blind["asymptote"] - 300.0) > abs(res["asymptote"] - 300.0)
+
+
+def test_flat_window_falls_back_to_median():
+    rng = random.Random(2)
+    off = [300.0 + rng.gauss(0, 5) for _ in range(100)]
+    res = ExponentialStrategy().compute(
+        MeasurementWindow(baseline=400.0, samples=[400.0]),
+        MeasurementWindow(baseline=400.0, samples=off, times=[float(i) for i in range(100)]),
+    )
+    assert res["fit"] is False
+    assert res["effect"] == pytest.approx(400.0 - median(off))
+
+
+def test_too_few_samples_is_not_fitted():
+    assert fit_exponential(None, [300.0 + 100 * exp(-i) for i in range(5)]) is None
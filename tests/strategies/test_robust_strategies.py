@@ -0,0 +1,62 @@
+import random
+from statistics import mean, median
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.m_estimator import MAX_IRLS_ITER, HuberStrategy, TukeyStrategy
+from custom_components.power_consumption_analyser.strategies.hodges_lehmann import HodgesLehmannStrategy, hodges_lehmann_shift
+
+
+def _naive_hl(on, off):
+    return median([x - y for x in on for y in off])
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_hodges_lehmann_matches_pairwise_median(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(vectorized, "np", None)
+    rng = random.Random(5)
+    for _ in range(60):
+        on = [round(rng.gauss(500, 20)) for _ in range(rng.randint(1, 90))]
+        off = [round(rng.gauss(300, 20)) for _ in range(rng.randint(1, 150))]
+        assert hodges_lehmann_shift(on, off) == pytest.approx(_naive_hl(on, off), abs=1e-9)
+
+
+def test_hodges_lehmann_with_baseline_only_is_median_effect():
+    off = [300.0, 310.0, 290.0, 1500.0, 305.0]
+    on = MeasurementWindow(baseline=500.0, samples=[500.0])
+    res = HodgesLehmannStrategy().compute(on, MeasurementWindow(baseline=500.0, samples=off))
+    assert res["effect"] == pytest.approx(500.0 - median(off))
+    two = HodgesLehmannStrategy().compute(
+        MeasurementWindow(baseline=500.0, samples=[498.0, 502.0, 500.0, 2000.0]),
+        MeasurementWindow(baseline=500.0, samples=off),
+    )
+    assert two["effect"] == pytest.approx(_naive_hl([498.0, 502.0, 500.0, 2000.0], off))
+
+
+@pytest.mark.parametrize("strategy", [HuberStrategy(), TukeyStrategy()], ids=lambda s: s.key)
+@pytest.mark.parametrize("n", [40, 4000])
+def test_m_estimators_resist_spikes(strategy, n):
+    rng = random.Random(n)
+    off = [300.0 + rng.gauss(0, 10) + (1500.0 if i % 20 == 0 else 0.0) for i in range(n)]
+    on = MeasurementWindow(baseline=500.0, samples=[500.0])
+    res = strategy.compute(on, MeasurementWindow(baseline=500.0, samples=off))
+    assert abs(res["effect"] - 200.0) < (6.0 if strategy.key == "huber" else 3.0)
+    # The mean is dragged by the spikes
+    assert abs((500.0 - mean(off)) - 200.0) > 50.0
+    assert 1 <= res["iterations"] <= MAX_IRLS_ITER
+
+
+def test_m_estimator_engines_agree_and_constant_window(monkeypatch):
+    rng = random.Random(2)
+    off = [300.0 + rng.gauss(0, 10) for _ in range(500)]
+    on = MeasurementWindow(baseline=500.0, samples=[500.0])
+    a = TukeyStrategy().compute(on, MeasurementWindow(baseline=500.0, samples=off))["effect"]
+    monkeypatch.setattr(vectorized, "np", None)
+    b = TukeyStrategy().compute(on, MeasurementWindow(baseline=500.0, samples=off))["effect"]
+    assert a == pytest.approx(b, abs=0.01)
+    # Zero MAD: the median is the location, no iterations
+    res = HuberStrategy().compute(on, MeasurementWindow(baseline=500.0, samples=[300.0] * 9 + [900.0]))
+    assert res["effect"] == 200.0 and res["iterations"] == 0
@@ -0,0 +1,26 @@
+from custom_components.power_consumption_analyser.strategies.sequential import (
+    EFFECT_ABSENT,
+    EFFECT_PRESENT,
+    sprt_bounds,
+    sprt_decide,
+)
+
+
+def test_bounds_are_symmetric_for_equal_error_rates():
+    lower, upper = sprt_bounds(0.95)
+    assert lower < 0 < upper
+    assert abs(lower + upper) < 1e-9
+
+
+def test_large_effect_is_decided_present_quickly():
+    assert sprt_decide(5, 400.0, 15.0, 20.0, 0.95) == EFFECT_PRESENT
+    # Negative effects count too (two-sided)
+    assert sprt_decide(5, -400.0, 15.0, 20.0, 0.95) == EFFECT_PRESENT
+
+
+def test_no_effect_is_decided_below_threshold_and_ambiguous_waits():
+    assert sprt_decide(30, 1.0, 15.0, 20.0, 0.95) == EFFECT_ABSENT
+    # Effect near threshold/2 with few noisy samples: keep sampling
+    assert sprt_decide(3, 10.0, 15.0, 20.0, 0.95) is None
+    # Higher confidence needs more evidence
+    assert sprt_decide(8, 1.0, 15.0, 20.0, 0.999) is None
@@ -0,0 +1,55 @@
+import random
+from math import exp
+
+from custom_components.power_consumption_analyser.strategies.settling import SETTLE_WINDOW, SettlingDetector
+
+
+def _run(det, values):
+    for t, v in enumerate(values, start=1):
+        if det.push(float(t), v):
+            return t
+    return None
+
+
+def test_flat_signal_settles_after_one_full_window():
+    rng = random.Random(1)
+    det = SettlingDetector(0.0)
+    assert _run(det, [400.0 + rng.gauss(0, 3) for _ in range(30)]) == 2 * SETTLE_WINDOW
+    assert det.settle_s == 2 * SETTLE_WINDOW and len(det.stable()) == SETTLE_WINDOW
+
+
+def test_inverter_ramp_settles_late_and_lighting_early():
+    # Inverter: untracked power decays towards the OFF level with a 6 s time constant
+    inverter = [400.0 + 300.0 * exp(-t / 6.0) for t in range(1, 80)]
+    lighting = [400.0] * 80
+    t_inv = _run(SettlingDetector(0.0), inverter)
+    t_light = _run(SettlingDetector(0.0), lighting)
+    assert t_light == 2 * SETTLE_WINDOW
+    assert t_inv is not None and t_inv > 25
+    # Settled means within the noise floor of the final level
+    assert abs(inverter[t_inv - 1] - 400.0) < 2.0
+
+
+def test_prior_delays_testing():
+    # Prior of 40 s: no test before 20 s even though the signal is flat from the start
+    det = SettlingDetector(0.0, prior_s=40.0)
+    assert _run(det, [400.0] * 30) == 20
+    assert det.settle_s == 20.0
+
+
+def test_on_level_does_not_settle_before_the_change_point():
+    # Breaker switched 15 s after the start: flat ON level first, then a step down
+    det = SettlingDetector(0.0, reference=500.0, min_wait_s=60.0)
+    assert _run(det, [500.0] * 15 + [400.0] * 20) == 15 + 2 * SETTLE_WINDOW
+    assert det.changed_at == 16.0
+    assert det.settle_s == 2 * SETTLE_WINDOW - 1
+    assert all(v == 400.0 for _, v in det.stable())
+
+
+def test_no_change_settles_provisionally_without_prior_and_is_revoked_by_a_change():
+    det = SettlingDetector(0.0, reference=500.0, min_wait_s=12.0)
+    assert _run(det, [500.5] * 20) == 12
+    # Provisional: no settling time to learn from
+    assert det.settled_at == 12.0 and det.settle_s is None
+    assert det.push(21.0, 420.0) is False
+    assert det.changed_at == 21.0 and det.settled_at is None
@@ -1,7 +1,11 @@
+import random
+from statistics import median
+
 import pytest
+from custom_components.power_consumption_analyser.strategies import vectorized
 from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
 from custom_components.power_consumption_analyser.strategies.average import AverageStrategy
-from custom_components.power_consumption_analyser.strategies.median import MedianStrategy
+from custom_components.power_consumption_analyser.strategies.median import MedianStrategy, sorted_mad, sorted_median
 
 @pytest.mark.parametrize(
     "baseline, off, expected",
@@ -32,3 +36,28 @@ def test_computes_effect_with_median(baseline, off, expected):
     res = strat.compute(on, offw)
     assert pytest.approx(res["effect"], rel=1e-6, abs=1e-6) == expected
 
+
+
+def test_evaluate_strategies_matches_individual_strategies():
+    from types import SimpleNamespace
+    from custom_components.power_consumption_analyser.measurement import STRATEGIES, evaluate_strategies
+
+    data = SimpleNamespace(trim_fraction=20)
+    samples = [130.0, 90.0, 400.0, 100.0, 110.0, 95.0, 105.0]
+    on = MeasurementWindow(baseline=300.0, samples=[300.0])
+    off = MeasurementWindow(baseline=300.0, samples=samples)
+    effects = evaluate_strategies(data, on, off)
+    assert set(effects) == set(STRATEGIES)
+    for key, strat in STRATEGIES.items():
+        assert effects[key] == pytest.approx(strat.compute(on, off)["effect"])
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 20, 21, 200])
+def test_sorted_mad_matches_definition(n):
+    rng = random.Random(n)
+    vals = sorted(rng.choice([100.0, 300.0, rng.gauss(200, 30)]) for _ in range(n))
+    med = sorted_median(vals)
+    expected = median(abs(v - med) for v in vals)
+    assert sorted_mad(vals, med) == pytest.approx(expected)
+    if vectorized.np is not None:
+        assert sorted_mad(vectorized.np.array(vals), med) == pytest.approx(expected)
@@ -0,0 +1,42 @@
+import random
+from statistics import mean, median, stdev
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies.streaming import P2Quantile, RunningStats
+
+
+def test_small_windows_are_exact():
+    stats = RunningStats()
+    for x in (5.0, 1.0, 4.0, 2.0):
+        stats.push(x)
+    assert stats.n == 4
+    assert stats.mean == pytest.approx(3.0)
+    assert stats.std == pytest.approx(stdev([5.0, 1.0, 4.0, 2.0]))
+    assert (stats.min, stats.max) == (1.0, 5.0)
+    assert stats.median == pytest.approx(3.0)
+
+
+def test_p2_median_tracks_exact_median_on_large_window():
+    rng = random.Random(7)
+    data = [rng.gauss(300.0, 15.0) for _ in range(20000)]
+    q = P2Quantile(0.5)
+    for x in data:
+        q.push(x)
+    assert q.value == pytest.approx(median(data), abs=1.0)
+
+
+def test_running_mad_and_sigma_approximate_batch_values():
+    rng = random.Random(11)
+    # Noise with a few bursts, as on a busy home
+    data = [rng.gauss(250.0, 10.0) + (400.0 if rng.random() < 0.02 else 0.0) for _ in range(5000)]
+    stats = RunningStats()
+    for x in data:
+        stats.push(x)
+    med = median(data)
+    mad = median(abs(x - med) for x in data)
+    assert stats.mean == pytest.approx(mean(data))
+    assert stats.median == pytest.approx(med, abs=1.0)
+    assert stats.mad == pytest.approx(mad, rel=0.1)
+    assert stats.sigma == pytest.approx(1.4826 * stats.mad)
+    assert stats.as_dict()["samples"] == 5000
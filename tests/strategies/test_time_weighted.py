@@ -0,0 +1,73 @@
+import random
+from statistics import mean, median
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.median import MedianStrategy
+from custom_components.power_consumption_analyser.strategies.time_weighted import (
+    TimeWeightedAverageStrategy,
+    TimeWeightedMedianStrategy,
+    TimeWeightedTrimmedMeanStrategy,
+    hold_weights,
+    weighted_median,
+    weighted_trimmed_mean,
+)
+
+ON = MeasurementWindow(baseline=500.0, samples=[500.0])
+
+
+def _bursty(rng, seconds=60):
+    # 300 W held for 10 s stretches, interleaved with 1 s bursts of 20 updates at 380 W
+    times, vals = [], []
+    t = 0.0
+    while t < seconds:
+        times.append(t)
+        vals.append(300.0 + rng.gauss(0, 1))
+        t += 10.0
+        for i in range(20):
+            times.append(t + i * 0.05)
+            vals.append(380.0 + rng.gauss(0, 1))
+        t += 1.0
+    return times, vals
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_bursty_meter_does_not_dominate(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(vectorized, "np", None)
+    times, vals = _bursty(random.Random(1))
+    off = MeasurementWindow(baseline=500.0, samples=vals, times=times)
+    # Power over time: 10 s at 300 W per 1 s at 380 W
+    expected = 500.0 - (10 * 300.0 + 380.0) / 11
+    assert TimeWeightedAverageStrategy().compute(ON, off)["effect"] == pytest.approx(expected, abs=1.0)
+    assert TimeWeightedMedianStrategy().compute(ON, off)["effect"] == pytest.approx(200.0, abs=3.0)
+    assert TimeWeightedTrimmedMeanStrategy(trim=0.1).compute(ON, off)["effect"] == pytest.approx(200.0, abs=3.0)
+    # Per-sample estimators see mostly the burst
+    assert 500.0 - mean(vals) < 140.0
+    assert MedianStrategy().compute(ON, off)["effect"] == pytest.approx(120.0, abs=3.0)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_even_spacing_matches_unweighted(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(vectorized, "np", None)
+    rng = random.Random(2)
+    for n in (10, 11, 100, 101):
+        vals = [rng.gauss(300, 20) for _ in range(n)]
+        w = hold_weights([float(i) for i in range(n)], n)
+        assert weighted_median(vals, w) == pytest.approx(median(vals))
+        # trim * n whole: the same samples are cut
+        ordered = sorted(vals)
+        k = n // 10
+        if k * 10 == n:
+            assert weighted_trimmed_mean(vals, w, 0.1) == pytest.approx(mean(ordered[k : n - k]))
+
+
+def test_without_times_falls_back_to_plain_strategies():
+    vals = [300.0, 310.0, 290.0, 1000.0, 305.0]
+    off = MeasurementWindow(baseline=500.0, samples=vals)
+    res = TimeWeightedMedianStrategy().compute(ON, off)
+    assert res["time_weighted"] is False and res["effect"] == 500.0 - median(vals)
+    assert TimeWeightedAverageStrategy().compute(ON, off)["effect"] == pytest.approx(500.0 - mean(vals))
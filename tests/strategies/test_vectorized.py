@@ -0,0 +1,37 @@
+import random
+from array import array
+
+import pytest
+
+from custom_components.power_consumption_analyser.strategies import vectorized
+from custom_components.power_consumption_analyser.strategies.base import MeasurementWindow
+from custom_components.power_consumption_analyser.strategies.average import AverageStrategy
+from custom_components.power_consumption_analyser.strategies.median import MedianStrategy
+from custom_components.power_consumption_analyser.strategies.trimmed_mean import TrimmedMeanStrategy
+from custom_components.power_consumption_analyser.strategies.median_of_means import MedianOfMeansStrategy
+
+pytestmark = pytest.mark.skipif(vectorized.np is None, reason="NumPy not installed")
+
+STRATS = [AverageStrategy(), MedianStrategy(), TrimmedMeanStrategy(0.2), MedianOfMeansStrategy(3)]
+
+
+@pytest.mark.parametrize("n", [64, 65, 100, 1001, 4096])
+@pytest.mark.parametrize("strat", STRATS, ids=lambda s: s.key)
+def test_engine_matches_pure_python(monkeypatch, n, strat):
+    rng = random.Random(n)
+    buf = array("d", (rng.gauss(300, 20) + (500 if rng.random() < 0.05 else 0) for _ in range(n)))
+    on = MeasurementWindow(baseline=400.0, samples=[400.0])
+    with memoryview(buf) as view:
+        fast = strat.compute(on, MeasurementWindow(baseline=400.0, samples=view))["effect"]
+        monkeypatch.setattr(vectorized, "np", None)
+        slow = strat.compute(on, MeasurementWindow(baseline=400.0, samples=view))["effect"]
+    assert fast == pytest.approx(slow, rel=1e-9, abs=1e-9)
+
+
+def test_small_windows_and_lists_stay_on_pure_python():
+    assert not vectorized.enabled([1.0] * (vectorized.MIN_VECTOR_SAMPLES - 1))
+    assert vectorized.enabled([1.0] * vectorized.MIN_VECTOR_SAMPLES)
+    # Lists are converted, buffers of doubles are viewed without copying
+    buf = array("d", [1.0, 2.0])
+    assert vectorized.as_array(buf).base is not None
+    assert vectorized.as_array([1.0, 2.0]).tolist() == [1.0, 2.0]
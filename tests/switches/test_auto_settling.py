@@ -0,0 +1,89 @@
+import pytest
+from datetime import timedelta
+from math import exp
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+async def _setup(hass, sample_yaml, uid):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id=uid,
+        options={
+            "sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0,
+            "min_samples": 1, "min_effect_w": 0, "measure_duration_s": 30, "on_window_s": 0,
+            "settling": "auto",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN]
+
+
+async def _second(hass, freezer, value):
+    hass.states.async_set("sensor.home_consumption_now_w", value)
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_transient_is_excluded_from_off_window(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "auto_settling")
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Inverter-like decay: 100 W circuit off, but untracked power falls to its OFF level over ~15 s
+    for t in range(1, 32):
+        await _second(hass, freezer, round(400 + 150 * exp(-t / 3.0), 1))
+
+    hist = data.measure_history["3F11"][-1]
+    assert hist["settling"] == "auto" and "settle_timeout" not in hist and hist["settle_changed"]
+    assert 8 <= hist["settle_s"] <= 25
+    assert data.settle_prior["3F11"] == hist["settle_s"]
+    # A fixed window would average the transient in and underestimate the effect
+    assert data.measure_results["3F11"] == pytest.approx(100.0, abs=2.0)
+
+
+@pytest.mark.asyncio
+async def test_window_waits_for_the_breaker(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "auto_settling_late")
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # The user needs 12 s to reach the breaker: untracked stays at the ON level meanwhile
+    for _ in range(12):
+        await _second(hass, freezer, 500)
+    for _ in range(19):
+        await _second(hass, freezer, 400)
+
+    hist = data.measure_history["3F11"][-1]
+    assert hist["settle_changed"] and hist["settle_s"] < 12
+    assert data.settle_prior["3F11"] == hist["settle_s"]
+    # Not a single ON-level sample in the OFF window
+    assert data.measure_results["3F11"] == pytest.approx(100.0, abs=0.5)
+
+
+@pytest.mark.asyncio
+async def test_no_change_records_no_settling_prior(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "auto_settling_none")
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    for _ in range(31):
+        await _second(hass, freezer, 500)
+
+    hist = data.measure_history["3F11"][-1]
+    assert hist["settle_s"] is None and hist["settle_changed"] is False
+    assert "3F11" not in data.settle_prior
+    assert data.measure_results["3F11"] == pytest.approx(0.0, abs=0.5)
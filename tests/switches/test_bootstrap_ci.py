@@ -0,0 +1,137 @@
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_finished_measurement_gets_bootstrap_ci(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="bootstrap_ci",
+        options={"pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0, "bootstrap_resamples": 500},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    for v in (398, 402, 399, 401, 400, 403, 397):
+        hass.states.async_set("sensor.home_consumption_now_w", v)
+        await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+
+    stats = data.measure_stats["3F11"]
+    assert stats["ci_low"] <= data.measure_results["3F11"] <= stats["ci_high"]
+    assert data.measure_history["3F11"][-1]["ci_resamples"] == 500
+    attrs = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").attributes
+    assert attrs["ci_low"] == stats["ci_low"] and attrs["ci_method"] == "percentile"
+
+    # Bulk recompute with another method updates the latest history entry
+    await hass.services.async_call(DOMAIN, "recompute_confidence_intervals", {"resamples": 300, "method": "bca"}, blocking=True)
+    await hass.async_block_till_done()
+    last = data.measure_history["3F11"][-1]
+    assert last["ci_method"] == "bca" and last["ci_resamples"] == 300
+    assert last["ci_strategy"] == "average"
+
+    # Strategy change: the CI is recomputed for the new strategy, the history entry keeps its own
+    await hass.services.async_call(
+        "select", "select_option",
+        {"entity_id": "select.power_consumption_analyser_effect_strategy", "option": "Median"}, blocking=True,
+    )
+    await hass.async_block_till_done()
+    stats = data.measure_stats["3F11"]
+    assert stats["ci_strategy"] == "median" and stats["ci_method"] == "percentile"
+    assert data.measure_history["3F11"][-1]["ci_strategy"] == "average"
+    attrs = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").attributes
+    assert attrs["ci_strategy"] == "median" and attrs["ci_low"] == stats["ci_low"]
+
+
+@pytest.mark.asyncio
+async def test_rederive_drops_ci_of_other_strategy(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="bootstrap_ci_stale",
+        options={"pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0, "bootstrap_resamples": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    data.measure_effects["3F11"] = {"average": 100.0, "median": 98.0}
+    data.measure_stats["3F11"] = {"samples": 5, "ci_low": 95.0, "ci_high": 105.0, "ci_method": "percentile", "ci_strategy": "average"}
+    data.measure_results["3F11"] = 100.0
+
+    # No automatic bootstrap configured: the stale interval is dropped, not shown
+    await hass.services.async_call(
+        "select", "select_option",
+        {"entity_id": "select.power_consumption_analyser_effect_strategy", "option": "Median"}, blocking=True,
+    )
+    await hass.async_block_till_done()
+    assert data.measure_results["3F11"] == 98.0
+    assert "ci_low" not in data.measure_stats["3F11"] and data.measure_stats["3F11"]["samples"] == 5
+    attrs = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").attributes
+    assert "ci_low" not in attrs
+
+
+@pytest.mark.asyncio
+async def test_time_weighted_strategy_reports_ci_not_supported(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="bootstrap_ci_tw",
+        options={
+            "pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0,
+            "bootstrap_resamples": 500, "effect_strategy": "tw_average",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    for v in (398, 402, 399, 401, 400):
+        hass.states.async_set("sensor.home_consumption_now_w", v)
+        await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+
+    stats = data.measure_stats["3F11"]
+    assert "ci_low" not in stats and stats["ci_supported"] is False and stats["ci_strategy"] == "tw_average"
+    assert data.measure_history["3F11"][-1]["ci_supported"] is False
+    attrs = hass.states.get("sensor.power_consumption_analyser_circuit_3f11_effect").attributes
+    assert attrs["ci_supported"] is False and "ci_low" not in attrs
+
+    # Back to a resamplable strategy: a real interval replaces the marker
+    await hass.services.async_call(
+        "select", "select_option",
+        {"entity_id": "select.power_consumption_analyser_effect_strategy", "option": "Average"}, blocking=True,
+    )
+    await hass.async_block_till_done()
+    stats = data.measure_stats["3F11"]
+    assert "ci_supported" not in stats and stats["ci_strategy"] == "average" and "ci_low" in stats
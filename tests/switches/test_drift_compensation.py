@@ -0,0 +1,80 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+async def _setup(hass, sample_yaml, uid):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id=uid,
+        options={
+            "sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0,
+            "min_samples": 1, "min_effect_w": 0, "measure_duration_s": 10, "on_window_s": 20,
+            "drift_compensation": True, "restore_window_s": 10,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN]
+
+
+async def _second(hass, freezer, value):
+    hass.states.async_set("sensor.home_consumption_now_w", value)
+    await hass.async_block_till_done()
+    freezer.tick(timedelta(seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_drift_between_on_windows_is_removed(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "drift")
+    restores = []
+    hass.bus.async_listen(f"{DOMAIN}.restore_started", lambda e: restores.append(e.data))
+    # Untracked power ramps by 1 W/s (heat pump) for the whole test
+    t = 0
+    for _ in range(30):
+        t += 1
+        await _second(hass, freezer, 500 + t)
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # 100 W circuit off for 10 s, then restored for the 10 s verify window
+    for _ in range(10):
+        t += 1
+        await _second(hass, freezer, 400 + t)
+    assert restores and restores[0]["circuit_id"] == "3F11"
+    assert data.restore_circuit == "3F11" and "3F11" not in data.measure_results
+    for _ in range(11):
+        t += 1
+        await _second(hass, freezer, 500 + t)
+
+    assert data.restore_circuit is None
+    hist = data.measure_history["3F11"][-1]
+    assert hist["restored"] is True and hist["drift_w_per_min"] == pytest.approx(60.0, abs=3.0)
+    assert hist["restore_samples"] >= 9
+    # Without detrending the ramp would eat ~16 W of the effect
+    assert data.measure_results["3F11"] == pytest.approx(100.0, abs=1.0)
+    assert data.measure_valid["3F11"]
+
+
+@pytest.mark.asyncio
+async def test_unrestored_circuit_invalidates_result(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "drift_not_restored")
+    for _ in range(30):
+        await _second(hass, freezer, 500)
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Circuit stays off through the verify window
+    for _ in range(21):
+        await _second(hass, freezer, 400)
+    assert data.measure_valid["3F11"] is False
+    assert data.measure_reason["3F11"] == "not_restored"
+    assert data.measure_results["3F11"] == pytest.approx(100.0)
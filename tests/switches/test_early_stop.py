@@ -0,0 +1,100 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+async def _setup(hass, sample_yaml, unique_id, strategy="average"):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id=unique_id,
+        options={
+            "sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0,
+            "min_samples": 5, "min_effect_w": 20, "early_stop": True, "early_stop_confidence": 0.95,
+            "measure_duration_s": 600, "effect_strategy": strategy,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN]
+
+
+async def _run_ticks(hass, freezer, homes):
+    for i, home in enumerate(homes, start=1):
+        if not hass.states.get("switch.measure_circuit_3f11").state == "on":
+            return i - 1
+        hass.states.async_set("sensor.home_consumption_now_w", home)
+        await hass.async_block_till_done()
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+    return len(homes)
+
+
+@pytest.mark.asyncio
+async def test_obvious_effect_stops_window_early(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "early_stop_present")
+    finished = []
+    hass.bus.async_listen(f"{DOMAIN}.measure_finished", lambda e: finished.append(e.data))
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Circuit OFF removes a ~400 W heater
+    await _run_ticks(hass, freezer, [100, 103, 98, 101, 99, 100, 102, 97, 100, 101])
+    assert hass.states.get("switch.measure_circuit_3f11").state == "off"
+    assert finished and finished[-1]["early_stop"] == "effect_present"
+    last = data.measure_history["3F11"][-1]
+    assert last["early_stop"] == "effect_present"
+    assert last["samples"] == 5
+    assert last["valid"] is True
+    assert last["effect"] == pytest.approx(400.0, abs=5.0)
+
+
+@pytest.mark.asyncio
+async def test_no_effect_stops_as_below_threshold(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "early_stop_absent")
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    flat = [501, 499, 500, 502, 498, 500, 501, 499, 500, 500, 501, 499]
+    # A flat start may be a breaker not switched yet: no "below threshold" within seconds
+    assert await _run_ticks(hass, freezer, flat) == len(flat)
+    assert hass.states.get("switch.measure_circuit_3f11").state == "on"
+    ticks = await _run_ticks(hass, freezer, flat * 3)
+    assert ticks < len(flat) * 3
+    assert hass.states.get("switch.measure_circuit_3f11").state == "off"
+    assert data.measure_stats["3F11"]["early_stop"] == "effect_below_threshold"
+    assert data.measure_history["3F11"][-1]["elapsed_s"] >= 30
+    assert data.measure_clamped["3F11"] is True
+
+
+@pytest.mark.asyncio
+async def test_median_strategy_tests_the_running_median(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    data = await _setup(hass, sample_yaml, "early_stop_median", strategy="median")
+    assert data.effect_strategy == "median"
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # No effect, but spikes drag the mean 60 W away: the median still decides "below threshold"
+    await _run_ticks(hass, freezer, [500, 501, 800, 499, 500, 800, 501, 500, 499, 500, 501, 500] * 4)
+    assert hass.states.get("switch.measure_circuit_3f11").state == "off"
+    assert data.measure_stats["3F11"]["early_stop"] == "effect_below_threshold"
+
+
+@pytest.mark.parametrize("strategy", ["exponential", "tw_average"])
+@pytest.mark.asyncio
+async def test_no_early_stop_without_a_running_statistic(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer, strategy):
+    data = await _setup(hass, sample_yaml, f"early_stop_{strategy}", strategy=strategy)
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    ticks = await _run_ticks(hass, freezer, [100, 103, 98, 101, 99, 100, 102, 97, 100, 101])
+    assert ticks == 10 and hass.states.get("switch.measure_circuit_3f11").state == "on"
+    assert data.measure_running["3F11"].n >= 10
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_stats["3F11"].get("early_stop") is None
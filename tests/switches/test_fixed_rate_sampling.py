@@ -0,0 +1,136 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+@pytest.mark.asyncio
+async def test_fixed_rate_sampling_holds_latest_value(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="fixed_rate",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    assert data.sampling_mode == "fixed"
+
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Meter events alone do not add samples in fixed mode
+    hass.states.async_set("sensor.kitchen_plug_power", 150)
+    hass.states.async_set("sensor.kitchen_plug_power", 120)
+    await hass.async_block_till_done()
+    assert data.measure_samples["3F11"].tolist() == []
+
+    # Steady period: one sample per tick, holding the latest value
+    now = dt_util.utcnow()
+    for i in range(1, 6):
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+    assert data.measure_samples["3F11"].tolist() == [380.0] * 5
+
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_history["3F11"][-1]["sampling"] == "fixed"
+    assert data.measure_history["3F11"][-1]["samples"] == 5
+    # Timer is cancelled with the measurement and the buffer is released
+    async_fire_time_changed(hass, now + timedelta(seconds=10))
+    await hass.async_block_till_done()
+    assert "3F11" not in data.measure_samples
+
+
+@pytest.mark.asyncio
+async def test_live_window_stats_on_switch(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="live_stats",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    now = dt_util.utcnow()
+    for i, plug in enumerate((100, 200, 100), start=1):
+        hass.states.async_set("sensor.kitchen_plug_power", plug)
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+    st = hass.states.get("switch.measure_circuit_3f11")
+    assert st.attributes["samples"] >= 1
+    assert st.attributes["max"] == 400.0
+
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    stats = data.measure_stats["3F11"]
+    assert stats["samples"] == 3
+    assert (stats["min"], stats["max"], stats["median_off"]) == (300.0, 400.0, 400.0)
+    assert data.measure_history["3F11"][-1]["avg_untracked"] == pytest.approx(366.67, abs=0.01)
+    assert "samples" not in hass.states.get("switch.measure_circuit_3f11").attributes
+    assert "3F11" not in data.measure_running
+
+
+@pytest.mark.asyncio
+async def test_finished_window_median_and_mad_are_exact(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="exact_stats",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    # Stepped window: 12 samples at 400 W, then 9 at 600 W
+    now = dt_util.utcnow()
+    for i in range(1, 22):
+        if i == 13:
+            hass.states.async_set("sensor.home_consumption_now_w", 700)
+            await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+    # The streaming estimate drifts off a step; the finished window must not
+    assert data.measure_running["3F11"].median != pytest.approx(400.0, abs=1.0)
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    stats = data.measure_stats["3F11"]
+    assert stats["samples"] == 21
+    assert stats["median_off"] == 400.0
+    assert stats["mad"] == 0.0 and stats["sigma"] == 0.0
+    assert data.measure_history["3F11"][-1]["mad"] == 0.0
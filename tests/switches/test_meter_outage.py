@@ -0,0 +1,58 @@
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+@pytest.mark.asyncio
+async def test_outage_of_other_circuit_meter_invalidates_measurement(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="meter_outage",
+        options={"min_samples": 0, "pre_wait_s": 0, "discard_first_n": 0, "outage_flag_w": 50.0},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+
+    # Measure 3F11 while the kitchen plug (on 2F7) drops out
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    hass.states.async_set("sensor.kitchen_plug_power", "unavailable")
+    await hass.async_block_till_done()
+
+    untracked = hass.states.get("sensor.power_consumption_analyser_untracked_power")
+    assert float(untracked.state) == 500.0
+    assert untracked.attributes["outage_meters"] == ["sensor.kitchen_plug_power"]
+    assert untracked.attributes["outage_w"] == 100.0
+    assert untracked.attributes["inflated_by_outage"] is True
+    count = hass.states.get("sensor.power_consumption_analyser_unavailable_meter_count")
+    assert int(count.state) == 1
+    assert count.attributes["entity_ids"] == ["sensor.kitchen_plug_power"]
+
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_valid["3F11"] is False
+    assert data.measure_reason["3F11"] == "meter_unavailable:sensor.kitchen_plug_power"
+    assert data.measure_stats["3F11"]["outage_w"] == 100.0
+
+    # A meter on the measured circuit going away is expected and not flagged
+    hass.states.async_set("sensor.kitchen_plug_power", 100)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_2f7"}, blocking=True)
+    hass.states.async_set("sensor.kitchen_plug_power", "unavailable")
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_2f7"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_valid["2F7"] is True
+    assert "outage_meters" not in data.measure_stats["2F7"]
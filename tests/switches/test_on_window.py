@@ -0,0 +1,109 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_on_window_from_history_ignores_spike_at_start(hass: HomeAssistant, sample_yaml, enable_custom_integrations):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="on_window",
+        options={"pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0, "on_window_s": 20},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+
+    # 30 s of ON-state history around 500 W (1 Hz)
+    now = dt_util.utcnow()
+    for i in range(1, 31):
+        hass.states.async_set("sensor.home_consumption_now_w", 500 + (2 if i % 2 else -2))
+        await hass.async_block_till_done()
+        async_fire_time_changed(hass, now + timedelta(seconds=i))
+        await hass.async_block_till_done()
+    assert len(data.untracked_history) >= 25
+
+    # A kettle spike right at switch-on used to become the baseline
+    hass.states.async_set("sensor.home_consumption_now_w", 2500)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    assert data.measure_baseline["3F11"] == 500.0
+    for v in (400, 402, 398):
+        hass.states.async_set("sensor.home_consumption_now_w", v)
+        await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+
+    assert data.measure_results["3F11"] == pytest.approx(100.0)
+    hist = data.measure_history["3F11"][-1]
+    assert hist["on_samples"] == 20 and hist["baseline"] == 500.0
+    # Every strategy compares the ON and OFF windows
+    assert data.measure_effects["3F11"]["hodges_lehmann"] == pytest.approx(100.0, abs=2.0)
+    assert len(data.measure_on_windows["3F11"]) == 20
+
+    # No history (option 0): single reading as before
+    hass.config_entries.async_update_entry(entry, options={**entry.options, "on_window_s": 0})
+    await hass.async_block_till_done()
+    hass.states.async_set("sensor.home_consumption_now_w", 520)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    assert data.measure_baseline["3F11"] == 520.0
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+    assert "3F11" not in data.measure_on_windows
+
+
+@pytest.mark.asyncio
+async def test_back_to_back_step_does_not_reuse_stale_on_window(hass: HomeAssistant, sample_yaml, enable_custom_integrations, freezer):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(sample_yaml),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="on_window_stale",
+        options={"pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1, "min_effect_w": 0, "on_window_s": 20},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+
+    async def _seconds(n, value):
+        for _ in range(n):
+            hass.states.async_set("sensor.home_consumption_now_w", value)
+            await hass.async_block_till_done()
+            freezer.tick(timedelta(seconds=1))
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done()
+
+    await _seconds(30, 500)
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    assert data.measure_baseline["3F11"] == 500.0
+    # The household load changes during the first step; history is paused meanwhile
+    await _seconds(10, 700)
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_3f11"}, blocking=True)
+    await hass.async_block_till_done()
+
+    # Next step right away: the newest tick is 10 s old, so the 500 W window is not used
+    hass.states.async_set("sensor.home_consumption_now_w", 800)
+    await hass.async_block_till_done()
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.measure_circuit_2f7"}, blocking=True)
+    assert data.measure_baseline["2F7"] == 800.0
+    await _seconds(3, 800)
+    await hass.services.async_call("switch", "turn_off", {"entity_id": "switch.measure_circuit_2f7"}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.measure_history["2F7"][-1]["on_samples"] == 0
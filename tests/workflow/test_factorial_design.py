@@ -0,0 +1,73 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_design_workflow_solves_circuit_effects(hass: HomeAssistant, temp_config_dir, enable_custom_integrations):
+    yaml_path = temp_config_dir / "unterverteilung.yaml"
+    yaml_path.write_text(
+        """
+        circuits:
+          - id: "A"
+          - id: "B"
+          - id: "C"
+        """,
+        encoding="utf-8",
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(yaml_path),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="design",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+
+    loads = {"A": 100.0, "C": 50.0}
+    await hass.services.async_call(DOMAIN, "start_guided_analysis", {"mode": "design", "wait_s": 30}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.workflow_queue == ["design:1", "design:2", "design:3"]
+    # Each estimate uses all three steps: the step window is shortened (3/4 of wait_s)
+    assert data.workflow_design["window_s"] == 22 and data.measure_duration_s == 22
+
+    steps = 0
+    while data.workflow_active and steps < 10:
+        step = data.workflow_queue[data.workflow_index]
+        off = data.workflow_groups[step]
+        assert len(off) == 2
+        steps += 1
+        now = dt_util.utcnow()
+        # Small alternating noise so each step has a standard error
+        for i in range(1, 5):
+            jitter = 1.0 if i % 2 else -1.0
+            hass.states.async_set("sensor.home_consumption_now_w", 500 - sum(loads.get(c, 0.0) for c in off) + jitter)
+            await hass.async_block_till_done()
+            async_fire_time_changed(hass, now + timedelta(seconds=i))
+            await hass.async_block_till_done()
+        hass.states.async_set("sensor.home_consumption_now_w", 500)
+        await hass.async_block_till_done()
+        await hass.services.async_call(DOMAIN, "workflow_finish_current", {}, blocking=True)
+        await hass.async_block_till_done()
+
+    assert steps == 3
+    assert data.measure_results["A"] == pytest.approx(100.0, abs=0.01)
+    assert data.measure_results["B"] == 0.0
+    assert data.measure_results["C"] == pytest.approx(50.0, abs=0.01)
+    assert data.measure_stats["A"]["se"] is not None
+    hist = data.measure_history["C"][-1]
+    assert hist["design"] == "hadamard" and hist["design_steps"] == 3 and hist["valid"]
+    assert data.group_run is None and data.measuring_circuit is None
@@ -0,0 +1,94 @@
+import pytest
+from datetime import timedelta
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.power_consumption_analyser import DOMAIN
+from custom_components.power_consumption_analyser.services.workflow import plan_group_steps
+
+
+def test_plan_group_steps():
+    queue, steps = plan_group_steps(
+        {"FI A": ["A1", "A2", "X"], "FI B": ["A2", "B1"], "FI C": ["C1", "C2"]},
+        ["A1", "A2", "B1", "C2", "D1", "D2"],
+    )
+    # Shared circuits stay in the first group, single-circuit groups are plain steps
+    assert queue == ["group:FI A", "B1", "C2", "group:ungrouped"]
+    assert steps == {"group:FI A": ["A1", "A2"], "group:ungrouped": ["D1", "D2"]}
+
+
+@pytest.mark.asyncio
+async def test_bisect_workflow_descends_only_into_groups_with_effect(hass: HomeAssistant, temp_config_dir, enable_custom_integrations):
+    yaml_path = temp_config_dir / "unterverteilung.yaml"
+    yaml_path.write_text(
+        """
+        protection_devices:
+          - type: RCD
+            label: FI A
+            protects: ["A1", "A2", "A3"]
+          - type: RCD
+            label: FI B
+            protects: ["B1", "B2", "B3", "B4"]
+        circuits:
+          - id: "A1"
+          - id: "A2"
+          - id: "A3"
+          - id: "B1"
+          - id: "B2"
+          - id: "B3"
+          - id: "B4"
+          - id: "C1"
+        """,
+        encoding="utf-8",
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="PCA",
+        data={
+            "unterverteilung_path": str(yaml_path),
+            "safe_circuits": [],
+            "baseline_sensors": {"home_consumption": "sensor.home_consumption_now_w"},
+        },
+        unique_id="bisect",
+        options={"sampling_mode": "fixed", "sample_rate_hz": 1.0, "pre_wait_s": 0, "discard_first_n": 0, "min_samples": 1},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN]
+    hass.states.async_set("sensor.home_consumption_now_w", 500)
+    await hass.async_block_till_done()
+
+    # Only A2 draws power (200 W)
+    loads = {"A2": 200.0}
+    await hass.services.async_call(DOMAIN, "start_guided_analysis", {"mode": "bisect", "wait_s": 30}, blocking=True)
+    await hass.async_block_till_done()
+    assert data.workflow_queue == ["group:FI A", "group:FI B", "C1"]
+
+    steps = []
+    while data.workflow_active and len(steps) < 20:
+        step = data.workflow_queue[data.workflow_index]
+        steps.append(step)
+        off = data.workflow_groups.get(step) or [step]
+        hass.states.async_set("sensor.home_consumption_now_w", 500 - sum(loads.get(c, 0.0) for c in off))
+        await hass.async_block_till_done()
+        now = dt_util.utcnow()
+        for i in range(1, 4):
+            async_fire_time_changed(hass, now + timedelta(seconds=i))
+            await hass.async_block_till_done()
+        hass.states.async_set("sensor.home_consumption_now_w", 500)
+        await hass.async_block_till_done()
+        await hass.services.async_call(DOMAIN, "workflow_finish_current", {}, blocking=True)
+        await hass.async_block_till_done()
+
+    assert steps == ["group:FI A", "group:FI A.1", "A1", "A2", "A3", "group:FI B", "C1"]
+    assert data.group_results["group:FI A"]["effect"] == 200.0
+    assert data.group_results["group:FI A"]["circuits"] == ["A1", "A2", "A3"]
+    assert data.group_results["group:FI B"]["effect"] == 0.0
+    assert data.measure_results["A2"] == 200.0
+    assert data.measure_results["A1"] == 0.0
+    # Circuits of a group without effect are never measured one by one
+    assert not any(c in data.measure_results for c in ("B1", "B2", "B3", "B4"))
+    assert data.measuring_circuit is None and data.group_run is None
+    assert "group:FI A" not in data.measure_samples